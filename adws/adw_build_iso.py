@@ -35,6 +35,7 @@ from adw_modules.workflow_ops import (
     implement_plan,
     create_commit,
     format_issue_message,
+    issue_progress_callback,
     AGENT_IMPLEMENTOR,
 )
 from adw_modules.utils import setup_logger, check_env_vars
@@ -166,7 +167,13 @@ def main():
         format_issue_message(adw_id, AGENT_IMPLEMENTOR, "✅ Implementing solution in isolated environment")
     )
     
-    implement_response = implement_plan(plan_file, adw_id, logger, working_dir=worktree_path)
+    implement_response = implement_plan(
+        plan_file,
+        adw_id,
+        logger,
+        working_dir=worktree_path,
+        on_progress=issue_progress_callback(issue_number, adw_id, AGENT_IMPLEMENTOR, logger),
+    )
     
     if not implement_response.success:
         logger.error(f"Error implementing solution: {implement_response.output}")
@@ -1,15 +1,20 @@
 """Claude Code agent module for executing prompts programmatically."""
 
+import asyncio
+import signal
 import subprocess
 import sys
 import os
 import json
 import re
 import logging
+import textwrap
 import time
-from typing import Optional, List, Dict, Any, Tuple, Final
+from collections import deque
+from typing import Optional, List, Dict, Any, Final, IO, Callable
 from dotenv import load_dotenv
 from .data_types import (
+    AgentProgress,
     AgentPromptRequest,
     AgentPromptResponse,
     AgentTemplateRequest,
@@ -25,6 +30,24 @@ load_dotenv()
 # Get Claude Code CLI path from environment
 CLAUDE_PATH = os.getenv("CLAUDE_CODE_PATH", "claude")
 
+# Minimum seconds between progress reports for a running agent
+PROGRESS_INTERVAL = float(os.getenv("ADW_PROGRESS_INTERVAL", "30"))
+
+# Wall-clock budget in seconds for commands missing from SLASH_COMMAND_TIMEOUT_MAP
+DEFAULT_TIMEOUT = float(os.getenv("ADW_AGENT_TIMEOUT", "1800"))
+
+# Kill an agent that writes no stream-json output for this many seconds (0 = never)
+IDLE_TIMEOUT = float(os.getenv("ADW_AGENT_IDLE_TIMEOUT", "600"))
+
+# Seconds between SIGTERM and SIGKILL when killing an agent's process group
+KILL_GRACE_SECONDS = 5.0
+
+# Longest single stream-json line accepted from the CLI
+STREAM_LINE_LIMIT = 64 * 1024 * 1024
+
+# Called with throttled progress; returning False stops the agent
+ProgressCallback = Callable[[AgentProgress], Optional[bool]]
+
 # Model selection mapping for slash commands
 # Maps each command to its model configuration for base and heavy model sets
 SLASH_COMMAND_MODEL_MAP: Final[Dict[SlashCommand, Dict[ModelSet, str]]] = {
@@ -48,6 +71,28 @@ SLASH_COMMAND_MODEL_MAP: Final[Dict[SlashCommand, Dict[ModelSet, str]]] = {
     "/track_agentic_kpis": {"base": "sonnet", "heavy": "sonnet"},
 }
 
+# Wall-clock budget in seconds for each slash command, including tool calls
+SLASH_COMMAND_TIMEOUT_MAP: Final[Dict[SlashCommand, float]] = {
+    "/classify_issue": 300,
+    "/classify_adw": 300,
+    "/generate_branch_name": 300,
+    "/implement": 3600,
+    "/test": 1800,
+    "/resolve_failed_test": 1800,
+    "/test_e2e": 2700,
+    "/resolve_failed_e2e_test": 1800,
+    "/review": 2400,
+    "/document": 1800,
+    "/commit": 600,
+    "/pull_request": 600,
+    "/chore": 1800,
+    "/bug": 1800,
+    "/feature": 1800,
+    "/patch": 1800,
+    "/install_worktree": 900,
+    "/track_agentic_kpis": 600,
+}
+
 
 def get_model_for_slash_command(
     request: AgentTemplateRequest, default: str = "sonnet"
@@ -83,6 +128,11 @@ def get_model_for_slash_command(
     return default
 
 
+def get_timeout_for_slash_command(slash_command: str) -> float:
+    """Wall-clock budget in seconds for a slash command, or DEFAULT_TIMEOUT."""
+    return SLASH_COMMAND_TIMEOUT_MAP.get(slash_command, DEFAULT_TIMEOUT)
+
+
 def truncate_output(
     output: str, max_length: int = 500, suffix: str = "... (truncated)"
 ) -> str:
@@ -159,51 +209,307 @@ def check_claude_installed() -> Optional[str]:
     return None
 
 
-def parse_jsonl_output(
-    output_file: str,
-) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
-    """Parse JSONL output file and return all messages and the result message.
+class JsonArrayWriter:
+    """Write messages to a file as an indented JSON array, one at a time.
 
-    Returns:
-        Tuple of (all_messages, result_message) where result_message is None if not found
+    Produces the same text as ``json.dump(messages, f, indent=2)`` without
+    holding the messages in memory.
     """
-    try:
-        with open(output_file, "r") as f:
-            # Read all lines and parse each as JSON
-            messages = [json.loads(line) for line in f if line.strip()]
-
-            # Find the result message (should be the last one)
-            result_message = None
-            for message in reversed(messages):
-                if message.get("type") == "result":
-                    result_message = message
-                    break
 
-            return messages, result_message
-    except Exception as e:
-        return [], None
+    def __init__(self, f: IO[str]):
+        self.f = f
+        self.count = 0
 
+    def append(self, message: Dict[str, Any]) -> None:
+        self.f.write("[\n" if self.count == 0 else ",\n")
+        self.f.write(textwrap.indent(json.dumps(message, indent=2), "  "))
+        self.count += 1
 
-def convert_jsonl_to_json(jsonl_file: str) -> str:
-    """Convert JSONL file to JSON array file.
+    def close(self) -> None:
+        self.f.write("\n]" if self.count else "[]")
 
-    Creates a .json file with the same name as the .jsonl file,
-    containing all messages as a JSON array.
 
-    Returns:
-        Path to the created JSON file
+class ClaudeStreamState:
+    """Running state of a Claude Code stream-json transcript.
+
+    Lines are folded in one at a time as the subprocess writes them, so only
+    the result message, the session id and a few recent messages are kept
+    instead of the whole transcript.
+    """
+
+    def __init__(self, recent_limit: int = 5):
+        self.message_count = 0
+        self.result_message: Optional[Dict[str, Any]] = None
+        self.session_id: Optional[str] = None
+        self.recent: deque = deque(maxlen=recent_limit)
+        self.last_line = ""
+        self.started_at = time.monotonic()
+        self.turns = 0
+        self.tool_calls = 0
+        self.last_tool: Optional[str] = None
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._last_message_id: Optional[str] = None
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """Fold one JSONL line into the state; return the parsed message, if any."""
+        line = line.strip()
+        if not line:
+            return None
+        self.last_line = line
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(message, dict):
+            return None
+
+        self.message_count += 1
+        self.recent.append(message)
+        if message.get("session_id"):
+            self.session_id = message["session_id"]
+        if message.get("type") == "result":
+            self.result_message = message
+        elif message.get("type") == "assistant":
+            self._track_assistant(message.get("message") or {})
+        return message
+
+    def _track_assistant(self, body: Dict[str, Any]) -> None:
+        # One API message can be streamed as several lines sharing an id
+        message_id = body.get("id")
+        if message_id is None or message_id != self._last_message_id:
+            self._last_message_id = message_id
+            self.turns += 1
+            usage = body.get("usage") or {}
+            self.input_tokens += int(usage.get("input_tokens") or 0)
+            self.output_tokens += int(usage.get("output_tokens") or 0)
+        content = body.get("content")
+        if isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and block.get("type") == "tool_use":
+                    self.tool_calls += 1
+                    self.last_tool = block.get("name")
+
+    def progress(self, adw_id: str, agent_name: str) -> AgentProgress:
+        """Snapshot of the run so far, for logging and progress callbacks."""
+        return AgentProgress(
+            adw_id=adw_id,
+            agent_name=agent_name,
+            elapsed_seconds=time.monotonic() - self.started_at,
+            messages=self.message_count,
+            turns=self.turns,
+            tool_calls=self.tool_calls,
+            last_tool=self.last_tool,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            session_id=self.session_id,
+        )
+
+
+def _assistant_text(message: Dict[str, Any]) -> str:
+    """Text of the first content block of an assistant message, or ''."""
+    if message.get("type") != "assistant" or not message.get("message"):
+        return ""
+    content = message["message"].get("content", [])
+    if isinstance(content, list) and content and isinstance(content[0], dict):
+        return content[0].get("text", "") or ""
+    return ""
+
+
+class JsonlTee:
+    """Copy stream-json lines to ``output_file`` while folding them into ``state``.
+
+    A ``.jsonl`` output also gets its ``.json`` array copy written alongside,
+    message by message, so neither file is re-read afterwards.
     """
-    # Create JSON filename by replacing .jsonl with .json
-    json_file = jsonl_file.replace(".jsonl", ".json")
 
-    # Parse the JSONL file
-    messages, _ = parse_jsonl_output(jsonl_file)
+    def __init__(self, output_file: str, state: ClaudeStreamState):
+        self.output_file = output_file
+        self.state = state
+        self._out_f: Optional[IO[str]] = None
+        self._json_f: Optional[IO[str]] = None
+        self._writer: Optional[JsonArrayWriter] = None
+
+    def __enter__(self) -> "JsonlTee":
+        self._out_f = open(self.output_file, "w", buffering=1)
+        if self.output_file.endswith(".jsonl"):
+            self._json_f = open(self.output_file[: -len(".jsonl")] + ".json", "w")
+            self._writer = JsonArrayWriter(self._json_f)
+        return self
+
+    def write(self, line: str) -> None:
+        self._out_f.write(line)
+        message = self.state.feed(line)
+        if message is not None and self._writer:
+            self._writer.append(message)
+
+    def __exit__(self, *exc) -> None:
+        if self._writer:
+            self._writer.close()
+            self._json_f.close()
+        self._out_f.close()
+
+
+class ProgressReporter:
+    """Publish throttled progress of a running agent to its ADW logger and a callback."""
+
+    def __init__(
+        self,
+        request: AgentPromptRequest,
+        on_progress: Optional[ProgressCallback] = None,
+        interval: float = PROGRESS_INTERVAL,
+    ):
+        self.request = request
+        self.on_progress = on_progress
+        self.interval = interval
+        self.logger = logging.getLogger(f"adw_{request.adw_id}")
+        self._last_report = time.monotonic()
+
+    def maybe_report(self, state: ClaudeStreamState) -> bool:
+        """Report if ``interval`` has passed; return False if the agent should stop."""
+        now = time.monotonic()
+        if now - self._last_report < self.interval:
+            return True
+        self._last_report = now
+        progress = state.progress(self.request.adw_id, self.request.agent_name)
+        self.logger.info(f"[{self.request.agent_name}] {progress.summary()}")
+        if self.on_progress is None:
+            return True
+        try:
+            return self.on_progress(progress) is not False
+        except Exception as e:
+            self.logger.warning(f"Progress callback failed: {e}")
+            return True
+
+
+async def _drain_lines(stream: asyncio.StreamReader, sink: deque) -> None:
+    while True:
+        line = await stream.readline()
+        if not line:
+            return
+        sink.append(line.decode("utf-8", errors="replace"))
+
+
+def _signal_process_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass
 
-    # Write as JSON array
-    with open(json_file, "w") as f:
-        json.dump(messages, f, indent=2)
 
-    return json_file
+async def _kill_process_group(
+    process: asyncio.subprocess.Process, grace: float = KILL_GRACE_SECONDS
+) -> None:
+    """Stop the agent and every tool process it spawned.
+
+    The CLI runs in its own session, so its process group also holds the
+    shells, test runners and dev servers started by its tools.
+    """
+    _signal_process_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), grace)
+    except asyncio.TimeoutError:
+        pass
+    # Children may outlive the CLI itself, so always finish the group off
+    _signal_process_group(process, signal.SIGKILL)
+
+
+async def run_claude_code_async(
+    cmd: List[str],
+    request: AgentPromptRequest,
+    env: Dict[str, str],
+    on_progress: Optional[ProgressCallback] = None,
+    progress_interval: float = PROGRESS_INTERVAL,
+) -> AgentPromptResponse:
+    """Run the Claude Code CLI, consuming its stream-json output as it arrives.
+
+    The run is killed, along with its whole process group, once it exceeds
+    ``request.timeout_seconds`` or writes nothing for
+    ``request.idle_timeout_seconds`` (None uses the module defaults, 0
+    disables the limit); either way it fails with RetryCode.TIMEOUT_ERROR.
+    """
+    timeout = DEFAULT_TIMEOUT if request.timeout_seconds is None else request.timeout_seconds
+    idle_timeout = (
+        IDLE_TIMEOUT if request.idle_timeout_seconds is None else request.idle_timeout_seconds
+    )
+    deadline = time.monotonic() + timeout if timeout else None
+
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+        cwd=request.working_dir,  # Use working_dir if provided
+        limit=STREAM_LINE_LIMIT,
+        start_new_session=True,  # Own process group, so tool subprocesses die with it
+    )
+    # Drain stderr on the side so neither pipe can fill up and stall the agent
+    stderr_tail: deque = deque(maxlen=200)
+    stderr_task = asyncio.create_task(_drain_lines(process.stderr, stderr_tail))
+
+    state = ClaudeStreamState()
+    reporter = ProgressReporter(request, on_progress, progress_interval)
+    stopped = False
+    timed_out: Optional[str] = None
+    try:
+        with JsonlTee(request.output_file, state) as tee:
+            while True:
+                wait = idle_timeout or None
+                if deadline is not None:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    wait = remaining if wait is None else min(wait, remaining)
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), wait)
+                except asyncio.TimeoutError:
+                    if process.returncode is not None:
+                        # The CLI finished, but a leftover tool process holds stdout
+                        await _kill_process_group(process)
+                        break
+                    if deadline is not None and time.monotonic() >= deadline:
+                        timed_out = f"exceeded its {timeout:g}s wall-clock budget"
+                    else:
+                        timed_out = f"produced no output for {idle_timeout:g}s"
+                    break
+                if not line:
+                    break
+                tee.write(line.decode("utf-8", errors="replace"))
+                if not reporter.maybe_report(state):
+                    stopped = True
+                    break
+        if stopped or timed_out:
+            await _kill_process_group(process)
+    except BaseException:
+        # Nobody is reading stdout any more, so the agent could block forever
+        _signal_process_group(process, signal.SIGKILL)
+        raise
+    finally:
+        returncode = await process.wait()
+        try:
+            # A tool process that left the group can still hold stderr open
+            await asyncio.wait_for(stderr_task, KILL_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    if timed_out:
+        progress = state.progress(request.adw_id, request.agent_name)
+        logging.getLogger(f"adw_{request.adw_id}").warning(
+            f"[{request.agent_name}] Claude Code {timed_out}, killed ({progress.summary()})"
+        )
+        return AgentPromptResponse(
+            output=f"Error: Claude Code {timed_out} and was killed after {progress.summary()}",
+            success=False,
+            session_id=state.session_id,
+            retry_code=RetryCode.TIMEOUT_ERROR,
+        )
+    if stopped:
+        progress = state.progress(request.adw_id, request.agent_name)
+        return AgentPromptResponse(
+            output=f"Claude Code run stopped by progress monitor after {progress.summary()}",
+            success=False,
+            session_id=state.session_id,
+            retry_code=RetryCode.NONE,  # Deliberately stopped, so not retried
+        )
+    return build_agent_response(state, returncode, "".join(stderr_tail))
 
 
 def get_claude_env() -> Dict[str, str]:
@@ -251,6 +557,7 @@ def prompt_claude_code_with_retry(
     request: AgentPromptRequest,
     max_retries: int = 3,
     retry_delays: List[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
 ) -> AgentPromptResponse:
     """Execute Claude Code with retry logic for certain error types.
 
@@ -258,6 +565,7 @@ def prompt_claude_code_with_retry(
         request: The prompt request configuration
         max_retries: Maximum number of retry attempts (default: 3)
         retry_delays: List of delays in seconds between retries (default: [1, 3, 5])
+        on_progress: Optional callback receiving throttled progress of each attempt
 
     Returns:
         AgentPromptResponse with output and retry code
@@ -277,7 +585,7 @@ def prompt_claude_code_with_retry(
             delay = retry_delays[attempt - 1]
             time.sleep(delay)
 
-        response = prompt_claude_code(request)
+        response = prompt_claude_code(request, on_progress)
         last_response = response
 
         # Check if we should retry based on the retry code
@@ -285,10 +593,11 @@ def prompt_claude_code_with_retry(
             # Success or non-retryable error
             return response
 
-        # Check if this is a retryable error
+        # Check if this is a retryable error. Timeouts are not: the run was
+        # killed for exceeding its budget, and another attempt would only
+        # multiply the time spent on it.
         if response.retry_code in [
             RetryCode.CLAUDE_CODE_ERROR,
-            RetryCode.TIMEOUT_ERROR,
             RetryCode.EXECUTION_ERROR,
             RetryCode.ERROR_DURING_EXECUTION,
         ]:
@@ -297,12 +606,115 @@ def prompt_claude_code_with_retry(
             else:
                 return response
 
+        return response
+
     # Should not reach here, but return last response just in case
     return last_response
 
 
-def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
-    """Execute Claude Code with the given prompt configuration."""
+def build_agent_response(
+    state: ClaudeStreamState, returncode: int, stderr: str = ""
+) -> AgentPromptResponse:
+    """Turn the folded stream-json state of a finished run into a response."""
+    result_message = state.result_message
+
+    if returncode == 0:
+        if result_message:
+            # Extract session_id from result message
+            session_id = result_message.get("session_id")
+
+            # Check if there was an error in the result
+            is_error = result_message.get("is_error", False)
+            subtype = result_message.get("subtype", "")
+
+            # Handle error_during_execution case where there's no result field
+            if subtype == "error_during_execution":
+                error_msg = "Error during execution: Agent encountered an error and did not return a result"
+                return AgentPromptResponse(
+                    output=error_msg,
+                    success=False,
+                    session_id=session_id,
+                    retry_code=RetryCode.ERROR_DURING_EXECUTION,
+                )
+
+            result_text = result_message.get("result", "")
+
+            # For error cases, truncate the output to prevent JSONL blobs
+            if is_error and len(result_text) > 1000:
+                result_text = truncate_output(result_text, max_length=800)
+
+            return AgentPromptResponse(
+                output=result_text,
+                success=not is_error,
+                session_id=session_id,
+                retry_code=RetryCode.NONE,  # No retry needed for successful or non-retryable errors
+            )
+
+        # No result message found, try to extract meaningful error
+        error_msg = "No result message found in Claude Code output"
+        for message in reversed(state.recent):
+            text = _assistant_text(message)
+            if text:
+                error_msg = f"Claude Code output: {text[:500]}"  # Truncate
+                break
+
+        return AgentPromptResponse(
+            output=truncate_output(error_msg, max_length=800),
+            success=False,
+            session_id=None,
+            retry_code=RetryCode.NONE,
+        )
+
+    # Error occurred - look for an error in the streamed output first
+    stderr_msg = stderr.strip()
+    stdout_msg = ""
+    error_from_jsonl = None
+    if result_message and result_message.get("is_error"):
+        # Found error in result message
+        error_from_jsonl = result_message.get("result", "Unknown error")
+    else:
+        # Look for error in last few messages
+        for message in reversed(state.recent):
+            text = _assistant_text(message)
+            if text and ("error" in text.lower() or "failed" in text.lower()):
+                error_from_jsonl = text[:500]  # Truncate
+                break
+
+    # If no structured error found, use the last line only
+    if not error_from_jsonl:
+        stdout_msg = state.last_line[:200]  # Truncate to 200 chars
+
+    if error_from_jsonl:
+        error_msg = f"Claude Code error: {error_from_jsonl}"
+    elif stdout_msg and not stderr_msg:
+        error_msg = f"Claude Code error: {stdout_msg}"
+    elif stderr_msg and not stdout_msg:
+        error_msg = f"Claude Code error: {stderr_msg}"
+    elif stdout_msg and stderr_msg:
+        error_msg = f"Claude Code error: {stderr_msg}\nStdout: {stdout_msg}"
+    else:
+        error_msg = f"Claude Code error: Command failed with exit code {returncode}"
+
+    # Always truncate error messages to prevent huge outputs
+    return AgentPromptResponse(
+        output=truncate_output(error_msg, max_length=800),
+        success=False,
+        session_id=None,
+        retry_code=RetryCode.CLAUDE_CODE_ERROR,
+    )
+
+
+def prompt_claude_code(
+    request: AgentPromptRequest, on_progress: Optional[ProgressCallback] = None
+) -> AgentPromptResponse:
+    """Execute Claude Code with the given prompt configuration.
+
+    Progress (turns, tool calls, tokens) is logged to the ADW logger at most
+    every ADW_PROGRESS_INTERVAL seconds while the agent runs and passed to
+    ``on_progress``; the callback can return False to stop the agent early.
+    Runs over their wall-clock or idle timeout are killed and fail with
+    RetryCode.TIMEOUT_ERROR, which is not retried.
+    """
 
     # Check if Claude Code CLI is installed
     error_msg = check_claude_installed()
@@ -346,162 +758,7 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
     env = get_claude_env()
 
     try:
-        # Open output file for streaming
-        with open(request.output_file, "w") as output_f:
-            # Execute Claude Code and stream output to file
-            result = subprocess.run(
-                cmd,
-                stdout=output_f,  # Stream directly to file
-                stderr=subprocess.PIPE,
-                text=True,
-                env=env,
-                cwd=request.working_dir,  # Use working_dir if provided
-            )
-
-        if result.returncode == 0:
-
-            # Parse the JSONL file
-            messages, result_message = parse_jsonl_output(request.output_file)
-
-            # Convert JSONL to JSON array file
-            json_file = convert_jsonl_to_json(request.output_file)
-
-            if result_message:
-                # Extract session_id from result message
-                session_id = result_message.get("session_id")
-
-                # Check if there was an error in the result
-                is_error = result_message.get("is_error", False)
-                subtype = result_message.get("subtype", "")
-
-                # Handle error_during_execution case where there's no result field
-                if subtype == "error_during_execution":
-                    error_msg = "Error during execution: Agent encountered an error and did not return a result"
-                    return AgentPromptResponse(
-                        output=error_msg,
-                        success=False,
-                        session_id=session_id,
-                        retry_code=RetryCode.ERROR_DURING_EXECUTION,
-                    )
-
-                result_text = result_message.get("result", "")
-
-                # For error cases, truncate the output to prevent JSONL blobs
-                if is_error and len(result_text) > 1000:
-                    result_text = truncate_output(result_text, max_length=800)
-
-                return AgentPromptResponse(
-                    output=result_text,
-                    success=not is_error,
-                    session_id=session_id,
-                    retry_code=RetryCode.NONE,  # No retry needed for successful or non-retryable errors
-                )
-            else:
-                # No result message found, try to extract meaningful error
-                error_msg = "No result message found in Claude Code output"
-
-                # Try to get the last few lines of output for context
-                try:
-                    with open(request.output_file, "r") as f:
-                        lines = f.readlines()
-                        if lines:
-                            # Get last 5 lines or less
-                            last_lines = lines[-5:] if len(lines) > 5 else lines
-                            # Try to parse each as JSON to find any error messages
-                            for line in reversed(last_lines):
-                                try:
-                                    data = json.loads(line.strip())
-                                    if data.get("type") == "assistant" and data.get(
-                                        "message"
-                                    ):
-                                        # Extract text from assistant message
-                                        content = data["message"].get("content", [])
-                                        if isinstance(content, list) and content:
-                                            text = content[0].get("text", "")
-                                            if text:
-                                                error_msg = f"Claude Code output: {text[:500]}"  # Truncate
-                                                break
-                                except:
-                                    pass
-                except:
-                    pass
-
-                return AgentPromptResponse(
-                    output=truncate_output(error_msg, max_length=800),
-                    success=False,
-                    session_id=None,
-                    retry_code=RetryCode.NONE,
-                )
-        else:
-            # Error occurred - stderr is captured, stdout went to file
-            stderr_msg = result.stderr.strip() if result.stderr else ""
-
-            # Try to read the output file to check for errors in stdout
-            stdout_msg = ""
-            error_from_jsonl = None
-            try:
-                if os.path.exists(request.output_file):
-                    # Parse JSONL to find error message
-                    messages, result_message = parse_jsonl_output(request.output_file)
-
-                    if result_message and result_message.get("is_error"):
-                        # Found error in result message
-                        error_from_jsonl = result_message.get("result", "Unknown error")
-                    elif messages:
-                        # Look for error in last few messages
-                        for msg in reversed(messages[-5:]):
-                            if msg.get("type") == "assistant" and msg.get(
-                                "message", {}
-                            ).get("content"):
-                                content = msg["message"]["content"]
-                                if isinstance(content, list) and content:
-                                    text = content[0].get("text", "")
-                                    if text and (
-                                        "error" in text.lower()
-                                        or "failed" in text.lower()
-                                    ):
-                                        error_from_jsonl = text[:500]  # Truncate
-                                        break
-
-                    # If no structured error found, get last line only
-                    if not error_from_jsonl:
-                        with open(request.output_file, "r") as f:
-                            lines = f.readlines()
-                            if lines:
-                                # Just get the last line instead of entire file
-                                stdout_msg = lines[-1].strip()[
-                                    :200
-                                ]  # Truncate to 200 chars
-            except:
-                pass
-
-            if error_from_jsonl:
-                error_msg = f"Claude Code error: {error_from_jsonl}"
-            elif stdout_msg and not stderr_msg:
-                error_msg = f"Claude Code error: {stdout_msg}"
-            elif stderr_msg and not stdout_msg:
-                error_msg = f"Claude Code error: {stderr_msg}"
-            elif stdout_msg and stderr_msg:
-                error_msg = f"Claude Code error: {stderr_msg}\nStdout: {stdout_msg}"
-            else:
-                error_msg = f"Claude Code error: Command failed with exit code {result.returncode}"
-
-            # Always truncate error messages to prevent huge outputs
-            return AgentPromptResponse(
-                output=truncate_output(error_msg, max_length=800),
-                success=False,
-                session_id=None,
-                retry_code=RetryCode.CLAUDE_CODE_ERROR,
-            )
-
-    except subprocess.TimeoutExpired:
-        error_msg = "Error: Claude Code command timed out after 5 minutes"
-        return AgentPromptResponse(
-            output=error_msg,
-            success=False,
-            session_id=None,
-            retry_code=RetryCode.TIMEOUT_ERROR,
-        )
+        return asyncio.run(run_claude_code_async(cmd, request, env, on_progress))
     except Exception as e:
         error_msg = f"Error executing Claude Code: {e}"
         return AgentPromptResponse(
@@ -512,9 +769,14 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
         )
 
 
-def execute_template(request: AgentTemplateRequest) -> AgentPromptResponse:
+def execute_template(
+    request: AgentTemplateRequest, on_progress: Optional[ProgressCallback] = None
+) -> AgentPromptResponse:
     """Execute a Claude Code template with slash command and arguments.
 
+    ``on_progress`` receives throttled progress while the agent runs (see
+    prompt_claude_code).
+
     This function automatically selects the appropriate model based on:
     1. The slash command being executed
     2. The model_set stored in the ADW state (base or heavy)
@@ -560,7 +822,8 @@ def execute_template(request: AgentTemplateRequest) -> AgentPromptResponse:
         output_file=output_file,
         working_dir=request.working_dir,  # Pass through working_dir
         disable_tools=request.disable_tools,  # Pass through disable_tools
+        timeout_seconds=get_timeout_for_slash_command(request.slash_command),
     )
 
     # Execute with retry logic and return response (prompt_claude_code now handles all parsing)
-    return prompt_claude_code_with_retry(prompt_request)
+    return prompt_claude_code_with_retry(prompt_request, on_progress=on_progress)
@@ -155,6 +155,8 @@ class AgentPromptRequest(BaseModel):
     output_file: str
     working_dir: Optional[str] = None
     disable_tools: bool = False  # Disable all tools (forces text-only response)
+    timeout_seconds: Optional[float] = None  # Wall-clock budget (None = default, 0 = none)
+    idle_timeout_seconds: Optional[float] = None  # Max silence on stdout (None = default, 0 = none)
 
 
 class AgentPromptResponse(BaseModel):
@@ -166,6 +168,31 @@ class AgentPromptResponse(BaseModel):
     retry_code: RetryCode = RetryCode.NONE
 
 
+class AgentProgress(BaseModel):
+    """Snapshot of an in-flight Claude Code run, built from its stream-json output."""
+
+    adw_id: str
+    agent_name: str
+    elapsed_seconds: float
+    messages: int = 0
+    turns: int = 0
+    tool_calls: int = 0
+    last_tool: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    session_id: Optional[str] = None
+
+    def summary(self) -> str:
+        """One-line human-readable progress summary."""
+        minutes, seconds = divmod(int(self.elapsed_seconds), 60)
+        last_tool = f" (last: {self.last_tool})" if self.last_tool else ""
+        return (
+            f"{minutes}m{seconds:02d}s elapsed, {self.turns} turns, "
+            f"{self.tool_calls} tool calls{last_tool}, "
+            f"{self.input_tokens + self.output_tokens} tokens"
+        )
+
+
 class AgentTemplateRequest(BaseModel):
     """Claude Code agent template execution request."""
 
@@ -285,3 +312,55 @@ class ADWExtractionResult(BaseModel):
     def has_workflow(self) -> bool:
         """Check if a workflow command was extracted."""
         return self.workflow_command is not None
+
+
+# Lifecycle of a job in the ADW scheduler queue
+ADWJobStatus = Literal["queued", "running", "succeeded", "failed", "lost"]
+
+
+class ADWJob(BaseModel):
+    """A workflow run queued in the ADW scheduler.
+
+    Stored in the scheduler's SQLite queue (agents/_scheduler/queue.sqlite3).
+    Times are epoch seconds.
+    """
+
+    id: int
+    workflow: str
+    issue_number: str
+    adw_id: Optional[str] = None
+    source: str = "manual"
+    cmd: List[str]
+    cwd: Optional[str] = None
+    status: ADWJobStatus = "queued"
+    enqueued_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    pid: Optional[int] = None
+    returncode: Optional[int] = None
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        """Time spent queued before a slot was free."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.enqueued_at
+
+
+class SchedulerStats(BaseModel):
+    """Queue depth, slot usage and recent wait times of the ADW scheduler."""
+
+    queued: int
+    running: int
+    max_slots: int
+    oldest_queued_seconds: float = 0.0
+    avg_wait_seconds: float = 0.0  # Jobs started in the last hour
+    max_wait_seconds: float = 0.0  # Jobs started in the last hour
+
+    def summary(self) -> str:
+        """One-line human-readable queue summary."""
+        return (
+            f"{self.running}/{self.max_slots} slots busy, {self.queued} queued "
+            f"(oldest {self.oldest_queued_seconds:.0f}s, "
+            f"avg wait {self.avg_wait_seconds:.0f}s over the last hour)"
+        )
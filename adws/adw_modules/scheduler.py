@@ -0,0 +1,348 @@
+"""Local job scheduler for ADW workflow runs.
+
+Triggers submit workflow runs to a persistent SQLite queue instead of
+launching them directly. Dispatchers (a background thread in each trigger
+process) start queued jobs as subprocesses while enforcing:
+
+- a global cap on concurrently running workflows (each workflow drives one
+  Claude Code agent at a time), shared by every dispatcher on the box;
+- per-issue serialization: at most one running job per issue;
+- fair ordering: issues served least recently go first, then FIFO.
+
+Jobs launched by a dispatcher that has since exited are adopted by the
+others: they keep their slot while the process is alive and are marked
+``lost`` once it is gone.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from adw_modules.data_types import ADWJob, SchedulerStats
+from adw_modules.utils import get_safe_subprocess_env
+
+# Project root, where the agents/ directory lives
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Queue database shared by every trigger on this machine
+SCHEDULER_DB = os.getenv(
+    "ADW_SCHEDULER_DB", os.path.join(PROJECT_ROOT, "agents", "_scheduler", "queue.sqlite3")
+)
+
+# Global cap on workflows (and so Claude Code agents) running at once
+MAX_CONCURRENT_WORKFLOWS = int(os.getenv("ADW_MAX_CONCURRENT_WORKFLOWS", "3"))
+
+# Seconds between dispatcher passes when nothing wakes it earlier
+POLL_INTERVAL = float(os.getenv("ADW_SCHEDULER_POLL_INTERVAL", "2"))
+
+# Finished jobs older than this many days are deleted from the queue
+RETENTION_DAYS = float(os.getenv("ADW_SCHEDULER_RETENTION_DAYS", "14"))
+
+# Window for the wait-time figures in SchedulerStats
+WAIT_WINDOW_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    workflow TEXT NOT NULL,
+    issue_number TEXT NOT NULL,
+    adw_id TEXT,
+    source TEXT NOT NULL,
+    cmd TEXT NOT NULL,
+    cwd TEXT,
+    status TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    pid INTEGER,
+    returncode INTEGER,
+    owner_pid INTEGER,
+    owner_token TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, enqueued_at);
+CREATE INDEX IF NOT EXISTS jobs_issue ON jobs (issue_number, started_at);
+"""
+
+# Queued jobs whose issue has nothing running, least recently served issue first
+_NEXT_JOB = """
+SELECT j.*, (
+    SELECT MAX(s.started_at) FROM jobs s WHERE s.issue_number = j.issue_number
+) AS last_started
+FROM jobs j
+WHERE j.status = 'queued'
+  AND j.issue_number NOT IN (SELECT issue_number FROM jobs WHERE status = 'running')
+ORDER BY last_started IS NOT NULL, last_started, j.enqueued_at, j.id
+LIMIT 1
+"""
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _row_to_job(row: sqlite3.Row) -> ADWJob:
+    data = {key: row[key] for key in row.keys() if key in ADWJob.model_fields}
+    data["cmd"] = json.loads(data["cmd"])
+    return ADWJob(**data)
+
+
+class ADWScheduler:
+    """Persistent ADW job queue with a slot-limited dispatcher."""
+
+    def __init__(
+        self,
+        db_path: str = SCHEDULER_DB,
+        max_slots: int = MAX_CONCURRENT_WORKFLOWS,
+        poll_interval: float = POLL_INTERVAL,
+        log_dir: Optional[str] = None,
+    ):
+        self.db_path = db_path
+        self.max_slots = max(1, max_slots)
+        self.poll_interval = poll_interval
+        self.log_dir = log_dir or os.path.join(os.path.dirname(db_path), "logs")
+        self.token = uuid.uuid4().hex
+        self.logger = logging.getLogger(__name__)
+        self._procs: Dict[int, subprocess.Popen] = {}
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit; _claim takes an explicit write lock where it matters
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(
+        self,
+        cmd: List[str],
+        issue_number: str,
+        workflow: str,
+        adw_id: Optional[str] = None,
+        cwd: Optional[str] = None,
+        source: str = "manual",
+    ) -> ADWJob:
+        """Queue a workflow run; it starts once a slot and its issue are free."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (workflow, issue_number, adw_id, source, cmd, cwd, status,"
+                " enqueued_at) VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)",
+                (workflow, str(issue_number), adw_id, source, json.dumps(cmd), cwd, time.time()),
+            )
+            job = self.get(cursor.lastrowid, conn)
+        self.logger.info(
+            f"Queued job {job.id}: {workflow} for issue #{issue_number} from {source}"
+        )
+        self._wake.set()
+        return job
+
+    def get(self, job_id: int, conn: Optional[sqlite3.Connection] = None) -> Optional[ADWJob]:
+        """Load a job by id."""
+        if conn is None:
+            with self._connect() as conn:
+                return self.get(job_id, conn)
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def jobs(self, status: Optional[str] = None, limit: int = 100) -> List[ADWJob]:
+        """Most recently queued jobs, optionally filtered by status."""
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?",
+                    (status, limit),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def position(self, job_id: int) -> Optional[int]:
+        """1-based place of a queued job in FIFO order, or None if not queued."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, enqueued_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None or row["status"] != "queued":
+                return None
+            (ahead,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+                " AND (enqueued_at < ? OR (enqueued_at = ? AND id < ?))",
+                (row["enqueued_at"], row["enqueued_at"], job_id),
+            ).fetchone()
+        return ahead + 1
+
+    def stats(self, now: Optional[float] = None) -> SchedulerStats:
+        """Queue depth, busy slots and recent wait times."""
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            queued, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(enqueued_at) FROM jobs WHERE status = 'queued'"
+            ).fetchone()
+            (running,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'running'"
+            ).fetchone()
+            avg_wait, max_wait = conn.execute(
+                "SELECT AVG(started_at - enqueued_at), MAX(started_at - enqueued_at)"
+                " FROM jobs WHERE started_at >= ?",
+                (now - WAIT_WINDOW_SECONDS,),
+            ).fetchone()
+        return SchedulerStats(
+            queued=queued,
+            running=running,
+            max_slots=self.max_slots,
+            oldest_queued_seconds=max(0.0, now - oldest) if oldest else 0.0,
+            avg_wait_seconds=avg_wait or 0.0,
+            max_wait_seconds=max_wait or 0.0,
+        )
+
+    def _finish(self, conn: sqlite3.Connection, job_id: int, status: str,
+                returncode: Optional[int]) -> None:
+        conn.execute(
+            "UPDATE jobs SET status = ?, returncode = ?, finished_at = ? WHERE id = ?",
+            (status, returncode, time.time(), job_id),
+        )
+
+    def _reap(self, conn: sqlite3.Connection) -> None:
+        """Record exited jobs, including ones orphaned by a dead dispatcher."""
+        for job_id, proc in list(self._procs.items()):
+            returncode = proc.poll()
+            if returncode is None:
+                continue
+            del self._procs[job_id]
+            self._finish(conn, job_id, "succeeded" if returncode == 0 else "failed", returncode)
+            self.logger.info(f"Job {job_id} exited with code {returncode}")
+
+        rows = conn.execute(
+            "SELECT id, pid, owner_pid, owner_token FROM jobs WHERE status = 'running'"
+        ).fetchall()
+        for row in rows:
+            if row["owner_token"] == self.token:
+                continue
+            if _pid_alive(row["owner_pid"]):
+                continue  # Another live dispatcher is watching it
+            if _pid_alive(row["pid"]):
+                continue  # Orphaned but still working; keeps its slot until it exits
+            self._finish(conn, row["id"], "lost", None)
+            self.logger.warning(f"Job {row['id']} lost: its process and dispatcher are gone")
+
+    def _claim(self, conn: sqlite3.Connection) -> Optional[ADWJob]:
+        """Atomically move the next eligible job to running, if a slot is free."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (running,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'running'"
+            ).fetchone()
+            row = conn.execute(_NEXT_JOB).fetchone() if running < self.max_slots else None
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, owner_pid = ?,"
+                " owner_token = ? WHERE id = ?",
+                (time.time(), os.getpid(), self.token, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"], conn)
+
+    def _launch(self, conn: sqlite3.Connection, job: ADWJob) -> None:
+        os.makedirs(self.log_dir, exist_ok=True)
+        log_path = os.path.join(self.log_dir, f"job_{job.id}.log")
+        try:
+            with open(log_path, "ab") as log_file:
+                proc = subprocess.Popen(
+                    job.cmd,
+                    cwd=job.cwd,
+                    env=get_safe_subprocess_env(),  # Pass only required environment variables
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,  # Survives a restart of this dispatcher
+                )
+        except OSError as e:
+            self._finish(conn, job.id, "failed", None)
+            self.logger.error(f"Failed to launch job {job.id}: {e}")
+            return
+        self._procs[job.id] = proc
+        conn.execute("UPDATE jobs SET pid = ? WHERE id = ?", (proc.pid, job.id))
+        self.logger.info(
+            f"Started job {job.id}: {job.workflow} for issue #{job.issue_number} "
+            f"(pid {proc.pid}, waited {job.wait_seconds:.0f}s, log {log_path})"
+        )
+
+    def dispatch_once(self) -> List[ADWJob]:
+        """Reap finished jobs and start queued ones while slots are free."""
+        started = []
+        with self._connect() as conn:
+            self._reap(conn)
+            while not self._stopping.is_set():
+                job = self._claim(conn)
+                if job is None:
+                    break
+                self._launch(conn, job)
+                started.append(self.get(job.id, conn))
+        return started
+
+    def prune(self, retention_days: float = RETENTION_DAYS) -> int:
+        """Delete finished jobs older than ``retention_days``."""
+        cutoff = time.time() - retention_days * 86400
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN ('queued', 'running')"
+                " AND finished_at < ?",
+                (cutoff,),
+            )
+        return cursor.rowcount
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.dispatch_once()
+            except Exception as e:
+                self.logger.error(f"Scheduler dispatch failed: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start dispatching in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self.prune()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="adw-scheduler", daemon=True)
+        self._thread.start()
+        self.logger.info(f"ADW scheduler started with {self.max_slots} slots ({self.db_path})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop dispatching. Running jobs continue and are adopted by the next dispatcher."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
@@ -6,16 +6,23 @@ import logging
 import os
 import subprocess
 import re
+import time
 from typing import Tuple, Optional
 from adw_modules.data_types import (
+    AgentProgress,
     AgentTemplateRequest,
     GitHubIssue,
     AgentPromptResponse,
     IssueClassSlashCommand,
     ADWExtractionResult,
 )
-from adw_modules.agent import execute_template
-from adw_modules.github import get_repo_url, extract_repo_path, ADW_BOT_IDENTIFIER
+from adw_modules.agent import ProgressCallback, execute_template
+from adw_modules.github import (
+    get_repo_url,
+    extract_repo_path,
+    make_issue_comment,
+    ADW_BOT_IDENTIFIER,
+)
 from adw_modules.state import ADWState
 from adw_modules.utils import parse_json
 
@@ -57,6 +64,52 @@ def format_issue_message(
     return f"{ADW_BOT_IDENTIFIER} {adw_id}_{agent_name}: {message}"
 
 
+# Minimum seconds between progress comments posted to an issue
+ISSUE_PROGRESS_INTERVAL = float(os.getenv("ADW_ISSUE_PROGRESS_INTERVAL", "300"))
+
+# Stop a long-running agent after this many turns (0 = no limit)
+MAX_AGENT_TURNS = int(os.getenv("ADW_MAX_AGENT_TURNS", "0"))
+
+
+def issue_progress_callback(
+    issue_number: str,
+    adw_id: str,
+    agent_name: str,
+    logger: logging.Logger,
+    min_interval: float = ISSUE_PROGRESS_INTERVAL,
+    max_turns: int = MAX_AGENT_TURNS,
+) -> ProgressCallback:
+    """Build an on_progress callback that reports a running agent on its issue.
+
+    Comments are posted at most every ``min_interval`` seconds. Once the agent
+    passes ``max_turns`` the callback returns False, which stops it.
+    """
+    last_posted = time.monotonic()
+
+    def post(message: str) -> None:
+        try:
+            make_issue_comment(issue_number, format_issue_message(adw_id, agent_name, message))
+        except Exception as e:
+            logger.warning(f"Failed to post progress comment: {e}")
+
+    def on_progress(progress: AgentProgress) -> bool:
+        nonlocal last_posted
+        if max_turns and progress.turns > max_turns:
+            logger.warning(
+                f"{agent_name} exceeded {max_turns} turns ({progress.summary()}), stopping"
+            )
+            post(f"❌ Stopped after {max_turns} turns: {progress.summary()}")
+            return False
+
+        now = time.monotonic()
+        if now - last_posted >= min_interval:
+            last_posted = now
+            post(f"⏳ {progress.summary()}")
+        return True
+
+    return on_progress
+
+
 def _fallback_extract_adw_info(text: str) -> ADWExtractionResult:
     """Attempt regex-based extraction of ADW info when JSON parsing fails.
 
@@ -284,6 +337,7 @@ def implement_plan(
     logger: logging.Logger,
     agent_name: Optional[str] = None,
     working_dir: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None,
 ) -> AgentPromptResponse:
     """Implement the plan using the /implement command."""
     # Use provided agent_name or default to AGENT_IMPLEMENTOR
@@ -301,7 +355,7 @@ def implement_plan(
         f"implement_template_request: {implement_template_request.model_dump_json(indent=2, by_alias=True)}"
     )
 
-    implement_response = execute_template(implement_template_request)
+    implement_response = execute_template(implement_template_request, on_progress)
 
     logger.debug(
         f"implement_response: {implement_response.model_dump_json(indent=2, by_alias=True)}"
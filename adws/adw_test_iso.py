@@ -35,7 +35,7 @@ from adw_modules.data_types import (
     E2ETestResult,
     IssueClassSlashCommand,
 )
-from adw_modules.agent import execute_template
+from adw_modules.agent import ProgressCallback, execute_template
 from adw_modules.github import (
     extract_repo_path,
     fetch_issue,
@@ -50,6 +50,7 @@ from adw_modules.workflow_ops import (
     create_commit,
     ensure_adw_id,
     classify_issue,
+    issue_progress_callback,
 )
 from adw_modules.worktree_ops import validate_worktree
 
@@ -65,7 +66,12 @@ MAX_E2E_TEST_RETRY_ATTEMPTS = 2  # E2E ui tests
 
 
 
-def run_tests(adw_id: str, logger: logging.Logger, working_dir: Optional[str] = None) -> AgentPromptResponse:
+def run_tests(
+    adw_id: str,
+    logger: logging.Logger,
+    working_dir: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> AgentPromptResponse:
     """Run the test suite using the /test command."""
     test_template_request = AgentTemplateRequest(
         agent_name=AGENT_TESTER,
@@ -79,7 +85,7 @@ def run_tests(adw_id: str, logger: logging.Logger, working_dir: Optional[str] =
         f"test_template_request: {test_template_request.model_dump_json(indent=2, by_alias=True)}"
     )
 
-    test_response = execute_template(test_template_request)
+    test_response = execute_template(test_template_request, on_progress)
 
     logger.debug(
         f"test_response: {test_response.model_dump_json(indent=2, by_alias=True)}"
@@ -242,7 +248,12 @@ def post_comprehensive_test_summary(
     logger.info(f"Posted comprehensive test results summary to issue #{issue_number}")
 
 
-def run_e2e_tests(adw_id: str, logger: logging.Logger, working_dir: Optional[str] = None) -> AgentPromptResponse:
+def run_e2e_tests(
+    adw_id: str,
+    logger: logging.Logger,
+    working_dir: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> AgentPromptResponse:
     """Run the E2E test suite using the /test_e2e command.
     
     Note: The test_e2e command will automatically detect and use ports from .ports.env
@@ -260,7 +271,7 @@ def run_e2e_tests(adw_id: str, logger: logging.Logger, working_dir: Optional[str
         f"e2e_test_template_request: {test_template_request.model_dump_json(indent=2, by_alias=True)}"
     )
 
-    test_response = execute_template(test_template_request)
+    test_response = execute_template(test_template_request, on_progress)
 
     logger.debug(
         f"e2e_test_response: {test_response.model_dump_json(indent=2, by_alias=True)}"
@@ -315,7 +326,10 @@ def resolve_failed_tests(
         )
 
         # Execute resolution
-        response = execute_template(resolve_request)
+        response = execute_template(
+            resolve_request,
+            issue_progress_callback(issue_number, adw_id, agent_name, logger),
+        )
 
         if response.success:
             resolved_count += 1
@@ -365,7 +379,12 @@ def run_tests_with_resolution(
         logger.info(f"\n=== Test Run Attempt {attempt}/{max_attempts} ===")
 
         # Run tests in worktree
-        test_response = run_tests(adw_id, logger, worktree_path)
+        test_response = run_tests(
+            adw_id,
+            logger,
+            worktree_path,
+            on_progress=issue_progress_callback(issue_number, adw_id, AGENT_TESTER, logger),
+        )
 
         # If there was a high level - non-test related error, stop and report it
         if not test_response.success:
@@ -499,7 +518,10 @@ def resolve_failed_e2e_tests(
         )
 
         # Execute resolution
-        response = execute_template(resolve_request)
+        response = execute_template(
+            resolve_request,
+            issue_progress_callback(issue_number, adw_id, agent_name, logger),
+        )
 
         if response.success:
             resolved_count += 1
@@ -548,7 +570,12 @@ def run_e2e_tests_with_resolution(
         logger.info(f"\n=== E2E Test Run Attempt {attempt}/{max_attempts} ===")
 
         # Run E2E tests (will auto-detect ports from .ports.env in worktree)
-        e2e_response = run_e2e_tests(adw_id, logger, worktree_path)
+        e2e_response = run_e2e_tests(
+            adw_id,
+            logger,
+            worktree_path,
+            on_progress=issue_progress_callback(issue_number, adw_id, AGENT_E2E_TESTER, logger),
+        )
 
         if not e2e_response.success:
             logger.error(f"Error running E2E tests: {e2e_response.output}")
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""Test incremental stream-json parsing and progress reporting in prompt_claude_code.
+
+Runs prompt_claude_code against a fake Claude Code CLI that prints a
+canned stream-json transcript, so no real agent is needed.
+
+Run: python adws/adw_tests/test_agent_stream.py
+"""
+
+import asyncio
+import io
+import json
+import logging
+import os
+import stat
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import agent
+from adw_modules.agent import (
+    ClaudeStreamState,
+    JsonArrayWriter,
+    build_agent_response,
+    get_timeout_for_slash_command,
+    prompt_claude_code,
+    run_claude_code_async,
+)
+from adw_modules import workflow_ops
+from adw_modules.data_types import AgentPromptRequest, AgentPromptResponse, RetryCode
+
+TRANSCRIPT = [
+    {"type": "system", "subtype": "init", "session_id": "sess-1"},
+    {"type": "assistant", "message": {"content": [{"type": "text", "text": "Working on it"}]}},
+    {"type": "result", "subtype": "success", "is_error": False, "result": "All done", "session_id": "sess-1"},
+]
+
+
+def assistant(message_id, *content, input_tokens=10, output_tokens=5):
+    return {
+        "type": "assistant",
+        "message": {
+            "id": message_id,
+            "content": list(content),
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        },
+    }
+
+
+def tool_use(name):
+    return {"type": "tool_use", "name": name, "input": {}}
+
+
+# One API message per turn; msg_2 is streamed as two lines
+WORKING_TRANSCRIPT = [
+    TRANSCRIPT[0],
+    assistant("msg_1", tool_use("Read")),
+    assistant("msg_2", {"type": "text", "text": "Editing"}),
+    assistant("msg_2", tool_use("Edit")),
+    assistant("msg_3", tool_use("Bash")),
+    TRANSCRIPT[2],
+]
+
+
+def make_fake_claude(tmp_dir, lines, exit_code=0, stderr="", then=""):
+    """Write an executable that mimics `claude -p ... --output-format stream-json`.
+
+    ``then`` is Python run after the transcript is printed, e.g. to hang.
+    """
+    path = os.path.join(tmp_dir, "fake_claude")
+    with open(path, "w") as f:
+        f.write(f"#!{sys.executable}\n")
+        f.write("import subprocess, sys, time\n")
+        f.write("if '--version' in sys.argv: print('1.0'); sys.exit(0)\n")
+        f.write(f"for line in {lines!r}: print(line, flush=True)\n")
+        f.write(then + "\n")
+        f.write(f"sys.stderr.write({stderr!r})\n")
+        f.write(f"sys.exit({exit_code})\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def make_request(tmp_dir):
+    output_file = os.path.join(tmp_dir, "raw_output.jsonl")
+    return AgentPromptRequest(prompt="hello", adw_id="test1234", output_file=output_file)
+
+
+def run_fake(lines, exit_code=0, stderr=""):
+    tmp_dir = tempfile.mkdtemp()
+    request = make_request(tmp_dir)
+    output_file = request.output_file
+    original = agent.CLAUDE_PATH
+    agent.CLAUDE_PATH = make_fake_claude(tmp_dir, lines, exit_code, stderr)
+    try:
+        return prompt_claude_code(request), output_file
+    finally:
+        agent.CLAUDE_PATH = original
+
+
+def test_state_keeps_only_running_summary():
+    """The parser keeps the result, session and a bounded tail."""
+    print("Testing ClaudeStreamState...")
+    state = ClaudeStreamState(recent_limit=2)
+    for message in TRANSCRIPT:
+        state.feed(json.dumps(message) + "\n")
+    state.feed("not json\n")
+    state.feed("\n")
+
+    assert state.message_count == 3
+    assert state.session_id == "sess-1"
+    assert state.result_message["result"] == "All done"
+    assert len(state.recent) == 2
+    assert state.last_line == "not json"
+    print("  PASS")
+
+
+def test_json_array_writer_matches_json_dump():
+    """The streamed .json copy is byte-identical to json.dump(indent=2)."""
+    print("Testing JsonArrayWriter...")
+    for messages in (TRANSCRIPT, []):
+        buf = io.StringIO()
+        writer = JsonArrayWriter(buf)
+        for message in messages:
+            writer.append(message)
+        writer.close()
+        assert buf.getvalue() == json.dumps(messages, indent=2)
+    print("  PASS")
+
+
+def test_successful_run():
+    """A finished run yields the result text and writes both output files."""
+    print("Testing successful run...")
+    response, output_file = run_fake([json.dumps(m) for m in TRANSCRIPT])
+    assert response.success, response.output
+    assert response.output == "All done"
+    assert response.session_id == "sess-1"
+    with open(output_file) as f:
+        assert len(f.readlines()) == 3
+    with open(output_file.replace(".jsonl", ".json")) as f:
+        assert json.load(f) == TRANSCRIPT
+    print("  PASS")
+
+
+def test_missing_result_uses_last_assistant_text():
+    print("Testing run without result message...")
+    response, _ = run_fake([json.dumps(m) for m in TRANSCRIPT[:2]])
+    assert not response.success
+    assert response.output == "Claude Code output: Working on it"
+    assert response.retry_code == RetryCode.NONE
+    print("  PASS")
+
+
+def test_failed_run_reports_stderr():
+    print("Testing failed run...")
+    response, _ = run_fake([], exit_code=2, stderr="boom")
+    assert not response.success
+    assert response.output == "Claude Code error: boom"
+    assert response.retry_code == RetryCode.CLAUDE_CODE_ERROR
+    print("  PASS")
+
+
+def test_error_during_execution():
+    print("Testing error_during_execution result...")
+    state = ClaudeStreamState()
+    state.feed(json.dumps({"type": "result", "subtype": "error_during_execution", "session_id": "s"}))
+    response = build_agent_response(state, 0)
+    assert response.retry_code == RetryCode.ERROR_DURING_EXECUTION
+    assert response.session_id == "s"
+    print("  PASS")
+
+
+def test_progress_counts_turns_tools_and_tokens():
+    """Lines sharing a message id count as one turn and their usage once."""
+    print("Testing progress tracking...")
+    state = ClaudeStreamState()
+    for message in WORKING_TRANSCRIPT:
+        state.feed(json.dumps(message))
+    progress = state.progress("test1234", "ops")
+    assert (progress.turns, progress.tool_calls, progress.last_tool) == (3, 3, "Bash")
+    assert (progress.input_tokens, progress.output_tokens) == (30, 15)
+    assert progress.session_id == "sess-1"
+    assert "3 turns, 3 tool calls (last: Bash), 45 tokens" in progress.summary()
+    print("  PASS")
+
+
+def test_progress_reported_while_running():
+    """Progress is logged to the ADW logger and passed to the callback."""
+    print("Testing progress callback...")
+    tmp_dir = tempfile.mkdtemp()
+    fake = make_fake_claude(tmp_dir, [json.dumps(m) for m in WORKING_TRANSCRIPT])
+    request = make_request(tmp_dir)
+    seen = []
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("adw_test1234")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        response = asyncio.run(
+            run_claude_code_async([fake], request, dict(os.environ), seen.append, 0)
+        )
+    finally:
+        logger.removeHandler(handler)
+
+    assert response.success, response.output
+    assert len(seen) == len(WORKING_TRANSCRIPT)
+    assert seen[-2].tool_calls == 3
+    assert any("tool calls" in r.getMessage() for r in records)
+    print("  PASS")
+
+
+def test_callback_can_stop_agent():
+    """Returning False from the callback kills the agent with a non-retryable failure."""
+    print("Testing stop from progress callback...")
+    tmp_dir = tempfile.mkdtemp()
+    fake = make_fake_claude(tmp_dir, [json.dumps(m) for m in WORKING_TRANSCRIPT])
+    request = make_request(tmp_dir)
+    response = asyncio.run(
+        run_claude_code_async(
+            [fake], request, dict(os.environ), lambda p: p.turns < 2, 0
+        )
+    )
+    assert not response.success
+    assert response.retry_code == RetryCode.NONE
+    assert "stopped by progress monitor" in response.output
+    print("  PASS")
+
+
+def test_issue_progress_callback_throttles_and_caps_turns():
+    print("Testing issue_progress_callback...")
+    state = ClaudeStreamState()
+    for message in WORKING_TRANSCRIPT:
+        state.feed(json.dumps(message))
+    comments = []
+    original = workflow_ops.make_issue_comment
+    workflow_ops.make_issue_comment = lambda issue, body: comments.append(body)
+    try:
+        quiet = workflow_ops.issue_progress_callback(
+            "7", "test1234", "ops", logging.getLogger("test"), min_interval=3600
+        )
+        assert quiet(state.progress("test1234", "ops")) is True
+        assert comments == []
+
+        capped = workflow_ops.issue_progress_callback(
+            "7", "test1234", "ops", logging.getLogger("test"), min_interval=0, max_turns=2
+        )
+        assert capped(state.progress("test1234", "ops")) is False
+        assert "Stopped after 2 turns" in comments[-1]
+    finally:
+        workflow_ops.make_issue_comment = original
+    print("  PASS")
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A killed child the fake never reaped shows up as a zombie
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split()[2] != "Z"
+    except OSError:
+        return True
+
+
+def test_idle_timeout_kills_process_group():
+    """A silent agent is killed with its tool subprocesses and reported as a timeout."""
+    print("Testing idle timeout...")
+    tmp_dir = tempfile.mkdtemp()
+    pid_file = os.path.join(tmp_dir, "child.pid")
+    hang = (
+        "child = subprocess.Popen(['sleep', '60'])\n"
+        f"open({pid_file!r}, 'w').write(str(child.pid))\n"
+        "time.sleep(60)"
+    )
+    fake = make_fake_claude(tmp_dir, [json.dumps(m) for m in TRANSCRIPT[:2]], then=hang)
+    request = make_request(tmp_dir).model_copy(update={"idle_timeout_seconds": 0.5})
+
+    started = time.monotonic()
+    response = asyncio.run(run_claude_code_async([fake], request, dict(os.environ)))
+    assert time.monotonic() - started < 10
+    assert not response.success
+    assert response.retry_code == RetryCode.TIMEOUT_ERROR
+    assert "no output for" in response.output
+    assert response.session_id == "sess-1"
+
+    with open(pid_file) as f:
+        child_pid = int(f.read())
+    for _ in range(50):
+        if not pid_alive(child_pid):
+            break
+        time.sleep(0.1)
+    assert not pid_alive(child_pid), "tool subprocess survived the kill"
+    print("  PASS")
+
+
+def test_wall_clock_timeout():
+    """Steady output does not keep an agent alive past its budget."""
+    print("Testing wall-clock timeout...")
+    tmp_dir = tempfile.mkdtemp()
+    chatter = f"while True: print({json.dumps(json.dumps(TRANSCRIPT[1]))}, flush=True); time.sleep(0.1)"
+    fake = make_fake_claude(tmp_dir, [], then=chatter)
+    request = make_request(tmp_dir).model_copy(
+        update={"timeout_seconds": 1, "idle_timeout_seconds": 5}
+    )
+    response = asyncio.run(run_claude_code_async([fake], request, dict(os.environ)))
+    assert response.retry_code == RetryCode.TIMEOUT_ERROR
+    assert "wall-clock budget" in response.output
+    print("  PASS")
+
+
+def test_timeout_is_not_retried():
+    """A run killed for its timeout fails at once instead of restarting the clock."""
+    print("Testing timeouts are not retried...")
+    tmp_dir = tempfile.mkdtemp()
+    calls = []
+
+    def timed_out(request, on_progress=None):
+        calls.append(request)
+        return AgentPromptResponse(
+            output="Error: Claude Code produced no output for 1s",
+            success=False,
+            retry_code=RetryCode.TIMEOUT_ERROR,
+        )
+
+    original = agent.prompt_claude_code
+    agent.prompt_claude_code = timed_out
+    try:
+        response = agent.prompt_claude_code_with_retry(make_request(tmp_dir), retry_delays=[0, 0, 0])
+    finally:
+        agent.prompt_claude_code = original
+    assert len(calls) == 1
+    assert response.retry_code == RetryCode.TIMEOUT_ERROR
+    print("  PASS")
+
+
+def test_slash_command_budgets():
+    print("Testing per-command timeouts...")
+    assert get_timeout_for_slash_command("/classify_issue") < get_timeout_for_slash_command("/implement")
+    assert get_timeout_for_slash_command("/unknown") == agent.DEFAULT_TIMEOUT
+    print("  PASS")
+
+
+def main():
+    print("=" * 60)
+    print("Agent stream-json Parsing and Progress Tests")
+    print("=" * 60)
+
+    tests = [
+        test_state_keeps_only_running_summary,
+        test_json_array_writer_matches_json_dump,
+        test_successful_run,
+        test_missing_result_uses_last_assistant_text,
+        test_failed_run_reports_stderr,
+        test_error_during_execution,
+        test_progress_counts_turns_tools_and_tokens,
+        test_progress_reported_while_running,
+        test_callback_can_stop_agent,
+        test_issue_progress_callback_throttles_and_caps_turns,
+        test_idle_timeout_kills_process_group,
+        test_wall_clock_timeout,
+        test_timeout_is_not_retried,
+        test_slash_command_budgets,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        print()
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAIL: {e}")
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    if failed > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Test the ADW job scheduler: slot cap, per-issue serialization and fair ordering.
+
+Jobs are short Python subprocesses and the queue lives in a temp directory,
+so no workflows or GitHub access are needed.
+
+Run: python adws/adw_tests/test_scheduler.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.scheduler import ADWScheduler
+
+
+def sleeper(seconds=0.3):
+    return [sys.executable, "-c", f"import time; time.sleep({seconds})"]
+
+
+def make_scheduler(max_slots=2, db_path=None):
+    db_path = db_path or os.path.join(tempfile.mkdtemp(), "queue.sqlite3")
+    return ADWScheduler(db_path=db_path, max_slots=max_slots, poll_interval=0.05)
+
+
+def drain(scheduler, timeout=10):
+    """Dispatch until nothing is queued or running; return max concurrency seen."""
+    peak = 0
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        scheduler.dispatch_once()
+        stats = scheduler.stats()
+        peak = max(peak, stats.running)
+        if stats.queued == 0 and stats.running == 0:
+            return peak
+        time.sleep(0.05)
+    raise AssertionError("queue did not drain")
+
+
+def test_global_slot_cap():
+    """No more than max_slots jobs run at once."""
+    print("Testing global slot cap...")
+    scheduler = make_scheduler(max_slots=2)
+    for issue in range(5):
+        scheduler.submit(sleeper(), str(issue), "adw_plan_iso")
+
+    started = scheduler.dispatch_once()
+    assert len(started) == 2
+    assert all(job.pid for job in started)
+    assert scheduler.stats().queued == 3
+
+    assert drain(scheduler) <= 2
+    assert {job.status for job in scheduler.jobs()} == {"succeeded"}
+    print("  PASS")
+
+
+def test_per_issue_serialization():
+    """A second run for an issue waits for the first even with slots free."""
+    print("Testing per-issue serialization...")
+    scheduler = make_scheduler(max_slots=3)
+    first = scheduler.submit(sleeper(), "7", "adw_plan_iso")
+    second = scheduler.submit(sleeper(0), "7", "adw_build_iso")
+
+    assert [job.id for job in scheduler.dispatch_once()] == [first.id]
+    assert scheduler.get(second.id).status == "queued"
+
+    drain(scheduler)
+    assert scheduler.get(second.id).started_at >= scheduler.get(first.id).finished_at
+    print("  PASS")
+
+
+def test_fair_ordering_across_issues():
+    """An issue with a backlog does not starve one that has not been served."""
+    print("Testing fair ordering...")
+    scheduler = make_scheduler(max_slots=1)
+    a1 = scheduler.submit(sleeper(0), "1", "adw_plan_iso")
+    a2 = scheduler.submit(sleeper(0), "1", "adw_build_iso")
+    b1 = scheduler.submit(sleeper(0), "2", "adw_plan_iso")
+
+    order = []
+    while len(order) < 3:
+        order.extend(job.id for job in scheduler.dispatch_once())
+        time.sleep(0.05)
+    assert order[:2] == [a1.id, b1.id], order
+    assert order[2] == a2.id
+    drain(scheduler)
+    print("  PASS")
+
+
+def test_queue_persists_and_reports_waits():
+    """Queued jobs survive a restart; depth, position and wait time are visible."""
+    print("Testing persistence and stats...")
+    db_path = os.path.join(tempfile.mkdtemp(), "queue.sqlite3")
+    first = make_scheduler(max_slots=1, db_path=db_path)
+    job = first.submit(sleeper(0), "3", "adw_plan_iso", adw_id="abc12345", source="webhook")
+    later = first.submit(sleeper(0), "4", "adw_plan_iso")
+    assert first.position(job.id) == 1
+    assert first.position(later.id) == 2
+
+    restarted = make_scheduler(max_slots=1, db_path=db_path)
+    stats = restarted.stats(now=job.enqueued_at + 30)
+    assert (stats.queued, stats.running, stats.max_slots) == (2, 0, 1)
+    assert stats.oldest_queued_seconds >= 30
+
+    [started] = restarted.dispatch_once()
+    assert started.adw_id == "abc12345"
+    assert started.wait_seconds >= 0
+    assert restarted.position(job.id) is None
+    drain(restarted)
+    print("  PASS")
+
+
+def test_orphaned_jobs_adopted_or_lost():
+    """Jobs of a dead dispatcher keep their slot while alive and are marked lost after."""
+    print("Testing orphan recovery...")
+    scheduler = make_scheduler(max_slots=1)
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    orphan = subprocess.Popen(sleeper(0.5))
+
+    job = scheduler.submit(sleeper(0), "9", "adw_plan_iso")
+    queued = scheduler.submit(sleeper(0), "10", "adw_plan_iso")
+    with scheduler._connect() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'running', started_at = ?, pid = ?, owner_pid = ?,"
+            " owner_token = 'gone' WHERE id = ?",
+            (time.time(), orphan.pid, dead.pid, job.id),
+        )
+
+    # Still alive: it holds the only slot
+    assert scheduler.dispatch_once() == []
+    orphan.wait()
+    drain(scheduler)
+    assert scheduler.get(job.id).status == "lost"
+    assert scheduler.get(queued.id).status == "succeeded"
+    print("  PASS")
+
+
+def test_background_dispatcher():
+    print("Testing background dispatcher...")
+    scheduler = make_scheduler(max_slots=2)
+    scheduler.start()
+    try:
+        job = scheduler.submit(sleeper(0), "11", "adw_plan_iso")
+        deadline = time.monotonic() + 10
+        while scheduler.get(job.id).status != "succeeded":
+            assert time.monotonic() < deadline, "job never finished"
+            time.sleep(0.05)
+    finally:
+        scheduler.stop()
+    print("  PASS")
+
+
+def main():
+    print("=" * 60)
+    print("ADW Scheduler Tests")
+    print("=" * 60)
+
+    tests = [
+        test_global_slot_cap,
+        test_per_issue_serialization,
+        test_fair_ordering_across_issues,
+        test_queue_persists_and_reports_waits,
+        test_orphaned_jobs_adopted_or_lost,
+        test_background_dispatcher,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        print()
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAIL: {e}")
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    if failed > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,12 +15,13 @@ This script polls GitHub every 20 seconds to detect:
 1. New issues without comments
 2. Issues where the latest comment contains 'adw'
 
-When a qualifying issue is found, it triggers the existing manual workflow script.
+When a qualifying issue is found, it queues the existing manual workflow script
+on the ADW scheduler, which runs it in the background within the global
+concurrency cap shared with the webhook trigger.
 """
 
 import os
 import signal
-import subprocess
 import sys
 import time
 from pathlib import Path
@@ -31,7 +32,7 @@ from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from adw_modules.utils import get_safe_subprocess_env
+from adw_modules.scheduler import ADWScheduler
 
 from adw_modules.github import fetch_open_issues, fetch_issue_comments, get_repo_url, extract_repo_path
 
@@ -95,39 +96,33 @@ def should_process_issue(issue_number: int) -> bool:
     return False
 
 
-def trigger_adw_workflow(issue_number: int) -> bool:
-    """Trigger the ADW plan and build workflow for a specific issue."""
+def trigger_adw_workflow(issue_number: int, scheduler: ADWScheduler) -> bool:
+    """Queue the ADW plan and build workflow for a specific issue."""
     try:
         script_path = Path(__file__).parent.parent / "adw_plan_build_iso.py"
         
-        print(f"INFO: Triggering ADW workflow for issue #{issue_number}")
-        
         cmd = [sys.executable, str(script_path), str(issue_number)]
         
-        # Run the manual trigger script with filtered environment
-        result = subprocess.run(
+        # The scheduler runs it with a filtered environment once a slot is free
+        job = scheduler.submit(
             cmd,
-            capture_output=True,
-            text=True,
-            cwd=script_path.parent,
-            env=get_safe_subprocess_env()
+            issue_number=str(issue_number),
+            workflow="adw_plan_build_iso",
+            cwd=str(script_path.parent),
+            source="cron",
         )
-        
-        if result.returncode == 0:
-            print(f"INFO: Successfully triggered workflow for issue #{issue_number}")
-            # DEBUG level - not printing output
-            return True
-        else:
-            print(f"ERROR: Failed to trigger workflow for issue #{issue_number}")
-            print(f"ERROR: {result.stderr}")
-            return False
+        print(
+            f"INFO: Queued ADW workflow for issue #{issue_number} as job {job.id} "
+            f"(position {scheduler.position(job.id)})"
+        )
+        return True
             
     except Exception as e:
-        print(f"ERROR: Exception while triggering workflow for issue #{issue_number}: {e}")
+        print(f"ERROR: Exception while queueing workflow for issue #{issue_number}: {e}")
         return False
 
 
-def check_and_process_issues():
+def check_and_process_issues(scheduler: ADWScheduler):
     """Main function that checks for issues and processes qualifying ones."""
     if shutdown_requested:
         print(f"INFO: Shutdown requested, skipping check cycle")
@@ -171,7 +166,7 @@ def check_and_process_issues():
                     break
                 
                 # Trigger the workflow
-                if trigger_adw_workflow(issue_number):
+                if trigger_adw_workflow(issue_number, scheduler):
                     processed_issues.add(issue_number)
                 else:
                     print(f"WARNING: Failed to process issue #{issue_number}, will retry in next cycle")
@@ -182,6 +177,7 @@ def check_and_process_issues():
         cycle_time = time.time() - start_time
         print(f"INFO: Check cycle completed in {cycle_time:.2f} seconds")
         print(f"INFO: Total processed issues in session: {len(processed_issues)}")
+        print(f"INFO: Scheduler: {scheduler.stats().summary()}")
         
     except Exception as e:
         print(f"ERROR: Error during check cycle: {e}")
@@ -195,15 +191,22 @@ def main():
     print(f"INFO: Repository: {REPO_PATH}")
     print(f"INFO: Polling interval: 20 seconds")
     
+    # Queue shared with the webhook trigger; this process dispatches from it too
+    scheduler = ADWScheduler()
+    print(f"INFO: Max concurrent workflows: {scheduler.max_slots}")
+    
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
+    # Start workflows from the shared queue in the background
+    scheduler.start()
+    
     # Schedule the check function
-    schedule.every(20).seconds.do(check_and_process_issues)
+    schedule.every(20).seconds.do(check_and_process_issues, scheduler)
     
     # Run initial check immediately
-    check_and_process_issues()
+    check_and_process_issues(scheduler)
     
     # Main loop
     print(f"INFO: Entering main scheduling loop")
@@ -211,6 +214,8 @@ def main():
         schedule.run_pending()
         time.sleep(1)
     
+    # Running workflows keep going; the next dispatcher picks them up
+    scheduler.stop()
     print(f"INFO: Shutdown complete")
 
 
@@ -221,8 +226,9 @@ if __name__ == "__main__":
         print("\nUsage: ./trigger_cron.py")
         print("\nEnvironment variables:")
         print("  GITHUB_PAT - (Optional) GitHub Personal Access Token")
+        print("  ADW_MAX_CONCURRENT_WORKFLOWS - (Optional) Workflows allowed to run at once (default: 3)")
         print("\nThe script will poll GitHub issues every 20 seconds and trigger")
-        print("the ADW workflow for qualifying issues.")
+        print("the ADW workflow for qualifying issues via the shared ADW scheduler queue.")
         print("\nNote: Repository URL is automatically detected from git remote.")
         sys.exit(0)
     
@@ -7,19 +7,22 @@
 GitHub Webhook Trigger - AI Developer Workflow (ADW)
 
 FastAPI webhook endpoint that receives GitHub issue events and triggers ADW workflows.
-Responds immediately to meet GitHub's 10-second timeout by launching workflows
-in the background. Supports both standard and isolated workflows.
+Responds immediately to meet GitHub's 10-second timeout by queueing workflows
+on the ADW scheduler, which runs them in the background within the global
+concurrency cap. Supports both standard and isolated workflows.
 
 Usage: uv run trigger_webhook.py
 
 Environment Requirements:
 - PORT: Server port (default: 8001)
+- ADW_MAX_CONCURRENT_WORKFLOWS: Workflows allowed to run at once (default: 3)
 - All workflow requirements (GITHUB_PAT, ANTHROPIC_API_KEY, etc.)
 """
 
 import os
 import subprocess
 import sys
+from contextlib import asynccontextmanager
 from typing import Optional
 from fastapi import FastAPI, Request
 from dotenv import load_dotenv
@@ -28,10 +31,11 @@ import uvicorn
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from adw_modules.utils import make_adw_id, setup_logger, get_safe_subprocess_env
+from adw_modules.utils import make_adw_id, setup_logger
 from adw_modules.github import make_issue_comment, ADW_BOT_IDENTIFIER
 from adw_modules.workflow_ops import extract_adw_info, AVAILABLE_ADW_WORKFLOWS
 from adw_modules.state import ADWState
+from adw_modules.scheduler import ADWScheduler
 
 # Load environment variables
 load_dotenv()
@@ -49,9 +53,21 @@ DEPENDENT_WORKFLOWS = [
     "adw_ship_iso",
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Queue shared with the cron trigger; this process dispatches from it too
+    app.state.scheduler = ADWScheduler()
+    app.state.scheduler.start()
+    yield
+    app.state.scheduler.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
-    title="ADW Webhook Trigger", description="GitHub webhook endpoint for ADW"
+    title="ADW Webhook Trigger",
+    description="GitHub webhook endpoint for ADW",
+    lifespan=lifespan,
 )
 
 print(f"Starting ADW Webhook Trigger on port {PORT}")
@@ -204,6 +220,33 @@ async def github_webhook(request: Request):
             if provided_adw_id:
                 logger.info(f"Using provided ADW ID: {provided_adw_id}")
 
+            # Build command to run the appropriate workflow
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            adws_dir = os.path.dirname(script_dir)
+            repo_root = os.path.dirname(adws_dir)  # Go up to repository root
+            trigger_script = os.path.join(adws_dir, f"{workflow}.py")
+
+            cmd = ["uv", "run", trigger_script, str(issue_number), adw_id]
+
+            # Queue the run; the scheduler starts it once a slot and the issue are free.
+            # It runs from the repository root, where .claude/commands/ is located.
+            scheduler: ADWScheduler = request.app.state.scheduler
+            job = scheduler.submit(
+                cmd,
+                issue_number=str(issue_number),
+                workflow=workflow,
+                adw_id=adw_id,
+                cwd=repo_root,
+                source="webhook",
+            )
+            queue_position = scheduler.position(job.id)
+            queue_stats = scheduler.stats()
+
+            print(f"Queued {workflow} for issue #{issue_number} as job {job.id}")
+            print(f"Command: {' '.join(cmd)} (reason: {trigger_reason})")
+            print(f"Scheduler: {queue_stats.summary()}")
+            logger.info(f"Queued as scheduler job {job.id}: {queue_stats.summary()}")
+
             # Post comment to issue about detected workflow
             try:
                 make_issue_comment(
@@ -212,46 +255,25 @@ async def github_webhook(request: Request):
                     f"Starting workflow with ID: `{adw_id}`\n"
                     f"Workflow: `{workflow}` 🏗️\n"
                     f"Model Set: `{model_set}` ⚙️\n"
-                    f"Reason: {trigger_reason}\n\n"
+                    f"Reason: {trigger_reason}\n"
+                    f"Queue: {queue_stats.summary()} 🚦\n\n"
                     f"Logs will be available at: `agents/{adw_id}/{workflow}/`",
                 )
             except Exception as e:
                 logger.warning(f"Failed to post issue comment: {e}")
 
-            # Build command to run the appropriate workflow
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            adws_dir = os.path.dirname(script_dir)
-            repo_root = os.path.dirname(adws_dir)  # Go up to repository root
-            trigger_script = os.path.join(adws_dir, f"{workflow}.py")
-
-            cmd = ["uv", "run", trigger_script, str(issue_number), adw_id]
-
-            print(f"Launching {workflow} for issue #{issue_number}")
-            print(f"Command: {' '.join(cmd)} (reason: {trigger_reason})")
-            print(f"Working directory: {repo_root}")
-
-            # Launch in background using Popen with filtered environment
-            process = subprocess.Popen(
-                cmd,
-                cwd=repo_root,  # Run from repository root where .claude/commands/ is located
-                env=get_safe_subprocess_env(),  # Pass only required environment variables
-                start_new_session=True,
-            )
-
-            print(
-                f"Background process started for issue #{issue_number} with ADW ID: {adw_id}"
-            )
-            print(f"Logs will be written to: agents/{adw_id}/{workflow}/execution.log")
-
             # Return immediately
             return {
                 "status": "accepted",
                 "issue": issue_number,
                 "adw_id": adw_id,
                 "workflow": workflow,
-                "message": f"ADW {workflow} triggered for issue #{issue_number}",
+                "message": f"ADW {workflow} queued for issue #{issue_number}",
                 "reason": trigger_reason,
                 "logs": f"agents/{adw_id}/{workflow}/",
+                "job_id": job.id,
+                "queue_position": queue_position,
+                "queue": queue_stats.model_dump(),
             }
         else:
             print(
@@ -268,6 +290,19 @@ async def github_webhook(request: Request):
         return {"status": "error", "message": "Internal error processing webhook"}
 
 
+@app.get("/queue")
+async def queue(request: Request, limit: int = 20):
+    """Scheduler queue depth, slot usage, wait times and recent jobs."""
+    scheduler: ADWScheduler = request.app.state.scheduler
+    return {
+        "stats": scheduler.stats().model_dump(),
+        "jobs": [
+            {**job.model_dump(), "wait_seconds": job.wait_seconds}
+            for job in scheduler.jobs(limit=limit)
+        ],
+    }
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint - runs comprehensive system health check."""
@@ -351,6 +386,7 @@ async def health():
 if __name__ == "__main__":
     print(f"Starting server on http://0.0.0.0:{PORT}")
     print(f"Webhook endpoint: POST /gh-webhook")
+    print(f"Queue status: GET /queue")
     print(f"Health check: GET /health")
 
     uvicorn.run(app, host="0.0.0.0", port=PORT)
@@ -35,6 +35,20 @@ export async function fetchSessionsUsage(params = {}) {
   return data
 }
 
+/**
+ * Fetch pre-aggregated usage buckets per agent and model.
+ * @param {object} [params]
+ * @param {string} [params.startDate] - First UTC day, YYYY-MM-DD (default: 6 days before endDate).
+ * @param {string} [params.endDate] - Last UTC day, YYYY-MM-DD (default: today).
+ * @param {'hour'|'day'} [params.granularity]
+ * @param {string} [params.agentId]
+ * @returns {Promise<{ buckets: object[], totals: object }>}
+ */
+export async function fetchUsageRollups(params = {}) {
+  const { data } = await api.get('/usage/rollups', { params })
+  return data
+}
+
 export async function fetchJobs() {
   const { data } = await api.get('/gateway/jobs')
   return data
@@ -94,18 +108,77 @@ export async function fetchAgentFileContent(agentId, path) {
   return data
 }
 
+/**
+ * Fetch raw bytes of a workspace file as text, optionally a byte range of it.
+ * @param {string} agentId
+ * @param {string} path
+ * @param {object} [options]
+ * @param {number} [options.start] - First byte offset (inclusive).
+ * @param {number} [options.end] - Last byte offset (inclusive); omit to read to the end.
+ * @param {number} [options.tail] - Read only the last N bytes instead.
+ * @returns {Promise<{ content: string, range: string | null, etag: string }>}
+ */
+export async function fetchAgentFileRange(agentId, path, { start, end, tail } = {}) {
+  const headers = {}
+  if (tail) headers.Range = `bytes=-${tail}`
+  else if (start !== undefined) headers.Range = `bytes=${start}-${end ?? ''}`
+  const response = await api.get(`/gateway/agents/${agentId}/files/raw`, {
+    params: { path },
+    headers,
+    responseType: 'text',
+  })
+  return {
+    content: response.data,
+    range: response.headers['content-range'] || null,
+    etag: response.headers.etag,
+  }
+}
+
 export async function fetchDashboard() {
   const { data } = await api.get('/dashboard')
   return data
 }
 
+/**
+ * Run several read RPCs in one request.
+ *
+ * Items fail independently; each result is either
+ * `{ id, method, ok: true, payload }` or `{ id, method, ok: false, error: { status, message } }`.
+ * @param {{ method: string, params?: object, id?: string }[]} requests
+ * @param {object} [options]
+ * @param {number} [options.timeoutMs] - Deadline shared by every item.
+ * @returns {Promise<object[]>} Results in request order.
+ */
+export async function fetchBatch(requests, { timeoutMs } = {}) {
+  const body = { requests }
+  if (timeoutMs) body.timeoutMs = timeoutMs
+  const { data } = await api.post('/gateway/batch', body)
+  return data.results
+}
+
 /**
  * Subscribe to the SSE event stream from the gateway.
+ *
+ * Gateway events carry their seq as the SSE id, so the browser's automatic
+ * reconnect resumes via Last-Event-ID. A `resync` event means missed events
+ * could not be replayed and state should be refetched over REST.
  * @param {function} onEvent - Callback receiving { event, data } objects.
+ * @param {object} [options] - Optional server-side topic filters and batching.
+ * @param {string[]} [options.events] - Event name globs, e.g. ['chat', 'agent*'].
+ * @param {string[]} [options.agentId] - Only events for these agents.
+ * @param {string[]} [options.sessionKey] - Only events for these sessions.
+ * @param {number} [options.batchMs] - Coalesce events into batches over this window.
  * @returns {function} cleanup - Call to close the EventSource connection.
  */
-export function subscribeToEvents(onEvent) {
-  const url = `${API_BASE}/gateway/events`
+export function subscribeToEvents(onEvent, options = {}) {
+  const { batchMs, ...filters } = options
+  const query = new URLSearchParams()
+  Object.entries(filters).forEach(([key, values]) => {
+    if (values && values.length) query.set(key, [].concat(values).join(','))
+  })
+  if (batchMs) query.set('batchMs', batchMs)
+  const qs = query.toString()
+  const url = `${API_BASE}/gateway/events${qs ? `?${qs}` : ''}`
   const eventSource = new EventSource(url)
 
   eventSource.onmessage = (e) => {
@@ -120,7 +193,7 @@ export function subscribeToEvents(onEvent) {
   // Listen for named events
   const eventTypes = [
     'status', 'agent', 'chat', 'presence', 'tick',
-    'health', 'cron', 'shutdown', 'ping',
+    'health', 'cron', 'shutdown', 'ping', 'resync',
   ]
 
   eventTypes.forEach((type) => {
@@ -134,6 +207,15 @@ export function subscribeToEvents(onEvent) {
     })
   })
 
+  // Batched frames carry an ordered array of { event, seq, data }
+  eventSource.addEventListener('batch', (e) => {
+    try {
+      JSON.parse(e.data).forEach(({ event, data }) => onEvent({ event, data }))
+    } catch {
+      // ignore parse errors
+    }
+  })
+
   eventSource.onerror = (err) => {
     console.warn('[SSE] EventSource error – readyState:', eventSource.readyState, err)
     // EventSource auto-reconnects when readyState is CONNECTING (0)
@@ -0,0 +1,123 @@
+"""Microbenchmark: inbound gateway frame decoding, legacy vs fast path.
+
+Usage (from app/server):
+    uv run python benchmarks/bench_frame_decode.py [--frames N] [--json]
+
+The legacy path mirrors the original client: ``json.loads`` followed by a
+full Pydantic model for every response and event, ticks included. The
+fast path is what GatewayClient does now: ``frame_codec.loads``, ticks
+short-circuited on the raw dict, responses read straight from the dict,
+and events wrapped in a lazily validated ``EventFrame`` whose name and
+payload are read the way the dispatcher does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import frame_codec  # noqa: E402
+from gateway_models import GatewayEvent, GatewayResponse  # noqa: E402
+
+
+def make_frames(count: int) -> list[str]:
+    """A mix dominated by ticks and chat deltas, like a busy gateway."""
+    templates = [
+        {"type": "event", "event": "tick", "payload": {"ts": 1737264000000}},
+        {
+            "type": "event",
+            "event": "chat",
+            "payload": {
+                "runId": "run-1",
+                "sessionKey": "agent:main:webchat:main",
+                "state": "delta",
+                "message": {"role": "assistant", "content": "Hello, how can I help?" * 4},
+            },
+        },
+        {
+            "type": "event",
+            "event": "agent",
+            "payload": {"runId": "run-1", "stream": "text_delta", "data": {"text": "ok"}},
+        },
+        {
+            "type": "res",
+            "id": "1",
+            "ok": True,
+            "payload": {"agents": [{"id": f"agent-{i}", "name": f"Agent {i}"} for i in range(20)]},
+        },
+    ]
+    frames = []
+    for i in range(count):
+        frame = dict(templates[i % len(templates)])
+        if frame["type"] == "event":
+            frame["seq"] = i
+        frames.append(json.dumps(frame))
+    return frames
+
+
+def legacy_decode(raw: str) -> None:
+    data = json.loads(raw)
+    if data.get("type") == "res":
+        response = GatewayResponse(**data)
+        _ = response.payload
+    else:
+        event = GatewayEvent(**data)
+        if event.event == "tick":
+            return
+        _ = event.payload
+
+
+def fast_decode(raw: str) -> None:
+    data = frame_codec.loads(raw)
+    if data.get("type") == "res":
+        if data.get("ok") is True:
+            _ = data.get("payload")
+    elif data.get("event") != "tick":
+        event = frame_codec.decode_event(data)
+        _ = event.payload
+
+
+def measure(decode, frames: list[str], rounds: int = 3) -> float:
+    """Best-of-N frames per second."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for raw in frames:
+            decode(raw)
+        best = min(best, time.perf_counter() - start)
+    return len(frames) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=50_000)
+    parser.add_argument("--json", action="store_true", help="emit results as JSON")
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames)
+    legacy = measure(legacy_decode, frames)
+    fast = measure(fast_decode, frames)
+    results = {
+        "decoder": frame_codec.DECODER,
+        "frames": args.frames,
+        "legacyFramesPerSec": round(legacy),
+        "fastFramesPerSec": round(fast),
+        "speedup": round(fast / legacy, 2),
+    }
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"decoder:  {results['decoder']}")
+        print(f"legacy:   {results['legacyFramesPerSec']:>10,} frames/s")
+        print(f"fast:     {results['fastFramesPerSec']:>10,} frames/s")
+        print(f"speedup:  {results['speedup']}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Load benchmark: the API server proxying a local mock gateway.
+
+Starts a MockGateway in this process and the API server (``server.py``)
+as a subprocess pointed at it, then drives each scenario with a fixed
+number of concurrent HTTP clients for ``--duration`` seconds and reports
+RPS and p50/p99 latency. The ``events`` scenario holds SSE subscribers on
+/api/gateway/events while the mock emits its firehose and reports
+delivery rate and lag. Server memory (RSS, summed over worker processes)
+is sampled after every scenario.
+
+Usage (from app/server):
+    uv run python benchmarks/bench_proxy.py [--concurrency 32] [--duration 10]
+        [--latency-ms 5] [--event-rate 200] [--workers 1]
+        [--output results.json] [--compare baseline.json] [--json]
+
+Results are JSON so runs can be diffed; ``--compare`` prints the change in
+RPS and p99 against an earlier result file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+from mock_gateway import MockGateway  # noqa: E402
+
+# name -> (HTTP method, path, JSON body)
+SCENARIOS: dict[str, tuple[str, str, dict | None]] = {
+    "status": ("GET", "/api/gateway/status", None),
+    "agents": ("GET", "/api/gateway/agents", None),
+    "sessions": ("GET", "/api/gateway/sessions?limit=50&includeLastMessage=true", None),
+    "dashboard": ("GET", "/api/dashboard", None),
+    "batch": ("POST", "/api/gateway/batch", {"requests": [
+        {"method": "agents.list"}, {"method": "cron.list"}, {"method": "models.list"},
+    ]}),
+}
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(latencies_ms: list[float], errors: int, elapsed: float) -> dict:
+    latencies_ms.sort()
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "rps": round(len(latencies_ms) / elapsed, 1) if elapsed else 0.0,
+        "p50Ms": round(percentile(latencies_ms, 0.50), 3),
+        "p99Ms": round(percentile(latencies_ms, 0.99), 3),
+        "maxMs": round(latencies_ms[-1], 3) if latencies_ms else 0.0,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _proc_status(pid: int) -> dict[str, int]:
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = int(rest.split()[0]) * 1024
+    return values
+
+
+def _process_tree(pid: int) -> list[int]:
+    pids = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                for child in f.read().split():
+                    pids.extend(_process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def server_memory(pid: int) -> dict | None:
+    """RSS and peak RSS of the server and its workers; None off Linux."""
+    try:
+        statuses = [_proc_status(p) for p in _process_tree(pid)]
+    except OSError:
+        return None
+    return {
+        "rssBytes": sum(s.get("VmRSS", 0) for s in statuses),
+        "peakRssBytes": sum(s.get("VmHWM", 0) for s in statuses),
+    }
+
+
+async def run_http(http: httpx.AsyncClient, scenario: str, concurrency: int, duration: float) -> dict:
+    method, path, body = SCENARIOS[scenario]
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                resp = await http.request(method, path, json=body)
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_events(http: httpx.AsyncClient, clients: int, duration: float) -> dict:
+    """Hold ``clients`` SSE subscribers open and measure firehose delivery."""
+    lags: list[float] = []
+    received = 0
+
+    async def subscriber() -> None:
+        nonlocal received
+        async with http.stream("GET", "/api/gateway/events") as resp:
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    payload = json.loads(line[5:])
+                except ValueError:
+                    continue
+                received += 1
+                if isinstance(payload, dict) and "sentAt" in payload:
+                    lags.append(time.time() * 1000 - payload["sentAt"])
+
+    tasks = [asyncio.create_task(subscriber()) for _ in range(clients)]
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    lags.sort()
+    return {
+        "subscribers": clients,
+        "eventsReceived": received,
+        "eventsPerSec": round(received / elapsed, 1),
+        "lagP50Ms": round(percentile(lags, 0.50), 3),
+        "lagP99Ms": round(percentile(lags, 0.99), 3),
+    }
+
+
+async def wait_until_connected(http: httpx.AsyncClient, proc: subprocess.Popen) -> None:
+    for _ in range(300):
+        if proc.poll() is not None:
+            raise RuntimeError(f"API server exited with code {proc.returncode}")
+        try:
+            resp = await http.get("/api/gateway/status")
+            if resp.json().get("state") == "connected":
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("API server did not connect to the mock gateway")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    gateway = MockGateway(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, event_rate=args.event_rate
+    )
+    await gateway.start()
+    port = free_port()
+    env = {
+        **os.environ,
+        "OPENCLAW_GATEWAY_URL": gateway.url,
+        "OPENCLAW_GATEWAY_TOKEN": "bench",
+        "API_HOST": "127.0.0.1",
+        "API_PORT": str(port),
+        "API_DEBUG": "false",
+        "API_WORKERS": str(args.workers),
+        "USAGE_ROLLUP_DB": "",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "server.py"], cwd=SERVER_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    limits = httpx.Limits(max_connections=args.concurrency + args.sse_clients + 8)
+    results: dict = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+            "durationSec": args.duration,
+            "latencyMs": args.latency_ms,
+            "jitterMs": args.jitter_ms,
+            "eventRate": args.event_rate,
+            "workers": args.workers,
+        },
+        "scenarios": {},
+    }
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30.0
+        ) as http:
+            await wait_until_connected(http, proc)
+            for scenario in args.scenarios:
+                if scenario == "events":
+                    result = await run_events(http, args.sse_clients, args.duration)
+                else:
+                    result = await run_http(http, scenario, args.concurrency, args.duration)
+                result["memory"] = server_memory(proc.pid)
+                results["scenarios"][scenario] = result
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        await gateway.close()
+    results["gateway"] = gateway.get_stats()
+    return results
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """Per-scenario change in throughput and tail latency vs a baseline run."""
+    lines = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for key in ("rps", "p99Ms", "eventsPerSec", "lagP99Ms"):
+            if key in result and before.get(key):
+                change = (result[key] - before[key]) / before[key] * 100
+                lines.append(f"{name:<10} {key:<13} {before[key]:>10} -> {result[key]:>10} ({change:+.1f}%)")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="mock RPC latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--event-rate", type=float, default=200.0, help="mock events per second")
+    parser.add_argument("--sse-clients", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="API_WORKERS for the server")
+    parser.add_argument(
+        "--scenarios", nargs="+", default=[*SCENARIOS, "events"],
+        choices=[*SCENARIOS, "events"],
+    )
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, result in results["scenarios"].items():
+            if name == "events":
+                print(
+                    f"{name:<10} {result['eventsPerSec']:>10,.1f} ev/s  "
+                    f"lag p50 {result['lagP50Ms']:.2f} ms  p99 {result['lagP99Ms']:.2f} ms"
+                )
+            else:
+                print(
+                    f"{name:<10} {result['rps']:>10,.1f} req/s  p50 {result['p50Ms']:.2f} ms  "
+                    f"p99 {result['p99Ms']:.2f} ms  errors {result['errors']}"
+                )
+        memory = list(results["scenarios"].values())[-1]["memory"] if results["scenarios"] else None
+        if memory:
+            print(f"server rss {memory['rssBytes'] / 2**20:.1f} MiB (peak {memory['peakRssBytes'] / 2**20:.1f} MiB)")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        for line in compare(results, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
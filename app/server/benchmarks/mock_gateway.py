@@ -0,0 +1,235 @@
+"""Local mock OpenClaw Gateway for benchmarks and manual load testing.
+
+Speaks enough of the gateway protocol for GatewayClient: the
+connect.challenge -> connect -> hello-ok handshake, canned RPC responses
+delivered after a configurable latency, periodic ticks, and an optional
+synthetic firehose of chat/agent events. Event payloads carry ``sentAt``
+(epoch ms) so a consumer can measure delivery lag end to end.
+
+Usage (from app/server), then point OPENCLAW_GATEWAY_URL at it:
+    uv run python benchmarks/mock_gateway.py [--port 18789] [--latency-ms 5] [--event-rate 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter
+from typing import Any
+
+import websockets
+
+METHODS = [
+    "agents.list", "agent.identity.get", "agents.files.list", "agents.files.get",
+    "sessions.list", "sessions.usage", "cron.list", "skills.status",
+    "models.list", "config.get",
+]
+EVENTS = ["chat", "agent", "presence", "tick", "health", "cron", "shutdown"]
+
+
+def make_payloads(agents: int, sessions: int) -> dict[str, Any]:
+    """Canned RPC results shaped like a mid-sized deployment."""
+    agent_ids = [f"agent-{i}" for i in range(agents)]
+    return {
+        "agents.list": {
+            "agents": [
+                {"id": a, "name": a.title(), "model": "claude-sonnet", "identity": {"role": "Agent"}}
+                for a in agent_ids
+            ]
+        },
+        "agent.identity.get": {"name": "Agent", "emoji": "*"},
+        "agents.files.list": {"files": [{"name": "AGENTS.md", "path": "AGENTS.md"}]},
+        "agents.files.get": {"content": "# Notes\n" + "lorem ipsum dolor sit amet\n" * 2000},
+        "sessions.list": {
+            "sessions": [
+                {
+                    "key": f"agent:{agent_ids[i % agents]}:webchat:s{i}",
+                    "agentId": agent_ids[i % agents],
+                    "updatedAt": 1737264000000 + i * 1000,
+                    "lastMessage": {"role": "assistant", "content": "Done. " * 20},
+                }
+                for i in range(sessions)
+            ]
+        },
+        "sessions.usage": [
+            {
+                "key": f"agent:{agent_ids[i % agents]}:webchat:s{i}",
+                "inputTokens": 1200, "outputTokens": 300, "totalTokens": 1500,
+                "cost": 0.012, "turns": 3,
+            }
+            for i in range(sessions)
+        ],
+        "cron.list": {"jobs": [{"id": "daily", "name": "Daily report", "enabled": True}]},
+        "skills.status": {"skills": []},
+        "models.list": {"models": [{"id": "claude-sonnet", "name": "Sonnet", "provider": "x"}]},
+        "config.get": {"config": {}, "hash": "0"},
+    }
+
+
+class MockGateway:
+    """In-process WebSocket server standing in for an OpenClaw Gateway."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 5.0,
+        jitter_ms: float = 0.0,
+        event_rate: float = 0.0,
+        tick_interval_ms: int = 15_000,
+        agents: int = 20,
+        sessions: int = 200,
+    ):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.event_rate = event_rate
+        self.tick_interval_ms = tick_interval_ms
+        self.payloads = make_payloads(agents, sessions)
+        self.requests: Counter[str] = Counter()
+        self.events_sent = 0
+        self.connections = 0
+        self._seq = itertools.count(1)
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await websockets.serve(
+            self._handle, self.host, self.port, max_size=4 * 1024 * 1024
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, ws) -> None:
+        await ws.send(json.dumps({
+            "type": "event", "event": "connect.challenge",
+            "payload": {"nonce": "bench", "ts": int(time.time() * 1000)},
+        }))
+        request = json.loads(await ws.recv())
+        await ws.send(json.dumps({
+            "type": "res", "id": request.get("id"), "ok": True,
+            "payload": {
+                "type": "hello-ok",
+                "protocol": 3,
+                "server": {"version": "mock", "connId": f"c{self.connections}"},
+                "features": {"methods": METHODS, "events": EVENTS},
+                "snapshot": {"uptimeMs": 0},
+                "policy": {"tickIntervalMs": self.tick_interval_ms},
+            },
+        }))
+        self.connections += 1
+
+        background = [asyncio.create_task(self._ticks(ws))]
+        if self.event_rate > 0:
+            background.append(asyncio.create_task(self._firehose(ws)))
+        try:
+            async for raw in ws:
+                frame = json.loads(raw)
+                if frame.get("type") == "req":
+                    asyncio.create_task(self._respond(ws, frame))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in background:
+                task.cancel()
+
+    async def _respond(self, ws, frame: dict) -> None:
+        method = frame.get("method", "")
+        self.requests[method] += 1
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        try:
+            await ws.send(json.dumps({
+                "type": "res", "id": frame.get("id"), "ok": True,
+                "payload": self.payloads.get(method, {}),
+            }))
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _send_event(self, ws, event: str, payload: dict) -> None:
+        await ws.send(json.dumps(
+            {"type": "event", "event": event, "payload": payload, "seq": next(self._seq)}
+        ))
+        self.events_sent += 1
+
+    async def _ticks(self, ws) -> None:
+        while True:
+            await asyncio.sleep(self.tick_interval_ms / 1000)
+            await self._send_event(ws, "tick", {"ts": int(time.time() * 1000)})
+
+    async def _firehose(self, ws) -> None:
+        """Emit ``event_rate`` events/s in 10 ms slices, alternating chat and agent."""
+        owed = 0.0
+        n = 0
+        while True:
+            await asyncio.sleep(0.01)
+            owed += self.event_rate * 0.01
+            while owed >= 1:
+                owed -= 1
+                n += 1
+                now = time.time() * 1000
+                session = f"agent:agent-{n % 20}:webchat:s{n % 200}"
+                if n % 2:
+                    await self._send_event(ws, "chat", {
+                        "runId": f"run-{n}", "sessionKey": session, "state": "delta",
+                        "message": {"role": "assistant", "content": "token " * 8},
+                        "sentAt": now,
+                    })
+                else:
+                    await self._send_event(ws, "agent", {
+                        "runId": f"run-{n}", "sessionKey": session, "stream": "text_delta",
+                        "data": {"text": "ok"}, "sentAt": now,
+                    })
+
+    def get_stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "requests": dict(self.requests),
+            "eventsSent": self.events_sent,
+        }
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    gateway = MockGateway(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        event_rate=args.event_rate,
+    )
+    await gateway.start()
+    print(f"Mock gateway listening on {gateway.url}")
+    try:
+        await asyncio.Future()
+    finally:
+        await gateway.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18789)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--event-rate", type=float, default=0.0, help="synthetic events per second")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
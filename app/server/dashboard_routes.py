@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+import time
 from typing import Any
 
 from fastapi import APIRouter, Depends
 
+import metrics
+import tracing
 from gateway_client import GatewayClient, get_gateway_client
+from gateway_models import GatewayEvent
+from rpc_scheduler import RpcPriority
+from usage_rollups import day_of, usage_store
 
 logger = logging.getLogger("dashboard_routes")
 
@@ -36,16 +44,20 @@ QUICK_ACTIONS = [
 
 
 async def _safe_rpc(client: GatewayClient, method: str, params: dict | None = None) -> Any:
-    """Call gateway RPC, returning None on any failure."""
-    if not client.is_connected:
-        return None
-    try:
-        return await client.send_request(method, params or {})
-    except Exception as exc:
-        logger.warning("dashboard_routes: RPC %s failed: %s", method, exc)
-        return None
+    """Call gateway RPC in the background lane, returning None on any failure."""
+    with tracing.span("dashboard.rpc", method=method) as span:
+        if not client.is_connected:
+            span.set("skipped", "disconnected")
+            return None
+        try:
+            return await client.send_request(method, params or {}, priority=RpcPriority.BACKGROUND)
+        except Exception as exc:
+            span.set("error", str(exc))
+            logger.warning("dashboard_routes: RPC %s failed: %s", method, exc)
+            return None
 
 
+@tracing.traced("dashboard.map_agents")
 def _map_agents(raw_agents: Any) -> list[dict]:
     agents = []
     if isinstance(raw_agents, list):
@@ -67,6 +79,7 @@ def _map_agents(raw_agents: Any) -> list[dict]:
     return agents
 
 
+@tracing.traced("dashboard.map_activity")
 def _map_activity(raw_sessions: Any) -> list[dict]:
     activity = []
     if isinstance(raw_sessions, list):
@@ -91,7 +104,8 @@ def _map_activity(raw_sessions: Any) -> list[dict]:
     return activity
 
 
-def _map_cost(raw_usage: Any) -> dict:
+@tracing.traced("dashboard.map_cost")
+def _map_cost(raw_usage: Any, yesterday_total: float | None = None) -> dict:
     today_total = 0.0
     top_agent_name = "—"
     top_agent_amount = 0.0
@@ -122,12 +136,13 @@ def _map_cost(raw_usage: Any) -> dict:
 
     return {
         "todayTotal": today_total,
-        "yesterdayTotal": 0.0,
+        "yesterdayTotal": yesterday_total or 0.0,
         "currency": "USD",
         "topAgent": {"name": top_agent_name, "amount": top_agent_amount},
     }
 
 
+@tracing.traced("dashboard.map_jobs")
 def _map_jobs(raw_jobs: Any) -> list[dict]:
     jobs = []
     if isinstance(raw_jobs, list):
@@ -148,30 +163,204 @@ def _map_jobs(raw_jobs: Any) -> list[dict]:
     return jobs
 
 
-@router.get("/dashboard")
-async def get_dashboard(client: GatewayClient = Depends(get_gateway_client)):
-    """Aggregate fleet data into a single dashboard payload for the frontend."""
-    raw_agents, raw_sessions, raw_usage, raw_jobs = None, None, None, None
+# Dashboard section -> (RPC method, params) used to fetch its raw data
+DASHBOARD_SECTIONS: dict[str, tuple[str, dict | None]] = {
+    "agents": ("agents.list", None),
+    "sessions": ("sessions.list", {"limit": 7, "includeLastMessage": True}),
+    "usage": ("sessions.usage", None),
+    "jobs": ("cron.list", None),
+}
+
 
-    if client.is_connected:
-        import asyncio
+async def _fetch_sections(client: GatewayClient, sections) -> dict[str, Any]:
+    """Fetch raw gateway data for the given dashboard sections concurrently."""
+    sections = list(sections)
+    with tracing.span("dashboard.fetch", sections=sections):
         results = await asyncio.gather(
-            _safe_rpc(client, "agents.list"),
-            _safe_rpc(client, "sessions.list", {"limit": 7, "includeLastMessage": True}),
-            _safe_rpc(client, "sessions.usage"),
-            _safe_rpc(client, "cron.list"),
+            *(_safe_rpc(client, *DASHBOARD_SECTIONS[s]) for s in sections),
             return_exceptions=True,
         )
-        raw_agents = results[0] if not isinstance(results[0], Exception) else None
-        raw_sessions = results[1] if not isinstance(results[1], Exception) else None
-        raw_usage = results[2] if not isinstance(results[2], Exception) else None
-        raw_jobs = results[3] if not isinstance(results[3], Exception) else None
+    return {s: (r if not isinstance(r, Exception) else None) for s, r in zip(sections, results)}
 
+
+def _build_payload(raw: dict[str, Any]) -> dict:
     return {
-        "agents": _map_agents(raw_agents),
-        "recentActivity": _map_activity(raw_sessions),
-        "costSummary": _map_cost(raw_usage),
-        "upcomingJobs": _map_jobs(raw_jobs),
+        "agents": _map_agents(raw.get("agents")),
+        "recentActivity": _map_activity(raw.get("sessions")),
+        "costSummary": _map_cost(
+            raw.get("usage"), usage_store.day_cost(day_of(time.time() - 86400))
+        ),
+        "upcomingJobs": _map_jobs(raw.get("jobs")),
         "pipeline": {"scheduled": 0, "queue": 0, "inProgress": 0, "done": 0},
         "quickActions": QUICK_ACTIONS,
     }
+
+
+def _session_items(raw_sessions: Any) -> list | None:
+    if isinstance(raw_sessions, list):
+        return raw_sessions
+    if isinstance(raw_sessions, dict) and isinstance(raw_sessions.get("sessions"), list):
+        return raw_sessions["sessions"]
+    return None
+
+
+class DashboardSnapshot:
+    """Dashboard payload kept in memory and maintained from gateway events.
+
+    A background task performs a full reconcile every ``reconcile_interval``
+    seconds and re-fetches only the sections marked dirty by events in
+    between, so gateway traffic follows the event rate rather than the
+    number of dashboard viewers.
+    """
+
+    def __init__(self, reconcile_interval: float = 60.0, refresh_interval: float = 2.0):
+        self.reconcile_interval = reconcile_interval
+        self.refresh_interval = refresh_interval
+        self.client: GatewayClient | None = None
+        self.payload: dict | None = None
+        self._raw: dict[str, Any] = {}
+        self._dirty: set[str] = set()
+        self._last_reconcile = 0.0
+        self._task: asyncio.Task | None = None
+        self.reconciles = 0
+        self.partial_refreshes = 0
+        self.events_applied = 0
+
+    @classmethod
+    def from_env(cls) -> DashboardSnapshot:
+        return cls(
+            reconcile_interval=float(os.getenv("DASHBOARD_RECONCILE_INTERVAL", 60.0)),
+            refresh_interval=float(os.getenv("DASHBOARD_REFRESH_INTERVAL", 2.0)),
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        return self.payload is not None
+
+    def serves(self, client: GatewayClient) -> bool:
+        return self.client is client and client.is_connected and self.is_ready
+
+    def start(self, client: GatewayClient) -> None:
+        """Subscribe to gateway events and start the maintenance loop."""
+        self.client = client
+        client.on_any_event(self._on_event)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.client and self._on_event in self.client._global_event_callbacks:
+            self.client._global_event_callbacks.remove(self._on_event)
+        self.payload = None
+
+    async def reconcile(self) -> None:
+        """Rebuild every section from the gateway to heal any drift."""
+        self._dirty.clear()
+        self._raw = await _fetch_sections(self.client, DASHBOARD_SECTIONS)
+        self._last_reconcile = time.monotonic()
+        self.reconciles += 1
+        self.payload = _build_payload(self._raw)
+
+    async def _refresh_dirty(self) -> None:
+        sections = sorted(self._dirty)
+        self._dirty.clear()
+        fetched = await _fetch_sections(self.client, sections)
+        for section, value in fetched.items():
+            if value is not None:
+                self._raw[section] = value
+        self.partial_refreshes += 1
+        self.payload = _build_payload(self._raw)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if not self.client.is_connected:
+                    self.payload = None
+                elif (
+                    not self.is_ready
+                    or time.monotonic() - self._last_reconcile >= self.reconcile_interval
+                ):
+                    await self.reconcile()
+                elif self._dirty:
+                    await self._refresh_dirty()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Dashboard snapshot refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def _on_event(self, event: GatewayEvent) -> None:
+        if not self.is_ready:
+            return
+        payload = event.payload
+        if event.event == "cron":
+            self._dirty.add("jobs")
+        elif event.event == "chat" and payload.get("state") in ("final", "aborted", "error"):
+            if not self._apply_chat(payload):
+                self._dirty.add("sessions")
+            self._dirty.add("usage")
+        elif event.event == "agent" and payload.get("stream") == "lifecycle":
+            self._dirty.update(("sessions", "usage"))
+
+    def _apply_chat(self, payload: dict) -> bool:
+        """Move the session to the top of the activity feed in place.
+
+        Returns False when the session is not in the snapshot and the
+        sessions section has to be re-fetched instead.
+        """
+        items = _session_items(self._raw.get("sessions"))
+        key = payload.get("sessionKey")
+        if items is None or not key:
+            return False
+        index = next((i for i, s in enumerate(items) if s.get("key") == key), None)
+        if index is None:
+            return False
+
+        session = dict(items.pop(index))
+        message = payload.get("message")
+        if isinstance(message, dict):
+            session["lastMessage"] = message
+        if payload.get("ts"):
+            session["updatedAt"] = payload["ts"]
+        items.insert(0, session)
+
+        self.events_applied += 1
+        self.payload = {**self.payload, "recentActivity": _map_activity(self._raw["sessions"])}
+        return True
+
+    def get_stats(self) -> dict:
+        return {
+            "ready": self.is_ready,
+            "reconciles": self.reconciles,
+            "partialRefreshes": self.partial_refreshes,
+            "eventsApplied": self.events_applied,
+            "dirty": sorted(self._dirty),
+        }
+
+
+dashboard_snapshot = DashboardSnapshot.from_env()
+
+
+@router.get("/dashboard")
+async def get_dashboard(client: GatewayClient = Depends(get_gateway_client)):
+    """Aggregate fleet data into a single dashboard payload for the frontend.
+
+    Served from the event-maintained snapshot when it tracks this client,
+    otherwise built on demand from the gateway.
+    """
+    start = time.perf_counter()
+    if dashboard_snapshot.serves(client):
+        source, payload = "snapshot", dashboard_snapshot.payload
+    else:
+        raw: dict[str, Any] = {}
+        if client.is_connected:
+            raw = await _fetch_sections(client, DASHBOARD_SECTIONS)
+        source, payload = "live", _build_payload(raw)
+    tracing.current_span().set("source", source)
+    metrics.DASHBOARD_REQUESTS.inc(source)
+    metrics.DASHBOARD_DURATION.observe(time.perf_counter() - start, source)
+    return payload
@@ -0,0 +1,26 @@
+"""FastAPI router exposing in-process diagnostics under /api/debug."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+import tracing
+
+router = APIRouter(prefix="/api/debug", tags=["debug"])
+
+
+@router.get("/traces")
+async def list_traces(
+    limit: int = Query(20, ge=1, le=500),
+    traceId: Optional[str] = Query(None),
+    minDurationMs: float = Query(0, ge=0),
+):
+    """Recent request traces, newest first, each with its spans in start order.
+
+    ``minDurationMs`` keeps only traces whose root span took at least that long.
+    """
+    traces = tracing.tracer.get_traces(limit, trace_id=traceId, min_duration_ms=minDurationMs)
+    tracing.tracer.flush()
+    return {"stats": tracing.tracer.get_stats(), "traces": traces}
@@ -0,0 +1,285 @@
+"""Broadcast hub fanning gateway events out to SSE subscribers.
+
+Each event is JSON-encoded into an SSE frame exactly once and appended
+to a shared ring buffer. Subscribers read from the ring with their own
+cursor, so publishing costs the same whether there is one open dashboard
+or hundreds; a subscriber that falls more than ``capacity`` events
+behind skips ahead and has the gap counted as drops.
+
+Frames carry the gateway ``seq`` as their SSE ``id`` so a reconnecting
+EventSource can send ``Last-Event-ID`` and have the missed events
+replayed from the same ring instead of refetching everything.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import weakref
+from collections import deque
+from dataclasses import dataclass
+
+from sse_starlette.sse import ServerSentEvent
+
+from event_filter import EventFilter, RoutingKeys, routing_keys
+from gateway_client import GatewayClient
+from gateway_models import GatewayEvent
+
+logger = logging.getLogger("event_broadcast")
+
+DEFAULT_CAPACITY = 256
+
+
+@dataclass(frozen=True)
+class EncodedEvent:
+    """A gateway event with its pre-encoded SSE frame and routing keys."""
+
+    index: int
+    event: GatewayEvent
+    data: str
+    frame: bytes
+    keys: RoutingKeys
+
+
+def encode_frame(event: GatewayEvent, data: str) -> bytes:
+    event_id = str(event.seq) if event.seq is not None else None
+    return ServerSentEvent(data=data, event=event.event, id=event_id).encode()
+
+
+# State-style events where only the latest value matters, mapped to the
+# payload field identifying which entity the state belongs to
+STATE_EVENTS: dict[str, str | None] = {
+    "presence": "deviceId",
+    "health": None,
+    "heartbeat": None,
+    "tick": None,
+    "talk.mode": None,
+    "voicewake.changed": None,
+}
+
+
+def coalesce(events: list[EncodedEvent]) -> list[EncodedEvent]:
+    """Drop state events superseded later in the batch, keeping order.
+
+    Delta events (chat, agent, ...) are all kept; for a state event only
+    its last occurrence per entity survives, at that occurrence's position.
+    """
+    last_index: dict[tuple[str, object], int] = {}
+    for i, encoded in enumerate(events):
+        name = encoded.event.event
+        if name in STATE_EVENTS:
+            field = STATE_EVENTS[name]
+            last_index[(name, encoded.event.payload.get(field) if field else None)] = i
+    if not last_index:
+        return events
+    keep = set(last_index.values())
+    return [e for i, e in enumerate(events) if e.event.event not in STATE_EVENTS or i in keep]
+
+
+def encode_batch(events: list[EncodedEvent]) -> bytes:
+    """Encode events as one ``batch`` SSE frame holding a JSON array.
+
+    Reuses each event's already-encoded payload JSON; the frame id is the
+    last gateway seq in the batch so Last-Event-ID resume still works.
+    """
+    items = ",".join(
+        f'{{"event":{json.dumps(e.event.event)},"seq":{json.dumps(e.event.seq)},"data":{e.data}}}'
+        for e in events
+    )
+    seqs = [e.event.seq for e in events if e.event.seq is not None]
+    event_id = str(seqs[-1]) if seqs else None
+    return ServerSentEvent(data=f"[{items}]", event="batch", id=event_id).encode()
+
+
+def parse_last_event_id(value: str | None) -> int | None:
+    """Parse a Last-Event-ID value, ignoring anything that is not a gateway seq."""
+    if not value:
+        return None
+    try:
+        return int(value.strip())
+    except ValueError:
+        return None
+
+
+class Subscription:
+    """A single SSE client's cursor into the broadcast ring."""
+
+    def __init__(
+        self,
+        hub: EventBroadcaster,
+        sub_id: int,
+        cursor: int,
+        resumed: bool = False,
+        event_filter: EventFilter | None = None,
+    ):
+        self.hub = hub
+        self.id = sub_id
+        self.cursor = cursor
+        self.resumed = resumed
+        self.filter = event_filter
+        self.delivered = 0
+        self.dropped = 0
+        self.filtered = 0
+
+    @property
+    def lag(self) -> int:
+        return self.hub.head - self.cursor
+
+    async def next(self, timeout: float | None = None) -> list[EncodedEvent]:
+        """Return all matching events published since the last call.
+
+        Waits up to ``timeout`` seconds for at least one matching event and
+        returns an empty list if none arrived.
+        """
+        loop = asyncio.get_event_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            if self.cursor != self.hub.head:
+                events = self._drain()
+                if events:
+                    return events
+            changed = self.hub._changed
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return []
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return []
+
+    def _drain(self) -> list[EncodedEvent]:
+        hub = self.hub
+        if self.cursor < hub.tail:
+            self.dropped += hub.tail - self.cursor
+            self.cursor = hub.tail
+        events = list(itertools.islice(hub._ring, self.cursor - hub.tail, None))
+        self.cursor = hub.head
+        if self.filter is not None:
+            matched = [e for e in events if self.filter.matches(e.event.event, e.keys)]
+            self.filtered += len(events) - len(matched)
+            events = matched
+        self.delivered += len(events)
+        return events
+
+    def close(self) -> None:
+        self.hub._subscribers.pop(self.id, None)
+
+    def get_stats(self) -> dict:
+        return {
+            "id": self.id,
+            "lag": self.lag,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "filtered": self.filtered,
+            "filter": self.filter.to_dict() if self.filter else None,
+        }
+
+
+class EventBroadcaster:
+    """Encodes each gateway event once and shares it with every subscriber."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = max(1, capacity)
+        self._ring: deque[EncodedEvent] = deque(maxlen=self.capacity)
+        self._head = 0
+        self._changed = asyncio.Event()
+        self._subscribers: dict[int, Subscription] = {}
+        self._sub_ids = itertools.count(1)
+
+    @classmethod
+    def from_env(cls) -> EventBroadcaster:
+        return cls(capacity=int(os.getenv("SSE_BUFFER_SIZE", DEFAULT_CAPACITY)))
+
+    @property
+    def head(self) -> int:
+        """Index the next published event will get."""
+        return self._head
+
+    @property
+    def tail(self) -> int:
+        """Index of the oldest event still in the ring."""
+        return self._head - len(self._ring)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: GatewayEvent) -> None:
+        """Append an event to the ring and wake waiting subscribers."""
+        data = json.dumps(event.payload)
+        self._ring.append(
+            EncodedEvent(self._head, event, data, encode_frame(event, data), routing_keys(event))
+        )
+        self._head += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def subscribe(
+        self, last_event_id: int | None = None, event_filter: EventFilter | None = None
+    ) -> Subscription:
+        """Subscribe from now, or resume right after ``last_event_id``.
+
+        ``resumed`` is False on the subscription when a resume was asked
+        for but the ring cannot prove nothing was missed (the seq fell out
+        of the buffer, or the gateway restarted and its seq went back);
+        the caller should then tell the client to resync over REST.
+        """
+        cursor, resumed = self._head, False
+        if last_event_id is not None:
+            position = self._resume_position(last_event_id)
+            if position is not None:
+                cursor, resumed = position, True
+        sub = Subscription(self, next(self._sub_ids), cursor, resumed, event_filter)
+        self._subscribers[sub.id] = sub
+        return sub
+
+    def _resume_position(self, last_seq: int) -> int | None:
+        """Ring index of the first event after ``last_seq``, if provably complete.
+
+        The events after ``last_seq`` must carry every seq up to the newest
+        one: an event the dispatcher dropped, or one the gateway connection
+        missed, leaves a gap that replaying would silently skip over.
+        """
+        sequenced = [e for e in self._ring if e.event.seq is not None]
+        if not sequenced:
+            return None
+        for i in range(len(sequenced) - 1, -1, -1):
+            if sequenced[i].event.seq == last_seq:
+                position, following = sequenced[i].index + 1, sequenced[i + 1:]
+                break
+        else:
+            if last_seq != sequenced[0].event.seq - 1:
+                return None
+            position, following = sequenced[0].index, sequenced
+        seqs = [e.event.seq for e in following]
+        if seqs != list(range(last_seq + 1, last_seq + 1 + len(seqs))):
+            return None
+        return position
+
+    def get_stats(self) -> dict:
+        return {
+            "published": self._head,
+            "buffered": len(self._ring),
+            "capacity": self.capacity,
+            "subscribers": [s.get_stats() for s in self._subscribers.values()],
+        }
+
+
+_hubs: weakref.WeakKeyDictionary[GatewayClient, EventBroadcaster] = weakref.WeakKeyDictionary()
+
+
+def get_event_hub(client: GatewayClient) -> EventBroadcaster:
+    """Return the client's broadcast hub, registering it on first use."""
+    hub = _hubs.get(client)
+    if hub is None:
+        hub = _hubs[client] = EventBroadcaster.from_env()
+        client.on_any_event(hub.publish)
+    return hub
+
+
+def find_event_hub(client: GatewayClient) -> EventBroadcaster | None:
+    """The client's hub if one exists, without creating it."""
+    return _hubs.get(client)
@@ -0,0 +1,210 @@
+"""Bounded, worker-driven dispatch of gateway events to listener callbacks.
+
+The WebSocket reader task only enqueues events; a pool of workers runs
+the callbacks, so RPC responses queued behind a slow listener are never
+delayed. Each callback is timed, and slow ones are logged.
+
+Overflow policies when the queue is full:
+  drop-oldest  discard the oldest queued event (default)
+  block        make the reader wait for space (backpressure)
+  spill        keep accepting into an unbounded overflow buffer that is
+               drained back into the queue, in order, as space frees up
+
+With more than one worker events may complete out of order; keep the
+default single worker when listeners depend on ordering.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger("event_dispatch")
+
+OVERFLOW_POLICIES = ("drop-oldest", "block", "spill")
+
+
+@dataclass
+class CallbackStats:
+    """Timing counters for a single listener callback."""
+
+    calls: int = 0
+    errors: int = 0
+    slow: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "slow": self.slow,
+            "avgMs": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "maxMs": round(self.max_ms, 3),
+        }
+
+
+def callback_name(callback: Callable) -> str:
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class EventDispatcher:
+    """Queue of (event, callbacks) jobs serviced by a worker pool."""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        maxsize: int = 1000,
+        overflow: str = "drop-oldest",
+        slow_callback_ms: float = 100.0,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}"
+            )
+        self.workers = max(1, workers)
+        self.maxsize = max(1, maxsize)
+        self.overflow = overflow
+        self.slow_callback_ms = slow_callback_ms
+        self._queue: deque[tuple[Any, list[Callable]]] = deque()
+        self._spill: deque[tuple[Any, list[Callable]]] = deque()
+        self._not_empty: asyncio.Condition | None = None
+        self._not_full: asyncio.Condition | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._active = 0
+        self._callbacks: dict[str, CallbackStats] = {}
+        self.dispatched = 0
+        self.dropped = 0
+        self.spilled = 0
+
+    @classmethod
+    def from_env(cls) -> EventDispatcher:
+        return cls(
+            workers=int(os.getenv("EVENT_DISPATCH_WORKERS", 1)),
+            maxsize=int(os.getenv("EVENT_QUEUE_SIZE", 1000)),
+            overflow=os.getenv("EVENT_QUEUE_OVERFLOW", "drop-oldest"),
+            slow_callback_ms=float(os.getenv("EVENT_SLOW_CALLBACK_MS", 100.0)),
+        )
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue) + len(self._spill)
+
+    def _ensure_started(self) -> None:
+        self._tasks = [t for t in self._tasks if not t.done()]
+        if len(self._tasks) == self.workers:
+            return
+        if not self._tasks:
+            # Conditions bind to the running loop, so create them with the workers
+            self._not_empty = asyncio.Condition()
+            self._not_full = asyncio.Condition()
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def submit(self, event: Any, callbacks: list[Callable]) -> None:
+        """Enqueue an event for its callbacks, applying the overflow policy."""
+        if not callbacks:
+            return
+        self._ensure_started()
+        job = (event, callbacks)
+
+        if len(self._queue) >= self.maxsize:
+            if self.overflow == "drop-oldest":
+                self._queue.popleft()
+                self.dropped += 1
+            elif self.overflow == "spill":
+                self._spill.append(job)
+                self.spilled += 1
+                return
+            else:
+                async with self._not_full:
+                    await self._not_full.wait_for(lambda: len(self._queue) < self.maxsize)
+        elif self._spill:
+            # Preserve order: spilled events go back in before this one
+            self._spill.append(job)
+            self._refill()
+            job = None
+
+        if job is not None:
+            self._queue.append(job)
+        async with self._not_empty:
+            self._not_empty.notify()
+
+    def _refill(self) -> None:
+        while self._spill and len(self._queue) < self.maxsize:
+            self._queue.append(self._spill.popleft())
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._not_empty:
+                await self._not_empty.wait_for(lambda: bool(self._queue))
+                event, callbacks = self._queue.popleft()
+                self._refill()
+                self._active += 1
+            async with self._not_full:
+                self._not_full.notify()
+            try:
+                for callback in callbacks:
+                    await self._run(callback, event)
+            finally:
+                self._active -= 1
+            self.dispatched += 1
+
+    async def _run(self, callback: Callable, event: Any) -> None:
+        name = callback_name(callback)
+        stats = self._callbacks.get(name)
+        if stats is None:
+            stats = self._callbacks[name] = CallbackStats()
+
+        start = time.perf_counter()
+        try:
+            result = callback(event)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            stats.errors += 1
+            logger.error(f"Event callback {name} failed for {getattr(event, 'event', event)}: {e}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        if elapsed_ms >= self.slow_callback_ms:
+            stats.slow += 1
+            logger.warning(f"Slow event callback {name}: {elapsed_ms:.1f}ms")
+
+    async def drain(self) -> None:
+        """Wait until every queued event has been through its callbacks."""
+        while self.depth or self._active:
+            await asyncio.sleep(0)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._active = 0
+        self._queue.clear()
+        self._spill.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "overflow": self.overflow,
+            "depth": self.depth,
+            "maxSize": self.maxsize,
+            "dispatched": self.dispatched,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "callbacks": {n: s.to_dict() for n, s in sorted(self._callbacks.items())},
+        }
@@ -0,0 +1,114 @@
+"""Server-side topic filters for the SSE event stream.
+
+Routing keys (event name, agent, session) are extracted once per event at
+publish time; each subscriber's filter is compiled once when it connects
+and memoizes its glob decision per event name, so matching an event is a
+handful of dict and set lookups.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from dataclasses import dataclass
+
+from gateway_models import GatewayEvent
+
+
+@dataclass(frozen=True)
+class RoutingKeys:
+    """Fields subscribers can filter an event on."""
+
+    agent_id: str | None = None
+    session_key: str | None = None
+
+
+def agent_from_session_key(session_key: str) -> str | None:
+    """Extract the agent id from ``agent:{agentId}:{channel}:...`` keys."""
+    parts = session_key.split(":")
+    if len(parts) >= 2 and parts[0] == "agent" and parts[1]:
+        return parts[1]
+    return None
+
+
+def routing_keys(event: GatewayEvent) -> RoutingKeys:
+    payload = event.payload
+    session_key = payload.get("sessionKey")
+    if not isinstance(session_key, str):
+        session_key = None
+    agent_id = payload.get("agentId")
+    if not isinstance(agent_id, str):
+        agent_id = agent_from_session_key(session_key) if session_key else None
+    return RoutingKeys(agent_id=agent_id, session_key=session_key)
+
+
+def split_values(values: list[str] | None) -> frozenset[str]:
+    """Flatten repeated and comma-separated query values."""
+    if not values:
+        return frozenset()
+    return frozenset(v.strip() for raw in values for v in raw.split(",") if v.strip())
+
+
+class EventFilter:
+    """A subscriber's compiled topic subscription.
+
+    ``events`` are event-name globs (``chat``, ``agent*``, ``exec.approval.*``).
+    ``agent_ids`` and ``session_keys`` only constrain events that carry an
+    agent or session; events without one (``presence``, ``health``,
+    ``shutdown``) still pass so connection-level state keeps flowing.
+    """
+
+    def __init__(
+        self,
+        events: frozenset[str] = frozenset(),
+        agent_ids: frozenset[str] = frozenset(),
+        session_keys: frozenset[str] = frozenset(),
+    ):
+        self.events = events
+        self.agent_ids = agent_ids
+        self.session_keys = session_keys
+        literal = {e for e in events if not any(c in e for c in "*?[")}
+        globs = events - literal
+        self._literal_names = frozenset(literal)
+        self._glob = re.compile("|".join(fnmatch.translate(g) for g in globs)) if globs else None
+        self._name_cache: dict[str, bool] = {}
+
+    @classmethod
+    def from_query(
+        cls,
+        events: list[str] | None = None,
+        agent_ids: list[str] | None = None,
+        session_keys: list[str] | None = None,
+    ) -> EventFilter | None:
+        """Build a filter from query parameters, or None if nothing is filtered."""
+        f = cls(split_values(events), split_values(agent_ids), split_values(session_keys))
+        return f if f.events or f.agent_ids or f.session_keys else None
+
+    def _name_matches(self, name: str) -> bool:
+        cached = self._name_cache.get(name)
+        if cached is None:
+            cached = name in self._literal_names or bool(
+                self._glob is not None and self._glob.match(name)
+            )
+            self._name_cache[name] = cached
+        return cached
+
+    def matches(self, name: str, keys: RoutingKeys) -> bool:
+        if self.events and not self._name_matches(name):
+            return False
+        if self.agent_ids and keys.agent_id is not None and keys.agent_id not in self.agent_ids:
+            return False
+        if (
+            self.session_keys
+            and keys.session_key is not None
+            and keys.session_key not in self.session_keys
+        ):
+            return False
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "events": sorted(self.events),
+            "agentIds": sorted(self.agent_ids),
+            "sessionKeys": sorted(self.session_keys),
+        }
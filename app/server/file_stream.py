@@ -0,0 +1,162 @@
+"""Ranged, conditional delivery of agent workspace files.
+
+``agents.files.get`` returns a whole file in one response frame, and the
+gateway has no ranged read. The raw-file route therefore fetches a file
+once, keeps the bytes in a short-lived, byte-bounded LRU keyed by (agent,
+path), and serves any byte range of it as a chunked stream. Readers that
+page through a large log hit the gateway once per TTL, not once per page,
+and each HTTP response carries only the bytes asked for.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import mimetypes
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(ValueError):
+    """The Range header does not overlap the file."""
+
+
+@dataclass(frozen=True)
+class FileBlob:
+    data: bytes
+    etag: str
+    media_type: str
+    fetched_at: float
+
+
+def content_bytes(payload: Any) -> bytes:
+    """File bytes from an ``agents.files.get`` payload."""
+    if isinstance(payload, dict):
+        content = payload.get("content", "")
+        if payload.get("encoding") == "base64" and isinstance(content, str):
+            return base64.b64decode(content)
+    else:
+        content = payload
+    if isinstance(content, bytes):
+        return content
+    if not isinstance(content, str):
+        raise ValueError("File content is not text")
+    return content.encode("utf-8")
+
+
+def make_blob(path: str, data: bytes) -> FileBlob:
+    etag = '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+    media_type, _ = mimetypes.guess_type(path)
+    if media_type is None or media_type.startswith("text/"):
+        media_type = f"{media_type or 'text/plain'}; charset=utf-8"
+    return FileBlob(data, etag, media_type, time.monotonic())
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Whether an If-None-Match / If-Range header names ``etag``."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return etag in tags
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Inclusive (start, end) for a single ``bytes=`` range, or None for the whole file.
+
+    Multi-range and malformed headers are ignored (whole file), as RFC 9110
+    allows; a range that starts past the end, or any range of an empty
+    file, raises RangeNotSatisfiable.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+    first, _, last = spec.partition("-")
+    try:
+        if not first:
+            suffix = int(last)
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    # Raised outside the try: RangeNotSatisfiable is a ValueError
+    if not first:
+        if suffix <= 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - suffix), size - 1
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def iter_chunks(data: bytes, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    view = memoryview(data)
+    for offset in range(start, end + 1, chunk_size):
+        yield bytes(view[offset:min(offset + chunk_size, end + 1)])
+
+
+class FileContentCache:
+    """LRU of recently fetched files, bounded by total bytes and age."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 5.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._blobs: OrderedDict[tuple[str, str], FileBlob] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> FileContentCache:
+        return cls(
+            max_bytes=int(os.getenv("FILE_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+            ttl=float(os.getenv("FILE_CACHE_TTL", 5.0)),
+        )
+
+    def get(self, agent_id: str, path: str) -> FileBlob | None:
+        key = (agent_id, path)
+        blob = self._blobs.get(key)
+        if blob is None or time.monotonic() - blob.fetched_at > self.ttl:
+            if blob is not None:
+                self.invalidate(agent_id, path)
+            self.misses += 1
+            return None
+        self._blobs.move_to_end(key)
+        self.hits += 1
+        return blob
+
+    def put(self, agent_id: str, path: str, blob: FileBlob) -> None:
+        if len(blob.data) > self.max_bytes:
+            return
+        self.invalidate(agent_id, path)
+        self._blobs[(agent_id, path)] = blob
+        self.size += len(blob.data)
+        while self.size > self.max_bytes:
+            _, evicted = self._blobs.popitem(last=False)
+            self.size -= len(evicted.data)
+
+    def invalidate(self, agent_id: str, path: str) -> None:
+        blob = self._blobs.pop((agent_id, path), None)
+        if blob is not None:
+            self.size -= len(blob.data)
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._blobs),
+            "bytes": self.size,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,89 @@
+"""Fast decoding of inbound OpenClaw Gateway frames.
+
+``loads`` uses orjson or msgspec when installed (``pip install
+agent-hq-server[fast]``) and falls back to the stdlib. Events are wrapped
+in ``EventFrame``, a slotted view over the decoded dict that validates a
+field only when it is read, instead of a full Pydantic model per frame.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+from gateway_models import GatewayError, GatewayEvent
+
+# Decoder in use and the exceptions it raises on malformed input
+loads: Callable[[str | bytes], Any]
+DecodeError: tuple[type[Exception], ...]
+
+try:
+    import orjson
+
+    loads, DecodeError, DECODER = orjson.loads, (orjson.JSONDecodeError,), "orjson"
+except ImportError:
+    try:
+        import msgspec
+
+        loads, DecodeError, DECODER = msgspec.json.decode, (msgspec.DecodeError,), "msgspec"
+    except ImportError:
+        loads, DecodeError, DECODER = json.loads, (json.JSONDecodeError,), "json"
+
+
+class EventFrame:
+    """Lazily validated event frame, attribute-compatible with GatewayEvent.
+
+    Only the event name is checked up front since every dispatch needs it;
+    ``payload`` and ``seq`` are type-checked when accessed and raise
+    ValueError if the gateway sent something malformed.
+    """
+
+    __slots__ = ("_data", "event")
+    type = "event"
+
+    def __init__(self, data: dict):
+        name = data.get("event")
+        if not isinstance(name, str):
+            raise ValueError(f"Event frame without a name: {str(data)[:200]}")
+        self._data = data
+        self.event = name
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        payload = self._data.get("payload")
+        if payload is None:
+            payload = self._data["payload"] = {}
+        elif not isinstance(payload, dict):
+            raise ValueError(f"Event {self.event} payload is not an object")
+        return payload
+
+    @property
+    def seq(self) -> int | None:
+        seq = self._data.get("seq")
+        if seq is not None and type(seq) is not int:
+            raise ValueError(f"Event {self.event} seq is not an integer")
+        return seq
+
+    @property
+    def stateVersion(self) -> dict[str, int] | None:
+        return self._data.get("stateVersion")
+
+    def to_model(self) -> GatewayEvent:
+        """Fully validate into a GatewayEvent."""
+        return GatewayEvent(**self._data)
+
+    def __repr__(self) -> str:
+        return f"EventFrame(event={self.event!r}, seq={self._data.get('seq')!r})"
+
+
+def decode_event(data: dict) -> EventFrame:
+    return EventFrame(data)
+
+
+def decode_error_message(data: dict) -> str:
+    """Extract the error message from a failed response frame."""
+    error = data.get("error")
+    if not error:
+        return "Unknown error"
+    return GatewayError(**error).message
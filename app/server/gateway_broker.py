@@ -0,0 +1,417 @@
+"""Share one gateway connection between uvicorn worker processes.
+
+With ``GATEWAY_BROKER_SOCKET`` set, every worker process tries to take an
+exclusive ``flock`` next to that path at startup. The winner is the
+leader: it owns the real GatewayClient (and so the only gateway socket,
+event stream and RPC cache) and serves it on a Unix socket. Every other
+worker talks to the leader through a BrokerClient, a GatewayClient
+whose RPCs are forwarded to the leader and whose events are the ones
+the leader receives, replayed through the worker's own dispatcher.
+
+The wire format is newline-delimited JSON:
+  worker -> leader  {"type": "req", "id", "method", "params", "timeout", "priority"}
+                    {"type": "status", "id"}
+  leader -> worker  {"type": "res", "id", "ok", "payload" | "error": {"kind", "message"}}
+                    {"type": "event", "event", "payload", "seq"}
+
+If the leader exits, its lock is released; when uvicorn restarts the
+process it is re-elected, and workers reconnect to it with backoff.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+from typing import Any
+
+from gateway_client import GatewayClient, GatewayRequestError
+from gateway_models import ConnectionState, ConnectionStatus
+from rpc_cache import RpcCache
+from rpc_coalescer import request_key
+from rpc_scheduler import RpcPriority, is_read_method
+
+logger = logging.getLogger("gateway_broker")
+
+# Gateway frames are capped at 4 MiB; leave room for JSON re-encoding
+LINE_LIMIT = 16 * 1024 * 1024
+
+# Events are dropped for a worker whose unread backlog exceeds this
+MAX_WORKER_BACKLOG = 8 * 1024 * 1024
+
+
+def encode_line(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":"), default=str).encode() + b"\n"
+
+
+def error_kind(error: Exception) -> str:
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(error, ConnectionError):
+        return "connection"
+    if isinstance(error, GatewayRequestError):
+        return "gateway"
+    return "error"
+
+
+def error_from_kind(kind: str | None, message: str) -> Exception:
+    """Rebuild the exception type the leader raised, as routes expect it."""
+    if kind == "timeout":
+        return TimeoutError(message)
+    if kind == "connection":
+        return ConnectionError(message)
+    if kind == "gateway":
+        return GatewayRequestError(message)
+    return Exception(message)
+
+
+class GatewayBroker:
+    """Leader election and the leader side of the broker socket."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self._lock_fd: int | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._client: GatewayClient | None = None
+        self._workers: set[asyncio.StreamWriter] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self.requests = 0
+        self.events_forwarded = 0
+        self.events_dropped = 0
+
+    @classmethod
+    def from_env(cls) -> GatewayBroker | None:
+        """The configured broker, or None when running single-process."""
+        path = os.getenv("GATEWAY_BROKER_SOCKET", "")
+        return cls(path) if path else None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    def try_become_leader(self) -> bool:
+        """Take the leader lock without blocking; True if this process won."""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def serve(self, client: GatewayClient) -> None:
+        """Expose ``client`` to worker processes. Requires the leader lock."""
+        if not self.is_leader:
+            raise RuntimeError("Only the broker leader can serve the gateway")
+        self._client = client
+        # Holding the lock proves any existing socket file is stale
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(
+            self._handle_worker, path=self.path, limit=LINE_LIMIT
+        )
+        client.on_any_event(self._forward_event)
+        client.broker = self
+        logger.info(f"Gateway broker leader serving workers on {self.path}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._workers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._tasks):
+            task.cancel()
+        self._workers.clear()
+        if self._lock_fd is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def _handle_worker(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._workers.add(writer)
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.error("Malformed message from broker worker")
+                    continue
+                # Requests run concurrently; responses are matched by id
+                task = asyncio.create_task(self._serve(message, writer))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.warning(f"Broker worker connection lost: {e}")
+        finally:
+            self._workers.discard(writer)
+            writer.close()
+
+    async def _serve(self, message: dict, writer: asyncio.StreamWriter) -> None:
+        client = self._client
+        response: dict[str, Any] = {"type": "res", "id": message.get("id")}
+        try:
+            if message.get("type") == "status":
+                payload = client.get_status().model_dump(mode="json")
+            else:
+                payload = await self._request(client, message)
+            response.update(ok=True, payload=payload)
+        except Exception as e:
+            response.update(ok=False, error={"kind": error_kind(e), "message": str(e)})
+
+        if writer.is_closing():
+            return
+        writer.write(encode_line(response))
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+
+    async def _request(self, client: GatewayClient, message: dict) -> Any:
+        self.requests += 1
+        method = message["method"]
+        params = message.get("params") or None
+        timeout = float(message.get("timeout", 30.0))
+        priority = message.get("priority")
+        priority = RpcPriority(priority) if priority is not None else None
+
+        if is_read_method(method):
+            # Identical reads from several workers share one gateway round trip on
+            # the default timeout; a worker's own timeout bounds only its wait
+            return await client.single_flight.do(
+                request_key(method, params),
+                lambda: client.send_request(method, params, priority=priority),
+                timeout=timeout,
+            )
+        return await client.send_request(method, params, timeout=timeout, priority=priority)
+
+    def _forward_event(self, event: Any) -> None:
+        if not self._workers:
+            return
+        line = encode_line(
+            {"type": "event", "event": event.event, "payload": event.payload, "seq": event.seq}
+        )
+        for writer in list(self._workers):
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_WORKER_BACKLOG:
+                self.events_dropped += 1
+                continue
+            writer.write(line)
+            self.events_forwarded += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "role": "leader",
+            "socket": self.path,
+            "workers": len(self._workers),
+            "requests": self.requests,
+            "eventsForwarded": self.events_forwarded,
+            "eventsDropped": self.events_dropped,
+        }
+
+
+class BrokerClient(GatewayClient):
+    """A worker's view of the leader's gateway connection.
+
+    ``state`` tracks the link to the leader; ``is_connected`` additionally
+    requires the leader itself to be connected to the gateway, as last
+    reported by its status, which is polled every ``status_interval``
+    seconds. Caching is left to the leader so every worker sees the same
+    invalidations. Reads issued while the link is down wait in
+    ``self.replay`` until it is back; while the leader itself is
+    reconnecting they are forwarded and held in the leader's replay queue.
+    """
+
+    def __init__(self, path: str, status_interval: float = 2.0, **kwargs):
+        kwargs.setdefault("cache", RpcCache(max_entries=0))
+        super().__init__(url=f"unix:{path}", token="", **kwargs)
+        self.path = path
+        self.status_interval = status_interval
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._status_task: asyncio.Task | None = None
+        self._leader_status: dict | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        return (
+            self.state == ConnectionState.CONNECTED
+            and self._leader_status is not None
+            and self._leader_status.get("state") == ConnectionState.CONNECTED.value
+        )
+
+    def get_status(self) -> ConnectionStatus:
+        if self.state == ConnectionState.CONNECTED and self._leader_status is not None:
+            status = ConnectionStatus(**self._leader_status)
+        else:
+            status = ConnectionStatus(state=self.state)
+        status.broker = {
+            "role": "worker",
+            "socket": self.path,
+            "link": self.state.value,
+            "leader": (self._leader_status or {}).get("broker"),
+        }
+        status.eventDispatch = self.dispatcher.get_stats()
+        return status
+
+    async def connect(self) -> None:
+        self.state = ConnectionState.CONNECTING
+        self._should_reconnect = True
+        try:
+            self._reader, self._writer = await asyncio.open_unix_connection(
+                self.path, limit=LINE_LIMIT
+            )
+        except OSError as e:
+            logger.warning(f"Gateway broker leader not reachable at {self.path}: {e}")
+            self.state = ConnectionState.DISCONNECTED
+            if self._should_reconnect:
+                self._start_reconnect()
+            return
+
+        self.state = ConnectionState.CONNECTED
+        self.backoff.reset()
+        self._last_event_seq = None
+        # Events the leader forwarded while the link was down are gone
+        self._resync()
+        self._message_task = asyncio.create_task(self._handle_messages())
+        self._status_task = asyncio.create_task(self._poll_status())
+        logger.info(f"Connected to gateway broker leader at {self.path}")
+        self.replay.release()
+
+    async def disconnect(self) -> None:
+        if self._status_task and not self._status_task.done():
+            self._status_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._status_task
+        if self._writer is not None:
+            self._writer.close()
+        self._ws = None
+        self._leader_status = None
+        await super().disconnect()
+
+    async def _poll_status(self) -> None:
+        connected = ConnectionState.CONNECTED.value
+        while self.state == ConnectionState.CONNECTED:
+            try:
+                previous = (self._leader_status or {}).get("state")
+                self._leader_status = await self._call({"type": "status"}, timeout=5.0)
+                # The leader reconnected to the gateway; events from the gap never reached us
+                if previous not in (None, connected) and self._leader_status.get("state") == connected:
+                    self._resync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to refresh gateway status from broker: {e}")
+            await asyncio.sleep(self.status_interval)
+
+    async def _request(
+        self,
+        method: str,
+        params: dict[str, Any] | None,
+        timeout: float,
+        priority: RpcPriority | None,
+    ) -> Any:
+        """Forward an RPC to the leader, which applies its scheduler and cache."""
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        replayed = False
+        message = {
+            "type": "req",
+            "method": method,
+            "params": params or {},
+            "timeout": timeout,
+            "priority": int(priority) if priority is not None else None,
+        }
+
+        while True:
+            if not self.is_connected:
+                if not self.can_queue(method):
+                    raise ConnectionError("Not connected to gateway")
+                if self.state != ConnectionState.CONNECTED:
+                    await self.replay.wait(method, max(deadline - loop.time(), 0))
+            try:
+                # Allow the leader to report its own timeout before ours fires
+                return await self._call(message, max(deadline - loop.time(), 0) + 1.0)
+            except TimeoutError as e:
+                raise TimeoutError(
+                    str(e) or f"Request {method} timed out after {timeout}s"
+                ) from None
+            except ConnectionError:
+                if replayed or not self.can_queue(method):
+                    raise
+                replayed = True
+
+    def can_queue(self, method: str) -> bool:
+        """Whether a read may wait out a reconnect of the link or of the leader."""
+        if not (self._should_reconnect and self.replay.enabled and is_read_method(method)):
+            return False
+        if self.state in (ConnectionState.CONNECTING, ConnectionState.RECONNECTING):
+            return True
+        # Link is up: the leader holds the read in its own replay queue
+        leader_state = (self._leader_status or {}).get("state")
+        return self.state == ConnectionState.CONNECTED and leader_state in (
+            None,
+            ConnectionState.CONNECTING.value,
+            ConnectionState.RECONNECTING.value,
+        )
+
+    async def _call(self, message: dict, timeout: float) -> Any:
+        if self.state != ConnectionState.CONNECTED or self._writer is None:
+            raise ConnectionError("Not connected to gateway broker")
+
+        request_id = self._next_request_id()
+        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        self._pending_requests[request_id] = future
+        try:
+            self._writer.write(encode_line({**message, "id": request_id}))
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Broker request timed out after {timeout}s") from None
+        finally:
+            self._pending_requests.pop(request_id, None)
+
+    async def _handle_messages(self) -> None:
+        try:
+            while line := await self._reader.readline():
+                try:
+                    data = json.loads(line)
+                    frame_type = data.get("type")
+                    if frame_type == "res":
+                        self._handle_response(data)
+                    elif frame_type == "event":
+                        await self._handle_event(data)
+                except json.JSONDecodeError:
+                    logger.error("Malformed message from gateway broker")
+                except Exception as e:
+                    logger.error(f"Error processing broker message: {e}")
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.error(f"Broker link error: {e}")
+
+        logger.warning("Gateway broker leader connection lost")
+        self._leader_status = None
+        self._connection_lost("Gateway broker connection lost")
+
+    def _handle_response(self, data: dict) -> None:
+        future = self._pending_requests.pop(data.get("id"), None)
+        if future is None or future.done():
+            return
+        if data.get("ok") is True:
+            future.set_result(data.get("payload"))
+        else:
+            error = data.get("error") or {}
+            future.set_exception(
+                error_from_kind(error.get("kind"), error.get("message", "Unknown error"))
+            )
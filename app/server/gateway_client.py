@@ -11,30 +11,57 @@ import asyncio
 import json
 import logging
 import os
+import time
 from collections.abc import Callable
 from typing import Any
 
 import websockets
 from websockets.exceptions import ConnectionClosed
 
+import frame_codec
+import metrics
+import tracing
+from event_dispatch import EventDispatcher
+from gateway_liveness import LivenessPolicy, RttHistogram
 from gateway_models import (
     ClientInfo,
     ConnectionState,
     ConnectionStatus,
     ConnectParams,
-    GatewayEvent,
     GatewayRequest,
-    GatewayResponse,
     ServerInfo,
 )
+from gateway_reconnect import Backoff, ReplayQueue
+from rpc_cache import RpcCache
+from rpc_coalescer import SingleFlight
+from rpc_scheduler import RpcPriority, RpcScheduler, is_read_method
 
 logger = logging.getLogger("gateway_client")
 
 
+class RequestNotSentError(ConnectionError):
+    """The request frame never reached the gateway, so it is safe to retry."""
+
+
+class GatewayRequestError(Exception):
+    """The gateway answered a request with an error frame."""
+
+
 class GatewayClient:
     """WebSocket client for the OpenClaw Gateway."""
 
-    def __init__(self, url: str | None = None, token: str | None = None):
+    def __init__(
+        self,
+        url: str | None = None,
+        token: str | None = None,
+        scheduler: RpcScheduler | None = None,
+        cache: RpcCache | None = None,
+        dispatcher: EventDispatcher | None = None,
+        subscribe_events: bool = True,
+        backoff: Backoff | None = None,
+        replay: ReplayQueue | None = None,
+        liveness: LivenessPolicy | None = None,
+    ):
         self.url = url if url is not None else os.getenv("OPENCLAW_GATEWAY_URL", "")
         self.token = token if token is not None else os.getenv("OPENCLAW_GATEWAY_TOKEN", "")
         self.state = ConnectionState.DISCONNECTED
@@ -42,17 +69,32 @@ class GatewayClient:
         self.available_methods: list[str] = []
         self.available_events: list[str] = []
         self.uptime_ms: int | None = None
+        self.tick_interval: float | None = None
 
         self._ws: Any = None
         self._request_counter = 0
         self._pending_requests: dict[str, asyncio.Future] = {}
+        self.scheduler = scheduler if scheduler is not None else RpcScheduler.from_env()
+        self.single_flight = SingleFlight()
+        self.cache = cache if cache is not None else RpcCache.from_env()
+        self._last_event_seq: int | None = None
+        self.dispatcher = dispatcher if dispatcher is not None else EventDispatcher.from_env()
+        self.subscribe_events = subscribe_events
+        # Set by gateway_broker when this process serves other workers
+        self.broker: Any = None
         self._event_callbacks: dict[str, list[Callable]] = {}
         self._global_event_callbacks: list[Callable] = []
+        self._resync_callbacks: list[Callable[[], None]] = []
         self._message_task: asyncio.Task | None = None
         self._reconnect_task: asyncio.Task | None = None
         self._should_reconnect = True
-        self._reconnect_delay = 1.0
-        self._max_reconnect_delay = 30.0
+        self.backoff = backoff if backoff is not None else Backoff.from_env()
+        self.replay = replay if replay is not None else ReplayQueue.from_env()
+        self.liveness = liveness if liveness is not None else LivenessPolicy.from_env()
+        self.rtt = RttHistogram()
+        self.stale_disconnects = 0
+        self._last_frame_at = 0.0
+        self._heartbeat_task: asyncio.Task | None = None
 
     @property
     def is_connected(self) -> bool:
@@ -70,8 +112,28 @@ class GatewayClient:
             availableEvents=self.available_events,
             uptimeMs=self.uptime_ms,
             gatewayUrl=self.url if self.url else None,
+            scheduler=self.scheduler.get_stats(),
+            coalescing=self.single_flight.get_stats(),
+            cache=self.cache.get_stats(),
+            eventDispatch=self.dispatcher.get_stats(),
+            reconnect={"attempts": self.backoff.attempts, "replay": self.replay.get_stats()},
+            liveness=self.get_liveness_stats(),
+            broker=self.broker.get_stats() if self.broker is not None else None,
         )
 
+    def get_liveness_stats(self) -> dict:
+        deadline = self.liveness.silence_deadline(self.tick_interval)
+        connected = self.state == ConnectionState.CONNECTED and self._last_frame_at
+        return {
+            "tickIntervalMs": int(self.tick_interval * 1000) if self.tick_interval else None,
+            "silenceDeadlineMs": int(deadline * 1000),
+            "lastFrameAgoMs": (
+                int((time.monotonic() - self._last_frame_at) * 1000) if connected else None
+            ),
+            "staleDisconnects": self.stale_disconnects,
+            "rtt": self.rtt.get_stats(),
+        }
+
     def _next_request_id(self) -> str:
         self._request_counter += 1
         return str(self._request_counter)
@@ -86,6 +148,23 @@ class GatewayClient:
         """Register a callback for all events."""
         self._global_event_callbacks.append(callback)
 
+    def on_resync(self, callback: Callable[[], None]) -> None:
+        """Register a callback for when events may have been missed.
+
+        Called after every (re)connect handshake and on an event sequence gap,
+        alongside clearing the RPC cache.
+        """
+        self._resync_callbacks.append(callback)
+
+    def _resync(self) -> None:
+        """Drop state derived from events, since some may have been missed."""
+        self.cache.clear()
+        for callback in self._resync_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in resync callback: {e}")
+
     async def connect(self) -> None:
         """Establish WebSocket connection and perform handshake."""
         if not self.is_configured:
@@ -104,14 +183,22 @@ class GatewayClient:
                 additional_headers={"Origin": origin},
                 max_size=4 * 1024 * 1024,
                 close_timeout=5,
+                # Keepalive pings are sent by _heartbeat_loop, which also times them
+                ping_interval=None,
             )
             await self._perform_handshake()
+            # Events are not replayed across connections, so cached reads may be stale
+            self._resync()
+            self._last_event_seq = None
             self.state = ConnectionState.CONNECTED
-            self._reconnect_delay = 1.0
+            self.backoff.reset()
             logger.info("Gateway connection established successfully")
 
             # Start message handler
+            self._last_frame_at = time.monotonic()
             self._message_task = asyncio.create_task(self._handle_messages())
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+            self.replay.release()
 
         except Exception as e:
             logger.error(f"Failed to connect to gateway: {e}")
@@ -130,12 +217,13 @@ class GatewayClient:
             except asyncio.CancelledError:
                 pass
 
-        if self._message_task and not self._message_task.done():
-            self._message_task.cancel()
-            try:
-                await self._message_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._heartbeat_task, self._message_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
         if self._ws:
             try:
@@ -143,7 +231,11 @@ class GatewayClient:
             except Exception:
                 pass
 
-        # Cancel all pending requests
+        await self.dispatcher.stop()
+
+        # Cancel all pending and queued requests
+        self.replay.fail(ConnectionError("Gateway client disconnected"))
+        self.scheduler.cancel_all()
         for future in self._pending_requests.values():
             if not future.done():
                 future.cancel()
@@ -153,11 +245,107 @@ class GatewayClient:
         logger.info("Gateway connection closed")
 
     async def send_request(
-        self, method: str, params: dict[str, Any] | None = None, timeout: float = 30.0
+        self,
+        method: str,
+        params: dict[str, Any] | None = None,
+        timeout: float = 30.0,
+        priority: RpcPriority | None = None,
     ) -> Any:
-        """Send an RPC request and await the response."""
-        if not self.is_connected or not self._ws:
-            raise ConnectionError("Not connected to gateway")
+        """Send an RPC request and await the response, recording its metrics."""
+        start = time.perf_counter()
+        outcome = "error"
+        with tracing.span("gateway.rpc", method=method) as span:
+            try:
+                result = await self._request(method, params, timeout, priority)
+                outcome = "ok"
+                return result
+            except TimeoutError:
+                outcome = "timeout"
+                raise
+            except ConnectionError:
+                outcome = "connection"
+                raise
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                span.set("outcome", outcome)
+                metrics.RPC_REQUESTS.inc(method, outcome)
+                metrics.RPC_DURATION.observe(time.perf_counter() - start, method)
+
+    async def _request(
+        self,
+        method: str,
+        params: dict[str, Any] | None,
+        timeout: float,
+        priority: RpcPriority | None,
+    ) -> Any:
+        """Serve an RPC from cache or send it over the socket.
+
+        Cacheable reads are served from ``self.cache`` when fresh. Otherwise
+        the request waits for an in-flight slot from the scheduler; the
+        timeout covers both the queue wait and the round trip. Reads issued
+        while reconnecting, or cut off by a dropped socket, wait in
+        ``self.replay`` and are sent once after the handshake completes.
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        replayed = False
+        span = tracing.current_span()
+
+        while True:
+            if not self.is_connected:
+                if not self.can_queue(method):
+                    raise ConnectionError("Not connected to gateway")
+                span.set("replayQueued", True)
+                await self.replay.wait(method, max(deadline - loop.time(), 0))
+
+            hit, cached = self.cache.get(method, params)
+            span.set("cache", "hit" if hit else "miss")
+            if hit:
+                return cached
+            cache_token = self.cache.token(method)
+
+            queued_at = loop.time()
+            try:
+                await asyncio.wait_for(
+                    self.scheduler.acquire(method, priority),
+                    timeout=max(deadline - loop.time(), 0),
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"Request {method} timed out after {timeout}s waiting for a slot"
+                )
+            span.set("queueMs", round((loop.time() - queued_at) * 1000, 3))
+
+            try:
+                result = await self._send_raw(method, params, max(deadline - loop.time(), 0))
+                self.cache.put(method, params, result, cache_token)
+                return result
+            except TimeoutError:
+                raise TimeoutError(f"Request {method} timed out after {timeout}s") from None
+            except ConnectionError:
+                if replayed or not self.can_queue(method):
+                    raise
+                replayed = True
+                span.set("retried", True)
+            finally:
+                self.cache.invalidate_for_write(method)
+                self.scheduler.release(method)
+
+    def can_queue(self, method: str) -> bool:
+        """Whether ``method`` may wait in the replay queue for a reconnect."""
+        return (
+            self._should_reconnect
+            and self.replay.enabled
+            and self.state in (ConnectionState.CONNECTING, ConnectionState.RECONNECTING)
+            and is_read_method(method)
+        )
+
+    async def _send_raw(self, method: str, params: dict[str, Any] | None, timeout: float) -> Any:
+        """Write a request frame to this socket and await its response frame."""
+        if self.state != ConnectionState.CONNECTED or not self._ws:
+            raise RequestNotSentError("Not connected to gateway")
 
         request_id = self._next_request_id()
         request = GatewayRequest(
@@ -170,15 +358,22 @@ class GatewayClient:
         self._pending_requests[request_id] = future
 
         try:
-            await self._ws.send(request.model_dump_json())
-            result = await asyncio.wait_for(future, timeout=timeout)
-            return result
+            try:
+                await self._ws.send(request.model_dump_json())
+            except ConnectionClosed as e:
+                raise RequestNotSentError(f"Gateway connection closed: code={e.code}") from e
+            return await asyncio.wait_for(future, timeout=timeout)
         except asyncio.TimeoutError:
-            self._pending_requests.pop(request_id, None)
             raise TimeoutError(f"Request {method} timed out after {timeout}s")
-        except Exception:
+        finally:
             self._pending_requests.pop(request_id, None)
-            raise
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail every request awaiting a response on this socket."""
+        for future in self._pending_requests.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending_requests.clear()
 
     async def _perform_handshake(self) -> None:
         """Execute the 3-stage handshake protocol."""
@@ -237,6 +432,9 @@ class GatewayClient:
         snapshot = payload.get("snapshot", {})
         self.uptime_ms = snapshot.get("uptimeMs")
 
+        tick_ms = (payload.get("policy") or {}).get("tickIntervalMs")
+        self.tick_interval = tick_ms / 1000.0 if tick_ms else None
+
         logger.info(
             f"Handshake complete - server v{self.server_info.version}, "
             f"{len(self.available_methods)} methods, {len(self.available_events)} events"
@@ -246,21 +444,29 @@ class GatewayClient:
         """Background task to process incoming WebSocket frames."""
         try:
             async for raw in self._ws:
+                start = self._last_frame_at = time.monotonic()
+                frame_type = "invalid"
                 try:
-                    data = json.loads(raw)
+                    data = frame_codec.loads(raw)
                     frame_type = data.get("type")
 
                     if frame_type == "res":
                         self._handle_response(data)
                     elif frame_type == "event":
-                        await self._handle_event(data)
+                        if self.subscribe_events:
+                            await self._handle_event(data)
                     else:
                         logger.warning(f"Unknown frame type: {frame_type}")
+                        frame_type = "unknown"
 
-                except json.JSONDecodeError:
+                except frame_codec.DecodeError:
+                    metrics.FRAME_ERRORS.inc("decode")
                     logger.error("Received malformed JSON from gateway")
                 except Exception as e:
+                    metrics.FRAME_ERRORS.inc("handler")
                     logger.error(f"Error processing message: {e}")
+                metrics.FRAMES.inc(frame_type)
+                metrics.FRAME_DURATION.observe(time.monotonic() - start, frame_type)
 
         except ConnectionClosed as e:
             logger.warning(f"Gateway connection closed: code={e.code}")
@@ -269,94 +475,252 @@ class GatewayClient:
         except Exception as e:
             logger.error(f"Message handler error: {e}")
 
-        # Connection lost
+        self._connection_lost("Gateway connection lost")
+
+    def _connection_lost(self, reason: str) -> None:
+        """Fail in-flight requests, since their responses will never arrive.
+
+        RECONNECTING is entered first so that failed reads are held for replay.
+        """
         self.state = ConnectionState.DISCONNECTED
         if self._should_reconnect:
             self._start_reconnect()
+        self._fail_pending(ConnectionError(reason))
+
+    async def _heartbeat_loop(self) -> None:
+        """Ping the gateway and drop the socket once it stops answering.
+
+        Any inbound frame counts as a sign of life; ticks arrive every
+        tick interval even when nothing else is happening.
+        """
+        ws = self._ws
+        interval = self.liveness.ping_interval if self.liveness.ping_interval > 0 else 1.0
+        while self.state == ConnectionState.CONNECTED and self._ws is ws:
+            await asyncio.sleep(interval)
+            if self.state != ConnectionState.CONNECTED or self._ws is not ws:
+                return
+
+            silent = time.monotonic() - self._last_frame_at
+            if silent > self.liveness.silence_deadline(self.tick_interval):
+                await self._drop_stale(f"no frames for {silent:.1f}s")
+                return
+            if self.liveness.ping_interval <= 0:
+                continue
+
+            start = time.monotonic()
+            try:
+                pong = await ws.ping()
+                await asyncio.wait_for(pong, timeout=self.liveness.ping_timeout)
+            except asyncio.TimeoutError:
+                await self._drop_stale(f"no pong within {self.liveness.ping_timeout}s")
+                return
+            except ConnectionClosed:
+                return
+            now = time.monotonic()
+            self.rtt.add((now - start) * 1000)
+            self._last_frame_at = now
+
+    async def _drop_stale(self, reason: str) -> None:
+        """Abort a socket that looks half-open and start reconnecting."""
+        logger.warning(f"Gateway socket stale ({reason}), reconnecting")
+        self.stale_disconnects += 1
+        if self._message_task and not self._message_task.done():
+            self._message_task.cancel()
+            try:
+                await self._message_task
+            except asyncio.CancelledError:
+                pass
+        # A closing handshake would wait on the dead peer, so abort outright
+        transport = getattr(self._ws, "transport", None)
+        if transport is not None:
+            transport.abort()
+        self._connection_lost("Gateway connection stale")
 
     def _handle_response(self, data: dict) -> None:
         """Match a response to its pending request."""
         request_id = data.get("id")
         future = self._pending_requests.pop(request_id, None)
         if future and not future.done():
-            response = GatewayResponse(**data)
-            if response.ok:
-                future.set_result(response.payload)
+            if data.get("ok") is True:
+                future.set_result(data.get("payload"))
             else:
-                error = response.error
-                msg = error.message if error else "Unknown error"
-                future.set_exception(Exception(f"Gateway error: {msg}"))
+                msg = frame_codec.decode_error_message(data)
+                future.set_exception(GatewayRequestError(f"Gateway error: {msg}"))
 
-    async def _handle_event(self, data: dict) -> None:
-        """Dispatch event to registered callbacks."""
-        event = GatewayEvent(**data)
+    def _track_seq(self, seq: Any) -> None:
+        # A sequence gap means we missed events, so nothing cached can be trusted
+        if type(seq) is not int:
+            return
+        if self._last_event_seq is not None and seq > self._last_event_seq + 1:
+            logger.info(f"Event sequence gap {self._last_event_seq} -> {seq}")
+            self._resync()
+        self._last_event_seq = seq
 
-        # Handle tick events for liveness
-        if event.event == "tick":
-            logger.debug("Received tick")
+    def _handle_tick(self, data: dict) -> None:
+        """Handle a tick without building an event model."""
+        self._track_seq(data.get("seq"))
+        logger.debug("Received tick")
+
+    async def _handle_event(self, data: dict) -> None:
+        """Apply client-side effects of an event and queue it for callbacks."""
+        metrics.EVENTS.inc(str(data.get("event")))
+        # Ticks are the most frequent frame and never reach callbacks
+        if data.get("event") == "tick":
+            self._handle_tick(data)
             return
 
+        event = frame_codec.decode_event(data)
+        self._track_seq(event.seq)
+
         # Handle shutdown events
         if event.event == "shutdown":
             logger.warning(f"Gateway shutdown: {event.payload}")
             restart_ms = event.payload.get("restartExpectedMs")
             if restart_ms:
-                self._reconnect_delay = restart_ms / 1000.0
+                self.backoff.floor = restart_ms / 1000.0
 
-        # Dispatch to event-specific callbacks
-        callbacks = self._event_callbacks.get(event.event, [])
-        for callback in callbacks:
-            try:
-                result = callback(event)
-                if asyncio.iscoroutine(result):
-                    await result
-            except Exception as e:
-                logger.error(f"Event callback error for {event.event}: {e}")
+        self.cache.invalidate_for_event(event.event)
 
-        # Dispatch to global callbacks
-        for callback in self._global_event_callbacks:
-            try:
-                result = callback(event)
-                if asyncio.iscoroutine(result):
-                    await result
-            except Exception as e:
-                logger.error(f"Global event callback error: {e}")
+        # Listener callbacks run on the dispatcher's workers, off the reader task
+        callbacks = self._event_callbacks.get(event.event, []) + self._global_event_callbacks
+        await self.dispatcher.submit(event, callbacks)
 
     def _start_reconnect(self) -> None:
         """Start the reconnection loop."""
+        self.state = ConnectionState.RECONNECTING
         if self._reconnect_task and not self._reconnect_task.done():
             return
         self._reconnect_task = asyncio.create_task(self._reconnect_loop())
 
     async def _reconnect_loop(self) -> None:
-        """Reconnect with exponential backoff."""
+        """Reconnect with full-jitter exponential backoff."""
         while self._should_reconnect:
             self.state = ConnectionState.RECONNECTING
-            delay = self._reconnect_delay
+            delay = self.backoff.next_delay()
 
-            logger.info(f"Reconnecting in {delay:.1f}s...")
+            logger.info(f"Reconnecting in {delay:.1f}s (attempt {self.backoff.attempts})...")
             await asyncio.sleep(delay)
 
             if not self._should_reconnect:
                 break
 
-            # Increase backoff
-            self._reconnect_delay = min(
-                self._reconnect_delay * 2, self._max_reconnect_delay
-            )
-
             try:
-                await self.connect()
-                if self.is_connected:
+                await self._reconnect()
+                if self.state == ConnectionState.CONNECTED:
                     return
             except Exception as e:
                 logger.error(f"Reconnection attempt failed: {e}")
 
+    async def _reconnect(self) -> None:
+        """Re-establish this client's own connection after it dropped."""
+        await self.connect()
+
+
+class GatewayPool(GatewayClient):
+    """Several authenticated gateway sockets behind the GatewayClient API.
+
+    The pool itself is the primary connection: it is the one that
+    subscribes to gateway events and dispatches them to listeners. The
+    extra member connections carry RPCs only. Each RPC is routed to the
+    connected socket with the fewest outstanding requests; if that socket
+    drops, reads are retried on another one, and writes are retried only
+    when the frame provably never left. Scheduling, caching and
+    coalescing stay pool-wide.
+    """
+
+    def __init__(self, size: int, url: str | None = None, token: str | None = None, **kwargs):
+        super().__init__(url, token, **kwargs)
+        self.members = [
+            GatewayClient(self.url, self.token, cache=RpcCache(max_entries=0), subscribe_events=False)
+            for _ in range(max(0, size - 1))
+        ]
+        self.failovers = 0
+
+    @property
+    def connections(self) -> list[GatewayClient]:
+        return [self, *self.members]
+
+    @property
+    def is_connected(self) -> bool:
+        return any(c.state == ConnectionState.CONNECTED for c in self.connections)
+
+    def get_status(self) -> ConnectionStatus:
+        status = super().get_status()
+        if self.is_connected:
+            status.state = ConnectionState.CONNECTED
+        status.pool = {
+            "size": len(self.connections),
+            "failovers": self.failovers,
+            "connections": [
+                {
+                    "role": "events" if c is self else "rpc",
+                    "state": c.state.value,
+                    "outstanding": len(c._pending_requests),
+                }
+                for c in self.connections
+            ],
+        }
+        return status
+
+    async def connect(self) -> None:
+        await asyncio.gather(
+            super().connect(), *(m.connect() for m in self.members)
+        )
+
+    async def disconnect(self) -> None:
+        await asyncio.gather(
+            super().disconnect(), *(m.disconnect() for m in self.members)
+        )
+
+    async def _reconnect(self) -> None:
+        # Members run their own reconnect loops; only the primary socket died
+        await GatewayClient.connect(self)
+
+    async def _send_raw(self, method: str, params: dict[str, Any] | None, timeout: float) -> Any:
+        """Route to the least-loaded socket, failing over if it drops."""
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        tried: set[int] = set()
+        while True:
+            candidates = [
+                c for c in self.connections
+                if c.state == ConnectionState.CONNECTED and id(c) not in tried
+            ]
+            if not candidates:
+                raise RequestNotSentError("Not connected to gateway")
+            conn = min(candidates, key=lambda c: len(c._pending_requests))
+            tried.add(id(conn))
+            try:
+                return await GatewayClient._send_raw(
+                    conn, method, params, max(deadline - loop.time(), 0)
+                )
+            except RequestNotSentError:
+                pass
+            except ConnectionError:
+                if not is_read_method(method):
+                    raise
+            self.failovers += 1
+            logger.warning(f"Gateway socket lost during {method}, failing over")
+
+
+def create_gateway_client() -> GatewayClient:
+    """Build the client configured by OPENCLAW_GATEWAY_POOL_SIZE."""
+    size = int(os.getenv("OPENCLAW_GATEWAY_POOL_SIZE", 1))
+    if size > 1:
+        return GatewayPool(size)
+    return GatewayClient()
+
 
 # Module-level singleton
-gateway_client = GatewayClient()
+gateway_client = create_gateway_client()
 
 
 def get_gateway_client() -> GatewayClient:
     """Dependency injection helper for FastAPI."""
     return gateway_client
+
+
+def set_gateway_client(client: GatewayClient) -> None:
+    """Replace the singleton, e.g. with a broker worker client at startup."""
+    global gateway_client
+    gateway_client = client
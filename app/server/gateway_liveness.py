@@ -0,0 +1,83 @@
+"""Liveness deadlines and round-trip latency for the gateway socket.
+
+The gateway sends a ``tick`` event every ``tickIntervalMs`` (15 s by
+default) and answers WebSocket pings, so a healthy socket never goes
+quiet for long. GatewayClient records when any frame last arrived and
+pings every ``ping_interval`` seconds; a socket that misses a pong or
+stays silent past the liveness timeout is torn down and reconnected,
+instead of being discovered by an RPC timing out 30 s later.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+from collections import deque
+from dataclasses import dataclass
+
+DEFAULT_TICK_INTERVAL = 15.0
+
+# Upper bounds (ms) of the RTT histogram buckets; the last bucket is open-ended
+RTT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+@dataclass
+class LivenessPolicy:
+    """When to ping, and how long a socket may stay silent.
+
+    ``timeout`` of None derives the silence deadline from the gateway's
+    tick interval: two missed ticks mean the socket is dead.
+    """
+
+    ping_interval: float = 5.0
+    ping_timeout: float = 5.0
+    timeout: float | None = None
+
+    @classmethod
+    def from_env(cls) -> LivenessPolicy:
+        timeout = os.getenv("OPENCLAW_LIVENESS_TIMEOUT")
+        return cls(
+            ping_interval=float(os.getenv("OPENCLAW_PING_INTERVAL", 5.0)),
+            ping_timeout=float(os.getenv("OPENCLAW_PING_TIMEOUT", 5.0)),
+            timeout=float(timeout) if timeout else None,
+        )
+
+    def silence_deadline(self, tick_interval: float | None) -> float:
+        if self.timeout is not None:
+            return self.timeout
+        return 2 * (tick_interval or DEFAULT_TICK_INTERVAL)
+
+
+class RttHistogram:
+    """Bucketed histogram and percentiles over the last ``window`` samples."""
+
+    def __init__(self, window: int = 256):
+        self._samples: deque[float] = deque(maxlen=max(1, window))
+        self._counts = [0] * (len(RTT_BUCKETS_MS) + 1)
+        self.total = 0
+
+    def add(self, rtt_ms: float) -> None:
+        if len(self._samples) == self._samples.maxlen:
+            self._counts[bisect.bisect_left(RTT_BUCKETS_MS, self._samples[0])] -= 1
+        self._samples.append(rtt_ms)
+        self._counts[bisect.bisect_left(RTT_BUCKETS_MS, rtt_ms)] += 1
+        self.total += 1
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def get_stats(self) -> dict:
+        labels = [f"le{b}" for b in RTT_BUCKETS_MS] + ["inf"]
+        p50, p95, p99 = (self.percentile(q) for q in (0.5, 0.95, 0.99))
+        return {
+            "samples": len(self._samples),
+            "total": self.total,
+            "lastMs": round(self._samples[-1], 3) if self._samples else None,
+            "p50Ms": round(p50, 3) if p50 is not None else None,
+            "p95Ms": round(p95, 3) if p95 is not None else None,
+            "p99Ms": round(p99, 3) if p99 is not None else None,
+            "buckets": dict(zip(labels, self._counts)),
+        }
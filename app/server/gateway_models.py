@@ -102,6 +102,14 @@ class ConnectionStatus(BaseModel):
     availableEvents: list[str] = Field(default_factory=list)
     uptimeMs: Optional[int] = None
     gatewayUrl: Optional[str] = None
+    scheduler: Optional[dict[str, Any]] = None
+    coalescing: Optional[dict[str, Any]] = None
+    cache: Optional[dict[str, Any]] = None
+    eventDispatch: Optional[dict[str, Any]] = None
+    pool: Optional[dict[str, Any]] = None
+    reconnect: Optional[dict[str, Any]] = None
+    liveness: Optional[dict[str, Any]] = None
+    broker: Optional[dict[str, Any]] = None
 
 
 # --- Data Schema Models ---
@@ -197,3 +205,19 @@ class AgentUpdateRequest(BaseModel):
 
 class AgentDeleteRequest(BaseModel):
     deleteFiles: Optional[bool] = False
+
+
+class AgentFileWriteRequest(BaseModel):
+    path: str
+    content: str
+
+
+class BatchItem(BaseModel):
+    method: str
+    params: Optional[dict[str, Any]] = None
+    id: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchItem] = Field(min_length=1, max_length=50)
+    timeoutMs: int = Field(30000, ge=1, le=60000)
@@ -0,0 +1,129 @@
+"""Reconnect pacing and read replay for the gateway client.
+
+``Backoff`` spaces reconnect attempts with "full jitter": each delay is
+drawn uniformly from zero up to an exponentially growing ceiling, so a
+fleet of servers that lost the same gateway spreads its reconnects out
+instead of stampeding it in lockstep.
+
+``ReplayQueue`` parks idempotent read RPCs issued while the socket is
+down. They are released, in arrival order, as soon as the handshake
+completes; a request whose deadline passes first expires with a
+TimeoutError, and once the queue is full new reads fail fast.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+from collections import deque
+from collections.abc import Callable
+
+
+class Backoff:
+    """Full-jitter exponential backoff between reconnect attempts."""
+
+    def __init__(
+        self,
+        base: float = 1.0,
+        cap: float = 30.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+        self.attempts = 0
+        # Minimum wait for the next attempt, e.g. a gateway's announced restart time
+        self.floor = 0.0
+
+    @classmethod
+    def from_env(cls) -> Backoff:
+        return cls(
+            base=float(os.getenv("OPENCLAW_RECONNECT_BASE_DELAY", 1.0)),
+            cap=float(os.getenv("OPENCLAW_RECONNECT_MAX_DELAY", 30.0)),
+        )
+
+    @property
+    def ceiling(self) -> float:
+        return min(self.cap, self.base * 2**self.attempts)
+
+    def next_delay(self) -> float:
+        delay = self.floor + self.rng() * self.ceiling
+        self.attempts += 1
+        self.floor = 0.0
+        return delay
+
+    def reset(self) -> None:
+        self.attempts = 0
+        self.floor = 0.0
+
+
+class ReplayQueue:
+    """Bounded FIFO of requests waiting for the connection to come back."""
+
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = max(0, maxsize)
+        self._waiters: deque[asyncio.Future] = deque()
+        self.queued = 0
+        self.replayed = 0
+        self.expired = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> ReplayQueue:
+        return cls(maxsize=int(os.getenv("OPENCLAW_RECONNECT_QUEUE_SIZE", 100)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._waiters)
+
+    async def wait(self, method: str, timeout: float) -> None:
+        """Block until ``release`` is called, the timeout passes, or ``fail``."""
+        if len(self._waiters) >= self.maxsize:
+            self.rejected += 1
+            raise ConnectionError("Not connected to gateway")
+
+        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        self._waiters.append(future)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.expired += 1
+            raise TimeoutError(
+                f"Request {method} timed out after {timeout}s waiting for gateway reconnect"
+            ) from None
+        finally:
+            try:
+                self._waiters.remove(future)
+            except ValueError:
+                pass
+        self.replayed += 1
+
+    def release(self) -> None:
+        """Wake every waiter in arrival order; called once the handshake completes."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+
+    def fail(self, error: Exception) -> None:
+        """Fail every waiter, e.g. when the client is shutting down."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    def get_stats(self) -> dict:
+        return {
+            "maxSize": self.maxsize,
+            "depth": self.depth,
+            "queued": self.queued,
+            "replayed": self.replayed,
+            "expired": self.expired,
+            "rejected": self.rejected,
+        }
@@ -5,39 +5,92 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
 from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sse_starlette.sse import EventSourceResponse
 
-from gateway_client import GatewayClient, get_gateway_client
-from gateway_models import AgentCreateRequest, AgentUpdateRequest
+import metrics
+import tracing
+from event_broadcast import coalesce, encode_batch, get_event_hub, parse_last_event_id
+from event_filter import EventFilter
+from file_stream import (
+    FileContentCache,
+    RangeNotSatisfiable,
+    content_bytes,
+    etag_matches,
+    iter_chunks,
+    make_blob,
+    parse_range,
+)
+from gateway_client import GatewayClient, GatewayRequestError, get_gateway_client
+from gateway_models import (
+    AgentCreateRequest,
+    AgentFileWriteRequest,
+    AgentUpdateRequest,
+    BatchItem,
+    BatchRequest,
+)
+from rpc_coalescer import request_key
+from rpc_scheduler import is_read_method
+from session_index import RECONCILE_PARAMS, InvalidCursor, SessionIndex
 
 logger = logging.getLogger("gateway_routes")
 
 router = APIRouter(prefix="/api/gateway", tags=["gateway"])
 
+file_cache = FileContentCache.from_env()
+session_index = SessionIndex.from_env()
 
-def _require_connected(client: GatewayClient) -> None:
-    """Raise 503 if the gateway client is not connected."""
-    if not client.is_connected:
+
+def _require_connected(client: GatewayClient, method: str | None = None) -> None:
+    """Raise 503 if the gateway client is not connected.
+
+    Reads that can wait for an in-progress reconnect are let through.
+    """
+    if not client.is_connected and not (method and client.can_queue(method)):
         raise HTTPException(
             status_code=503,
             detail="Gateway not connected. The OpenClaw Gateway is currently unreachable.",
         )
 
 
-async def _proxy_rpc(client: GatewayClient, method: str, params: dict | None = None) -> Any:
-    """Send an RPC request to the gateway and return the payload."""
-    _require_connected(client)
-    try:
-        return await client.send_request(method, params)
-    except ConnectionError:
-        raise HTTPException(status_code=503, detail="Gateway connection lost during request.")
-    except TimeoutError:
-        raise HTTPException(status_code=504, detail=f"Gateway request '{method}' timed out.")
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Gateway error: {str(e)}")
+async def _proxy_rpc(
+    client: GatewayClient,
+    method: str,
+    params: dict | None = None,
+    timeout: float | None = None,
+) -> Any:
+    """Send an RPC request to the gateway and return the payload.
+
+    Concurrent identical reads are coalesced into a single gateway call.
+    """
+    with tracing.span("proxy_rpc", method=method):
+        _require_connected(client, method)
+
+        try:
+            if is_read_method(method):
+                # The shared call runs on the default timeout; a caller's own
+                # deadline bounds only its wait, so it cannot fail the others
+                return await client.single_flight.do(
+                    request_key(method, params),
+                    lambda: client.send_request(method, params),
+                    timeout=timeout,
+                )
+            if timeout is None:
+                return await client.send_request(method, params)
+            return await client.send_request(method, params, timeout=timeout)
+        except ConnectionError:
+            raise HTTPException(status_code=503, detail="Gateway connection lost during request.")
+        except TimeoutError:
+            raise HTTPException(status_code=504, detail=f"Gateway request '{method}' timed out.")
+        except GatewayRequestError as e:
+            # Already reads "Gateway error: ..."
+            raise HTTPException(status_code=502, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Gateway error: {str(e)}")
 
 
 # --- Status ---
@@ -129,6 +182,79 @@ async def get_agent_file_content(
     return await _proxy_rpc(client, "agents.files.get", {"agentId": agent_id, "path": path})
 
 
+@router.put("/agents/{agent_id}/files/content")
+async def set_agent_file_content(
+    agent_id: str,
+    body: AgentFileWriteRequest,
+    client: GatewayClient = Depends(get_gateway_client),
+):
+    """Write an agent workspace file via agents.files.set."""
+    params = {"agentId": agent_id, "path": body.path, "content": body.content}
+    try:
+        return await _proxy_rpc(client, "agents.files.set", params)
+    finally:
+        # Even a failed or timed-out write may have landed
+        file_cache.invalidate(agent_id, body.path)
+
+
+@router.get("/agents/{agent_id}/files/raw")
+async def get_agent_file_raw(
+    agent_id: str,
+    request: Request,
+    path: str = Query(...),
+    client: GatewayClient = Depends(get_gateway_client),
+):
+    """Stream an agent workspace file's bytes.
+
+    Supports single ``Range: bytes=`` requests (206, or 416 past the end),
+    ``If-Range``, and ETag conditional GETs via ``If-None-Match`` (304).
+    The file is fetched with agents.files.get and briefly cached, so
+    paging through it does not refetch it for every range; send
+    ``Cache-Control: no-cache`` to force a fresh read.
+    """
+    blob = None
+    if "no-cache" not in request.headers.get("cache-control", ""):
+        blob = file_cache.get(agent_id, path)
+    if blob is None:
+        payload = await _proxy_rpc(client, "agents.files.get", {"agentId": agent_id, "path": path})
+        try:
+            blob = make_blob(path, content_bytes(payload))
+        except ValueError as e:
+            raise HTTPException(status_code=502, detail=f"Gateway error: {str(e)}")
+        file_cache.put(agent_id, path, blob)
+
+    size = len(blob.data)
+    headers = {"ETag": blob.etag, "Accept-Ranges": "bytes", "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), blob.etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or etag_matches(if_range, blob.etag):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        status_code = 206
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    async def body():
+        for chunk in iter_chunks(blob.data, start, end):
+            yield chunk
+
+    return StreamingResponse(
+        body(), status_code=status_code, media_type=blob.media_type, headers=headers
+    )
+
+
 # --- Sessions ---
 
 
@@ -138,9 +264,29 @@ async def list_sessions(
     agentId: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     includeLastMessage: Optional[bool] = Query(None),
+    cursor: Optional[str] = Query(None),
+    updatedAfter: Optional[int] = Query(None, ge=0),
     client: GatewayClient = Depends(get_gateway_client),
 ):
-    """List sessions via sessions.list."""
+    """List sessions via sessions.list.
+
+    Passing ``cursor`` (empty for a first sync) or ``updatedAfter`` (epoch
+    ms) switches to incremental sync from the session index: the response
+    holds only sessions changed since the cursor, keys deleted since it,
+    and the cursor to send next time. ``limit`` then pages through the
+    changes, with ``hasMore`` set while more remain.
+    """
+    if cursor is not None or updatedAfter is not None:
+        _require_connected(client, "sessions.list")
+        await session_index.ensure_fresh(
+            lambda: _proxy_rpc(client, "sessions.list", RECONCILE_PARAMS)
+        )
+        try:
+            page = session_index.changes(cursor, updatedAfter, limit, agentId, search)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid sessions cursor.")
+        return page.to_dict()
+
     params: dict[str, Any] = {}
     if limit is not None:
         params["limit"] = limit
@@ -231,6 +377,67 @@ async def patch_config(
     return await _proxy_rpc(client, "config.patch", {"patch": body})
 
 
+# --- Batch ---
+
+# Read methods the REST routes already expose; writes keep their own endpoints
+BATCH_METHODS = frozenset({
+    "agents.list",
+    "agent.identity.get",
+    "agents.files.list",
+    "agents.files.get",
+    "sessions.list",
+    "sessions.usage",
+    "cron.list",
+    "skills.status",
+    "models.list",
+    "config.get",
+    "health",
+})
+
+
+async def _batch_item(
+    client: GatewayClient, index: int, item: BatchItem, deadline: float
+) -> dict[str, Any]:
+    result: dict[str, Any] = {"id": item.id if item.id is not None else str(index), "method": item.method}
+    if item.method not in BATCH_METHODS:
+        result.update(
+            ok=False,
+            error={"status": 400, "message": f"Method '{item.method}' is not allowed in a batch."},
+        )
+        return result
+    remaining = deadline - time.monotonic()
+    try:
+        if remaining <= 0:
+            raise HTTPException(status_code=504, detail=f"Gateway request '{item.method}' timed out.")
+        payload = await _proxy_rpc(client, item.method, item.params or None, timeout=remaining)
+        result.update(ok=True, payload=payload)
+    except HTTPException as e:
+        result.update(ok=False, error={"status": e.status_code, "message": e.detail})
+    return result
+
+
+@router.post("/batch")
+async def batch(body: BatchRequest, client: GatewayClient = Depends(get_gateway_client)):
+    """Run several read RPCs concurrently and return every result in one response.
+
+    Items share one deadline (``timeoutMs``) and fail independently: each
+    result is ``{id, method, ok, payload}`` or ``{id, method, ok: false,
+    error: {status, message}}`` with the status the single-method route
+    would have returned. Identical items are coalesced into one gateway
+    call, and cacheable methods are served from the RPC cache.
+    """
+    start = time.monotonic()
+    deadline = start + body.timeoutMs / 1000
+    with tracing.span("batch", size=len(body.requests)):
+        results = await asyncio.gather(
+            *(_batch_item(client, i, item, deadline) for i, item in enumerate(body.requests))
+        )
+    return {
+        "results": results,
+        "durationMs": round((time.monotonic() - start) * 1000, 3),
+    }
+
+
 # --- Health ---
 
 
@@ -244,24 +451,38 @@ async def gateway_health(client: GatewayClient = Depends(get_gateway_client)):
 
 
 @router.get("/events")
-async def event_stream(client: GatewayClient = Depends(get_gateway_client)):
-    """SSE endpoint that streams gateway events to frontend clients."""
-    event_queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+async def event_stream(
+    request: Request,
+    lastEventId: Optional[str] = Query(None),
+    events: Optional[list[str]] = Query(None),
+    agentId: Optional[list[str]] = Query(None),
+    sessionKey: Optional[list[str]] = Query(None),
+    batchMs: int = Query(0, ge=0, le=1000),
+    client: GatewayClient = Depends(get_gateway_client),
+):
+    """SSE endpoint that streams gateway events to frontend clients.
 
-    def on_event(event):
-        try:
-            event_queue.put_nowait(event)
-        except asyncio.QueueFull:
-            # Drop oldest event if queue is full
-            try:
-                event_queue.get_nowait()
-                event_queue.put_nowait(event)
-            except asyncio.QueueEmpty:
-                pass
+    ``events`` (name globs), ``agentId`` and ``sessionKey`` restrict the
+    stream to the topics the client renders; each accepts repeated or
+    comma-separated values.
 
-    client.on_any_event(on_event)
+    ``batchMs`` opts into batching: events arriving within that window are
+    sent as one ``batch`` frame holding a JSON array of
+    ``{event, seq, data}``, with superseded state events (presence,
+    health, ...) dropped and delta events kept in order.
+
+    Reconnecting clients send ``Last-Event-ID`` (or ``?lastEventId=``) to
+    replay missed events; if they cannot be replayed a ``resync`` event
+    tells the client to refetch over REST.
+    """
+    last_seq = parse_last_event_id(request.headers.get("last-event-id") or lastEventId)
+    event_filter = EventFilter.from_query(events, agentId, sessionKey)
+    subscription = get_event_hub(client).subscribe(last_seq, event_filter)
+
+    metrics.SSE_CONNECTIONS.inc()
 
     async def generate():
+        sent = metrics.SSE_FRAMES_SENT
         try:
             # Send initial status
             status = client.get_status().model_dump()
@@ -269,22 +490,38 @@ async def event_stream(client: GatewayClient = Depends(get_gateway_client)):
                 "event": "status",
                 "data": json.dumps(status),
             }
+            sent.inc("status")
+            if last_seq is not None and not subscription.resumed:
+                yield {"event": "resync", "data": "{}"}
+                sent.inc("resync")
 
             while True:
-                try:
-                    event = await asyncio.wait_for(event_queue.get(), timeout=15.0)
-                    yield {
-                        "event": event.event,
-                        "data": json.dumps(event.payload),
-                    }
-                except asyncio.TimeoutError:
+                events = await subscription.next(timeout=15.0)
+                if not events:
                     # Send keepalive
                     yield {"event": "ping", "data": "{}"}
+                    sent.inc("ping")
+                elif batchMs:
+                    await asyncio.sleep(batchMs / 1000)
+                    events += await subscription.next(timeout=0)
+                    batch = coalesce(events)
+                    yield encode_batch(batch)
+                    sent.inc("batch")
+                    metrics.SSE_EVENTS_SENT.inc(amount=len(batch))
+                else:
+                    for encoded in events:
+                        yield encoded.frame
+                    sent.inc("event", amount=len(events))
+                    metrics.SSE_EVENTS_SENT.inc(amount=len(events))
         except asyncio.CancelledError:
             return
         finally:
-            # Remove callback
-            if on_event in client._global_event_callbacks:
-                client._global_event_callbacks.remove(on_event)
+            subscription.close()
 
     return EventSourceResponse(generate())
+
+
+@router.get("/events/stats")
+async def event_stream_stats(client: GatewayClient = Depends(get_gateway_client)):
+    """Broadcast hub counters with per-subscriber lag and drop counts."""
+    return get_event_hub(client).get_stats()
@@ -0,0 +1,246 @@
+"""In-process Prometheus metrics for the Agent HQ API.
+
+Recording is a dict lookup and a few additions with no locks, which is
+safe because every recorder runs on the event loop thread. Point-in-time
+values that already live elsewhere (pending requests, scheduler queue,
+SSE subscribers) are read by collector callbacks at scrape time rather
+than being mirrored on the hot path.
+
+Each process keeps its own registry; with several API workers every
+worker reports its own series.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from collections.abc import Callable, Iterable
+
+# Seconds; spans a cache hit through a slow gateway call
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def samples(self) -> Iterable[Sample]:
+        return ()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in sorted(self._values.items()):
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Histogram(Metric):
+    """Bucketed distribution per label combination.
+
+    Buckets are stored non-cumulatively so ``observe`` touches one slot;
+    they are summed into Prometheus' cumulative ``le`` form when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def samples(self) -> Iterable[Sample]:
+        for key, (counts, total, count) in sorted(self._series.items()):
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                le = "+Inf" if math.isinf(bound) else _format_value(bound)
+                yield f"{self.name}_bucket", {**labels, "le": le}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class GaugeFunc(Metric):
+    """Gauge whose values are read from ``fn`` at scrape time.
+
+    ``fn`` returns a number for an unlabelled gauge, or a mapping of
+    label-value tuples to numbers.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], float | dict[tuple[str, ...], float]],
+        labels: tuple[str, ...] = (),
+    ):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def samples(self) -> Iterable[Sample]:
+        values = self.fn()
+        if not isinstance(values, dict):
+            yield self.name, {}, float(values)
+            return
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labels, key)), float(value)
+
+
+class CounterFunc(GaugeFunc):
+    """Counter maintained elsewhere and read at scrape time."""
+
+    kind = "counter"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        # Re-registering replaces the metric, so collectors can be rebound
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- Gateway RPC ---
+
+RPC_REQUESTS = REGISTRY.register(Counter(
+    "agenthq_gateway_rpc_requests_total",
+    "Gateway RPCs by method and outcome (ok, error, timeout, connection, cancelled).",
+    ("method", "outcome"),
+))
+RPC_DURATION = REGISTRY.register(Histogram(
+    "agenthq_gateway_rpc_duration_seconds",
+    "Gateway RPC latency as seen by callers, including queueing and cache hits.",
+    ("method",),
+))
+
+# --- Gateway socket reader ---
+
+FRAMES = REGISTRY.register(Counter(
+    "agenthq_gateway_frames_total",
+    "Frames received from the gateway by type.",
+    ("type",),
+))
+FRAME_ERRORS = REGISTRY.register(Counter(
+    "agenthq_gateway_frame_errors_total",
+    "Inbound frames that could not be decoded or handled.",
+    ("reason",),
+))
+FRAME_DURATION = REGISTRY.register(Histogram(
+    "agenthq_gateway_frame_handle_seconds",
+    "Time the socket reader spends on each inbound frame.",
+    ("type",),
+))
+EVENTS = REGISTRY.register(Counter(
+    "agenthq_gateway_events_total",
+    "Gateway events received by event name.",
+    ("event",),
+))
+
+# --- SSE ---
+
+SSE_CONNECTIONS = REGISTRY.register(Counter(
+    "agenthq_sse_connections_total",
+    "SSE event stream connections opened.",
+))
+SSE_EVENTS_SENT = REGISTRY.register(Counter(
+    "agenthq_sse_events_sent_total",
+    "Gateway events written to SSE subscribers.",
+))
+SSE_FRAMES_SENT = REGISTRY.register(Counter(
+    "agenthq_sse_frames_sent_total",
+    "SSE frames written by kind (event, batch, ping, status, resync).",
+    ("kind",),
+))
+
+# --- Dashboard ---
+
+DASHBOARD_REQUESTS = REGISTRY.register(Counter(
+    "agenthq_dashboard_requests_total",
+    "Dashboard requests by source (snapshot or live).",
+    ("source",),
+))
+DASHBOARD_DURATION = REGISTRY.register(Histogram(
+    "agenthq_dashboard_duration_seconds",
+    "Time to serve the dashboard payload.",
+    ("source",),
+))
@@ -0,0 +1,95 @@
+"""Prometheus scrape endpoint."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+import metrics
+from event_broadcast import find_event_hub
+from gateway_client import GatewayClient, get_gateway_client
+from gateway_models import ConnectionState
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def client_metrics(client: GatewayClient) -> list[metrics.Metric]:
+    """Scrape-time views of state the gateway client already keeps."""
+    scheduler, cache, dispatcher = client.scheduler, client.cache, client.dispatcher
+    hub = find_event_hub(client)
+    subscribers = list(hub._subscribers.values()) if hub is not None else []
+    return [
+        metrics.GaugeFunc(
+            "agenthq_gateway_connected",
+            "1 while the gateway connection is up.",
+            lambda: 1 if client.state == ConnectionState.CONNECTED else 0,
+        ),
+        metrics.GaugeFunc(
+            "agenthq_gateway_pending_requests",
+            "RPCs sent and awaiting a response frame.",
+            lambda: len(client._pending_requests),
+        ),
+        metrics.GaugeFunc(
+            "agenthq_gateway_rpc_in_flight",
+            "RPCs holding a scheduler slot.",
+            lambda: scheduler.get_stats()["inFlight"],
+        ),
+        metrics.GaugeFunc(
+            "agenthq_gateway_rpc_queue_depth",
+            "RPCs waiting for a scheduler slot, by priority lane.",
+            lambda: {(lane,): n for lane, n in scheduler.get_stats()["lanes"].items()},
+            ("lane",),
+        ),
+        metrics.GaugeFunc(
+            "agenthq_gateway_replay_queue_depth",
+            "Reads held for replay until the gateway reconnects.",
+            lambda: client.replay.depth,
+        ),
+        metrics.CounterFunc(
+            "agenthq_gateway_rpc_cache_total",
+            "RPC cache lookups by result.",
+            lambda: {("hit",): cache.hits, ("miss",): cache.misses},
+            ("result",),
+        ),
+        metrics.CounterFunc(
+            "agenthq_gateway_stale_disconnects_total",
+            "Sockets torn down by the liveness check.",
+            lambda: client.stale_disconnects,
+        ),
+        metrics.GaugeFunc(
+            "agenthq_gateway_event_queue_depth",
+            "Events waiting for listener dispatch.",
+            lambda: dispatcher.depth,
+        ),
+        metrics.CounterFunc(
+            "agenthq_gateway_events_dropped_total",
+            "Events dropped by the listener queue's overflow policy.",
+            lambda: dispatcher.dropped,
+        ),
+        metrics.GaugeFunc(
+            "agenthq_sse_subscribers",
+            "Connected SSE event stream subscribers.",
+            lambda: len(subscribers),
+        ),
+        metrics.GaugeFunc(
+            "agenthq_sse_subscriber_lag_max",
+            "Largest number of buffered events any subscriber has yet to read.",
+            lambda: max((s.lag for s in subscribers), default=0),
+        ),
+        metrics.GaugeFunc(
+            "agenthq_sse_subscriber_dropped_events",
+            "Events connected subscribers lost to the buffer before reading them.",
+            lambda: sum(s.dropped for s in subscribers),
+        ),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(client: GatewayClient = Depends(get_gateway_client)):
+    """Counters and histograms in the Prometheus text exposition format."""
+    lines = [metrics.REGISTRY.render().rstrip("\n")]
+    for metric in client_metrics(client):
+        lines.extend(metric.render())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=CONTENT_TYPE)
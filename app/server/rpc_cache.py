@@ -0,0 +1,202 @@
+"""Bounded TTL + LRU cache for gateway read RPCs.
+
+Entries are keyed on (method, canonical params) and only stored for
+methods with a cache policy. Gateway events and our own write RPCs
+invalidate the methods whose results they may have changed.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from rpc_coalescer import request_key
+
+logger = logging.getLogger("rpc_cache")
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long a method's results live and how many variants are kept."""
+
+    ttl: float
+    max_entries: int = 32
+
+
+DEFAULT_POLICIES: dict[str, CachePolicy] = {
+    "models.list": CachePolicy(ttl=300.0, max_entries=1),
+    "skills.status": CachePolicy(ttl=60.0),
+    "config.get": CachePolicy(ttl=30.0, max_entries=1),
+    "agents.list": CachePolicy(ttl=30.0, max_entries=1),
+    "agent.identity.get": CachePolicy(ttl=60.0),
+    "cron.list": CachePolicy(ttl=15.0, max_entries=1),
+}
+
+_AGENT_READS = ["agents.list", "agent.identity.get", "config.get"]
+_CONFIG_READS = ["config.get", "agents.list", "agent.identity.get", "models.list", "skills.status"]
+_CRON_READS = ["cron.list", "cron.status", "cron.runs"]
+
+# Gateway event name -> cached methods it makes stale
+EVENT_INVALIDATIONS: dict[str, list[str]] = {
+    "cron": _CRON_READS,
+    "health": ["health", "status"],
+    "presence": ["system-presence"],
+    "update.available": ["status"],
+}
+
+# Write RPC method -> cached methods it makes stale
+WRITE_INVALIDATIONS: dict[str, list[str]] = {
+    "agents.create": _AGENT_READS,
+    "agents.update": _AGENT_READS,
+    "agents.delete": _AGENT_READS,
+    "agents.files.set": ["agents.files.list", "agents.files.get"],
+    "config.set": _CONFIG_READS,
+    "config.apply": _CONFIG_READS,
+    "config.patch": _CONFIG_READS,
+    "skills.update": ["skills.status", "skills.bins", "config.get"],
+    "skills.install": ["skills.status", "skills.bins", "config.get"],
+    "cron.add": _CRON_READS,
+    "cron.update": _CRON_READS,
+    "cron.remove": _CRON_READS,
+    "cron.run": _CRON_READS,
+}
+
+
+@dataclass
+class _Entry:
+    method: str
+    value: Any
+    expires_at: float
+
+
+class RpcCache:
+    """In-process cache sitting in front of GatewayClient.send_request."""
+
+    def __init__(
+        self,
+        policies: dict[str, CachePolicy] | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._method_counts: dict[str, int] = {}
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> RpcCache:
+        """Build a cache from OPENCLAW_RPC_CACHE_* environment variables."""
+        max_entries = int(os.getenv("OPENCLAW_RPC_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        return cls(max_entries=max_entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def is_cacheable(self, method: str) -> bool:
+        return self.enabled and method in self.policies
+
+    def get(self, method: str, params: dict[str, Any] | None) -> tuple[bool, Any]:
+        """Return (hit, value) for a request, refreshing its LRU position."""
+        if not self.is_cacheable(method):
+            return False, None
+        key = request_key(method, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry.value
+
+    def token(self, method: str) -> tuple[int, int]:
+        """Snapshot taken before a fetch, used to reject stale stores."""
+        return self._epoch, self._generations.get(method, 0)
+
+    def put(
+        self,
+        method: str,
+        params: dict[str, Any] | None,
+        value: Any,
+        token: tuple[int, int] | None = None,
+    ) -> None:
+        """Store a result unless the method was invalidated since ``token``."""
+        policy = self.policies.get(method) if self.enabled else None
+        if policy is None:
+            return
+        if token is not None and token != self.token(method):
+            return
+
+        key = request_key(method, params)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(method, value, time.monotonic() + policy.ttl)
+        self._method_counts[method] = self._method_counts.get(method, 0) + 1
+
+        if self._method_counts[method] > policy.max_entries:
+            self._evict_oldest(method)
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+
+    def _evict_oldest(self, method: str | None = None) -> None:
+        for key, entry in self._entries.items():
+            if method is None or entry.method == method:
+                self._remove(key)
+                self.evictions += 1
+                return
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._method_counts[entry.method] -= 1
+
+    def invalidate(self, *methods: str) -> None:
+        """Drop every cached entry for the given methods."""
+        targets = set(methods)
+        for method in targets:
+            self._generations[method] = self._generations.get(method, 0) + 1
+        stale = [k for k, e in self._entries.items() if e.method in targets]
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+
+    def invalidate_for_event(self, event_name: str) -> None:
+        methods = EVENT_INVALIDATIONS.get(event_name)
+        if methods:
+            self.invalidate(*methods)
+
+    def invalidate_for_write(self, method: str) -> None:
+        methods = WRITE_INVALIDATIONS.get(method)
+        if methods:
+            self.invalidate(*methods)
+
+    def clear(self) -> None:
+        """Drop everything, e.g. after a reconnect or an event sequence gap."""
+        self._epoch += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._method_counts.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
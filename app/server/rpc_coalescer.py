@@ -0,0 +1,66 @@
+"""Single-flight coalescing for identical gateway read RPCs.
+
+Concurrent callers asking for the same (method, params) share one
+in-flight gateway call and all receive its payload or its exception.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger("rpc_coalescer")
+
+
+def request_key(method: str, params: dict[str, Any] | None) -> str:
+    """Canonical key for a request, independent of param ordering."""
+    canonical = json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{method}:{canonical}"
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls sharing the same key."""
+
+    def __init__(self):
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def do(
+        self, key: str, fn: Callable[[], Awaitable[Any]], timeout: float | None = None
+    ) -> Any:
+        """Run ``fn`` unless a call for ``key`` is already in flight, then await it.
+
+        The shared call runs as its own task so that one waiter going away
+        (e.g. a browser tab closing) does not cancel it for the others.
+        ``timeout`` bounds only this waiter: it raises TimeoutError without
+        failing the shared call, so ``fn`` should not carry a per-caller deadline.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self.shared += 1
+        if timeout is None:
+            return await asyncio.shield(task)
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Mark retrieved; every waiter has already been handed the error
+            logger.debug(f"Shared call {key} failed: {task.exception()}")
+
+    def get_stats(self) -> dict:
+        return {"calls": self.calls, "shared": self.shared, "inFlight": self.in_flight}
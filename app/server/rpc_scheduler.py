@@ -0,0 +1,230 @@
+"""Pipelined RPC scheduler for the OpenClaw Gateway client.
+
+Bounds how many requests may be in flight over the shared WebSocket,
+caps concurrency per RPC method, and grants slots by priority lane so
+interactive writes are never starved by bursts of dashboard reads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+logger = logging.getLogger("rpc_scheduler")
+
+DEFAULT_MAX_IN_FLIGHT = 32
+
+DEFAULT_METHOD_LIMITS: dict[str, int] = {
+    "agents.list": 8,
+    "sessions.list": 8,
+    "sessions.usage": 4,
+    "cron.list": 4,
+}
+
+READ_METHOD_SUFFIXES = (".list", ".get", ".status", ".usage")
+READ_METHODS = {"health"}
+
+
+class RpcPriority(IntEnum):
+    """Priority lanes, lower values are granted first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+def is_read_method(method: str) -> bool:
+    """Return True for side-effect free gateway methods."""
+    return method in READ_METHODS or method.endswith(READ_METHOD_SUFFIXES)
+
+
+def default_priority(method: str) -> RpcPriority:
+    """Writes go in the interactive lane, reads in the normal lane."""
+    return RpcPriority.NORMAL if is_read_method(method) else RpcPriority.INTERACTIVE
+
+
+def parse_method_limits(raw: str) -> dict[str, int]:
+    """Parse a ``method=limit,method=limit`` string into a dict."""
+    limits: dict[str, int] = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        method, sep, value = item.partition("=")
+        if not sep:
+            logger.warning(f"Ignoring malformed method limit: {item!r}")
+            continue
+        try:
+            limits[method.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"Ignoring malformed method limit: {item!r}")
+    return limits
+
+
+@dataclass
+class MethodStats:
+    """Counters for a single RPC method."""
+
+    requests: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "inFlight": self.in_flight,
+            "queued": self.queued,
+            "avgWaitMs": round(self.total_wait_ms / self.requests, 3) if self.requests else 0.0,
+            "maxWaitMs": round(self.max_wait_ms, 3),
+        }
+
+
+@dataclass
+class _Waiter:
+    method: str
+    priority: RpcPriority
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class RpcScheduler:
+    """Grants in-flight slots to RPCs under global and per-method limits."""
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        method_limits: dict[str, int] | None = None,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.method_limits = dict(DEFAULT_METHOD_LIMITS if method_limits is None else method_limits)
+        self._in_flight = 0
+        self._lanes: dict[RpcPriority, deque[_Waiter]] = {p: deque() for p in RpcPriority}
+        self._methods: dict[str, MethodStats] = {}
+
+    @classmethod
+    def from_env(cls) -> RpcScheduler:
+        """Build a scheduler from OPENCLAW_RPC_* environment variables."""
+        max_in_flight = int(os.getenv("OPENCLAW_RPC_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT))
+        limits = dict(DEFAULT_METHOD_LIMITS)
+        limits.update(parse_method_limits(os.getenv("OPENCLAW_RPC_METHOD_LIMITS", "")))
+        return cls(max_in_flight=max_in_flight, method_limits=limits)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def _stats(self, method: str) -> MethodStats:
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = MethodStats()
+        return stats
+
+    def _can_run(self, method: str) -> bool:
+        if self._in_flight >= self.max_in_flight:
+            return False
+        limit = self.method_limits.get(method)
+        return limit is None or self._stats(method).in_flight < limit
+
+    def _grant(self, method: str, wait_s: float) -> None:
+        stats = self._stats(method)
+        self._in_flight += 1
+        stats.in_flight += 1
+        stats.requests += 1
+        wait_ms = wait_s * 1000
+        stats.total_wait_ms += wait_ms
+        stats.max_wait_ms = max(stats.max_wait_ms, wait_ms)
+
+    def _dispatch(self) -> None:
+        """Grant slots to queued waiters by lane, then FIFO within a lane.
+
+        Waiters blocked by their own per-method cap are skipped so they do
+        not hold up other methods queued behind them.
+        """
+        now = time.monotonic()
+        for priority in RpcPriority:
+            if self._in_flight >= self.max_in_flight:
+                return
+            lane = self._lanes[priority]
+            remaining: deque[_Waiter] = deque()
+            while lane:
+                waiter = lane.popleft()
+                if waiter.future.done():
+                    self._stats(waiter.method).queued -= 1
+                    continue
+                if self._can_run(waiter.method):
+                    self._stats(waiter.method).queued -= 1
+                    self._grant(waiter.method, now - waiter.enqueued_at)
+                    waiter.future.set_result(None)
+                else:
+                    remaining.append(waiter)
+            self._lanes[priority] = remaining
+
+    async def acquire(self, method: str, priority: RpcPriority | None = None) -> None:
+        """Wait until the request may be sent over the socket."""
+        if priority is None:
+            priority = default_priority(method)
+
+        if self._can_run(method) and not any(
+            self._lanes[p] for p in RpcPriority if p <= priority
+        ):
+            self._grant(method, 0.0)
+            return
+
+        waiter = _Waiter(method, priority, asyncio.get_event_loop().create_future())
+        self._lanes[priority].append(waiter)
+        self._stats(method).queued += 1
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Slot was granted in the same tick we were cancelled
+                self.release(method)
+            else:
+                self._discard(waiter)
+            raise
+
+    def _discard(self, waiter: _Waiter) -> None:
+        lane = self._lanes[waiter.priority]
+        try:
+            lane.remove(waiter)
+        except ValueError:
+            return
+        self._stats(waiter.method).queued -= 1
+
+    def release(self, method: str) -> None:
+        """Return a slot and wake the next eligible waiters."""
+        stats = self._stats(method)
+        stats.in_flight = max(0, stats.in_flight - 1)
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    def cancel_all(self) -> None:
+        """Fail every queued waiter, used when the connection is torn down."""
+        for lane in self._lanes.values():
+            while lane:
+                waiter = lane.popleft()
+                self._stats(waiter.method).queued -= 1
+                if not waiter.future.done():
+                    waiter.future.set_exception(ConnectionError("Gateway connection closed"))
+
+    def get_stats(self) -> dict:
+        return {
+            "inFlight": self._in_flight,
+            "maxInFlight": self.max_in_flight,
+            "queueDepth": self.queue_depth,
+            "lanes": {p.name.lower(): len(self._lanes[p]) for p in RpcPriority},
+            "methods": {m: s.to_dict() for m, s in sorted(self._methods.items())},
+        }
@@ -1,5 +1,6 @@
 import logging
 import os
+import tempfile
 from contextlib import asynccontextmanager
 
 import uvicorn
@@ -10,9 +11,17 @@ load_dotenv()
 from fastapi import FastAPI  # noqa: E402
 from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
 
+from dashboard_routes import dashboard_snapshot  # noqa: E402
 from dashboard_routes import router as dashboard_router  # noqa: E402
-from gateway_client import gateway_client  # noqa: E402
+from debug_routes import router as debug_router  # noqa: E402
+from gateway_broker import BrokerClient, GatewayBroker  # noqa: E402
+from gateway_client import get_gateway_client, set_gateway_client  # noqa: E402
 from gateway_routes import router as gateway_router  # noqa: E402
+from gateway_routes import session_index  # noqa: E402
+from metrics_routes import router as metrics_router  # noqa: E402
+from tracing import TracingMiddleware, tracer  # noqa: E402
+from usage_rollups import usage_store  # noqa: E402
+from usage_routes import router as usage_router  # noqa: E402
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,10 +32,27 @@ logger = logging.getLogger("server")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Start gateway client on startup, stop on shutdown."""
+    """Start gateway client on startup, stop on shutdown.
+
+    With GATEWAY_BROKER_SOCKET set, only the elected leader process
+    connects to the gateway; other workers proxy through it.
+    """
+    broker = GatewayBroker.from_env()
+    gateway_client = get_gateway_client()
+    if broker is not None and not broker.try_become_leader():
+        logger.info(f"Using gateway broker leader at {broker.path}")
+        gateway_client = BrokerClient(broker.path)
+        set_gateway_client(gateway_client)
+        broker = None
+
     if gateway_client.is_configured:
         logger.info("Starting gateway client connection...")
         await gateway_client.connect()
+        if broker is not None:
+            await broker.serve(gateway_client)
+        dashboard_snapshot.start(gateway_client)
+        session_index.start(gateway_client)
+        usage_store.start(gateway_client, pull=not isinstance(gateway_client, BrokerClient))
     else:
         logger.warning(
             "OPENCLAW_GATEWAY_URL not configured. Gateway features disabled."
@@ -34,7 +60,13 @@ async def lifespan(app: FastAPI):
     yield
     if gateway_client.is_configured:
         logger.info("Shutting down gateway client...")
+        await dashboard_snapshot.stop()
+        session_index.stop()
+        await usage_store.stop()
+        if broker is not None:
+            await broker.close()
         await gateway_client.disconnect()
+    tracer.close()
 
 
 app = FastAPI(title="Agent HQ API", version="0.1.0", lifespan=lifespan)
@@ -59,10 +91,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
 
 # Include routes
 app.include_router(gateway_router)
 app.include_router(dashboard_router)
+app.include_router(usage_router)
+app.include_router(metrics_router)
+app.include_router(debug_router)
 
 
 @app.get("/api/test")
@@ -76,9 +112,16 @@ async def health():
 
 
 if __name__ == "__main__":
+    workers = int(os.getenv("API_WORKERS", 1))
+    if workers > 1:
+        # Worker processes inherit the environment, so they all find the leader
+        os.environ.setdefault(
+            "GATEWAY_BROKER_SOCKET", os.path.join(tempfile.gettempdir(), "agent-hq-gateway.sock")
+        )
     uvicorn.run(
         "server:app",
         host=os.getenv("API_HOST", "0.0.0.0"),
         port=int(os.getenv("API_PORT", 8000)),
-        reload=os.getenv("API_DEBUG", "true").lower() == "true",
+        reload=workers == 1 and os.getenv("API_DEBUG", "true").lower() == "true",
+        workers=workers,
     )
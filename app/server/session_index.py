@@ -0,0 +1,343 @@
+"""Session index for cursor-based incremental sync of sessions.list.
+
+The index keeps every known session in memory, stamped with a revision
+number that increases whenever the session changes. A client that synced
+once holds an opaque cursor naming the last revision it saw, and the next
+sync returns only the sessions (and deletions) with a newer revision, so
+refreshes cost O(changed sessions) instead of O(all sessions).
+
+Chat events for known sessions are applied in place. Anything the events
+cannot describe (a new session, an agent lifecycle change, drift) marks
+the index dirty, and the next sync re-fetches the full list and diffs it
+against the index so only sessions that actually changed get a new
+revision.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from gateway_client import GatewayClient
+from gateway_models import GatewayEvent
+
+logger = logging.getLogger("session_index")
+
+# Params for the full fetch that seeds and reconciles the index
+RECONCILE_PARAMS: dict[str, Any] = {"includeLastMessage": True}
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not issued by a session index."""
+
+
+@dataclass
+class _Entry:
+    revision: int
+    session: dict
+    deleted: bool = False
+
+
+@dataclass
+class SyncPage:
+    """One page of changes returned by ``SessionIndex.changes``."""
+
+    sessions: list[dict] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    cursor: str = ""
+    has_more: bool = False
+    reset: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "deleted": self.deleted,
+            "cursor": self.cursor,
+            "hasMore": self.has_more,
+            "reset": self.reset,
+        }
+
+
+def session_items(payload: Any) -> list[dict]:
+    """Session dicts from a ``sessions.list`` payload."""
+    if isinstance(payload, dict):
+        payload = payload.get("sessions")
+    if not isinstance(payload, list):
+        return []
+    return [s for s in payload if isinstance(s, dict) and s.get("key")]
+
+
+def updated_ms(session: dict) -> int | None:
+    """A session's last update time in epoch milliseconds, if it has one."""
+    value = session.get("updatedAtMs", session.get("updatedAt"))
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value:
+        try:
+            return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+        except ValueError:
+            return None
+    return None
+
+
+def session_agent_id(session: dict) -> str | None:
+    agent_id = session.get("agentId")
+    if agent_id:
+        return agent_id
+    parts = str(session.get("key", "")).split(":")
+    return parts[1] if len(parts) > 2 and parts[0] == "agent" else None
+
+
+def _matches(session: dict, agent_id: str | None, search: str | None) -> bool:
+    if agent_id is not None and session_agent_id(session) != agent_id:
+        return False
+    if search:
+        needle = search.lower()
+        fields = (session.get(f) for f in ("key", "label", "displayName", "subject"))
+        return any(isinstance(v, str) and needle in v.lower() for v in fields)
+    return True
+
+
+class SessionIndex:
+    """Revisioned, event-maintained copy of the gateway's session list."""
+
+    def __init__(self, reconcile_interval: float = 60.0, max_tombstones: int = 1024):
+        self.reconcile_interval = reconcile_interval
+        self.max_tombstones = max_tombstones
+        self.client: GatewayClient | None = None
+        # Ordered by revision: every change moves its entry to the end
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._tombstones: deque[str] = deque()
+        self._epoch = secrets.token_hex(4)
+        self._revision = 0
+        # Cursors older than this may have missed pruned deletions
+        self._floor = 0
+        self._ready = False
+        self._dirty = False
+        self._last_reconcile = 0.0
+        self._lock = asyncio.Lock()
+        self.reconciles = 0
+        self.events_applied = 0
+        self.resets = 0
+
+    @classmethod
+    def from_env(cls) -> SessionIndex:
+        return cls(
+            reconcile_interval=float(os.getenv("SESSION_INDEX_RECONCILE_INTERVAL", 60.0)),
+            max_tombstones=int(os.getenv("SESSION_INDEX_MAX_TOMBSTONES", 1024)),
+        )
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    @property
+    def needs_reconcile(self) -> bool:
+        return (
+            not self._ready
+            or self._dirty
+            or time.monotonic() - self._last_reconcile >= self.reconcile_interval
+        )
+
+    def start(self, client: GatewayClient) -> None:
+        """Keep the index current from ``client``'s events."""
+        self.client = client
+        client.on_any_event(self._on_event)
+        client.on_resync(self.mark_dirty)
+
+    def stop(self) -> None:
+        if self.client and self._on_event in self.client._global_event_callbacks:
+            self.client._global_event_callbacks.remove(self._on_event)
+        if self.client and self.mark_dirty in self.client._resync_callbacks:
+            self.client._resync_callbacks.remove(self.mark_dirty)
+        self.client = None
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every session; outstanding cursors get a reset."""
+        self._entries.clear()
+        self._tombstones.clear()
+        self._epoch = secrets.token_hex(4)
+        self._revision = 0
+        self._floor = 0
+        self._ready = False
+        self._dirty = False
+
+    # --- Cursors ---
+
+    def encode_cursor(self, revision: int) -> str:
+        raw = f"{self._epoch}:{revision}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> int | None:
+        """The revision a cursor points at, or None if it predates this index."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            epoch, _, revision = raw.partition(":")
+            value = int(revision)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursor(cursor)
+        if value < 0:
+            raise InvalidCursor(cursor)
+        if epoch != self._epoch or value > self._revision or value < self._floor:
+            return None
+        return value
+
+    # --- Maintenance ---
+
+    def _bump(self, key: str, session: dict, deleted: bool = False) -> None:
+        self._revision += 1
+        self._entries[key] = _Entry(self._revision, session, deleted)
+        self._entries.move_to_end(key)
+        if deleted:
+            self._tombstones.append(key)
+            self._prune_tombstones()
+
+    def _prune_tombstones(self) -> None:
+        while len(self._tombstones) > self.max_tombstones:
+            key = self._tombstones.popleft()
+            entry = self._entries.get(key)
+            # A key deleted, re-created and deleted again is queued twice
+            if entry is not None and entry.deleted and key not in self._tombstones:
+                del self._entries[key]
+                self._floor = max(self._floor, entry.revision)
+
+    def apply_snapshot(self, payload: Any) -> int:
+        """Diff a full ``sessions.list`` payload into the index.
+
+        Returns the number of sessions that got a new revision.
+        """
+        fresh = {s["key"]: s for s in session_items(payload)}
+        changed = 0
+        for key, entry in list(self._entries.items()):
+            if key not in fresh and not entry.deleted:
+                self._bump(key, entry.session, deleted=True)
+                changed += 1
+        # Oldest first, so a first sync pages through history in update order
+        for session in sorted(fresh.values(), key=lambda s: updated_ms(s) or 0):
+            entry = self._entries.get(session["key"])
+            if entry is None or entry.deleted or entry.session != session:
+                self._bump(session["key"], session)
+                changed += 1
+        self._ready = True
+        self._dirty = False
+        self._last_reconcile = time.monotonic()
+        self.reconciles += 1
+        return changed
+
+    async def ensure_fresh(self, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Reconcile from ``fetch()`` when the index is missing, dirty or old.
+
+        Concurrent callers share one fetch.
+        """
+        if not self.needs_reconcile:
+            return
+        async with self._lock:
+            if self.needs_reconcile:
+                self.apply_snapshot(await fetch())
+
+    def mark_dirty(self) -> None:
+        """Reconcile on the next sync, e.g. after a reconnect or an event sequence gap."""
+        self._dirty = True
+
+    def _on_event(self, event: GatewayEvent) -> None:
+        if not self._ready:
+            return
+        payload = event.payload
+        if event.event == "chat" and payload.get("state") in ("final", "aborted", "error"):
+            if not self._apply_chat(payload):
+                self._dirty = True
+        elif event.event == "agent" and payload.get("stream") == "lifecycle":
+            self._dirty = True
+
+    def _apply_chat(self, payload: dict) -> bool:
+        entry = self._entries.get(payload.get("sessionKey") or "")
+        if entry is None or entry.deleted:
+            return False
+        session = dict(entry.session)
+        message = payload.get("message")
+        if isinstance(message, dict):
+            session["lastMessage"] = message
+        if payload.get("ts"):
+            session["updatedAt"] = payload["ts"]
+        self._bump(session["key"], session)
+        self.events_applied += 1
+        return True
+
+    # --- Queries ---
+
+    def changes(
+        self,
+        cursor: str | None = None,
+        updated_after: int | None = None,
+        limit: int | None = None,
+        agent_id: str | None = None,
+        search: str | None = None,
+    ) -> SyncPage:
+        """Sessions changed after ``cursor``, oldest change first.
+
+        Without a cursor every live session is returned and ``deleted`` is
+        empty. A cursor from before a restart or tombstone pruning starts
+        over from the beginning with ``reset`` set, telling the client to
+        drop its copy. Raises InvalidCursor for a malformed cursor.
+        """
+        page = SyncPage()
+        since = 0
+        if cursor:
+            decoded = self.decode_cursor(cursor)
+            if decoded is None:
+                page.reset = True
+                self.resets += 1
+            else:
+                since = decoded
+
+        # Walk back from the newest revision until reaching the cursor
+        pending: list[_Entry] = []
+        for entry in reversed(self._entries.values()):
+            if entry.revision <= since:
+                break
+            pending.append(entry)
+
+        last = self._revision
+        for entry in reversed(pending):
+            if not _matches(entry.session, agent_id, search):
+                continue
+            if entry.deleted:
+                if since:
+                    page.deleted.append(entry.session["key"])
+            elif updated_after is None or (updated_ms(entry.session) or 0) > updated_after:
+                page.sessions.append(entry.session)
+            else:
+                continue
+            if limit is not None and len(page.sessions) + len(page.deleted) >= limit:
+                if entry is not pending[0]:
+                    page.has_more = True
+                    last = entry.revision
+                break
+        page.cursor = self.encode_cursor(last)
+        return page
+
+    def get_stats(self) -> dict:
+        live = sum(1 for e in self._entries.values() if not e.deleted)
+        return {
+            "ready": self._ready,
+            "dirty": self._dirty,
+            "sessions": live,
+            "tombstones": len(self._entries) - live,
+            "revision": self._revision,
+            "reconciles": self.reconciles,
+            "eventsApplied": self.events_applied,
+            "resets": self.resets,
+        }
@@ -0,0 +1,175 @@
+"""Unit tests for the batch RPC endpoint."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from gateway_client import GatewayClient, get_gateway_client
+from gateway_models import ConnectionState
+from server import app
+
+
+def _make_connected_client(side_effect):
+    client = GatewayClient(url="ws://test", token="test-token")
+    client.state = ConnectionState.CONNECTED
+    client.send_request = AsyncMock(side_effect=side_effect)
+    return client
+
+
+@pytest.fixture
+def use_client():
+    def install(client):
+        app.dependency_overrides[get_gateway_client] = lambda: client
+        return client
+
+    yield install
+    app.dependency_overrides.pop(get_gateway_client, None)
+
+
+@pytest.fixture
+async def http_client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _respond(method, params=None, timeout=30.0):
+    if method == "cron.list":
+        raise Exception("cron disabled")
+    if method == "sessions.usage":
+        raise TimeoutError("slow")
+    return {"method": method, "params": params}
+
+
+class TestBatch:
+    @pytest.mark.asyncio
+    async def test_results_in_request_order(self, http_client, use_client):
+        use_client(_make_connected_client(_respond))
+        resp = await http_client.post(
+            "/api/gateway/batch",
+            json={"requests": [
+                {"method": "agents.list", "id": "agents"},
+                {"method": "skills.status", "params": {"agentId": "main"}},
+            ]},
+        )
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert results[0] == {
+            "id": "agents", "method": "agents.list", "ok": True,
+            "payload": {"method": "agents.list", "params": None},
+        }
+        assert results[1]["id"] == "1"
+        assert results[1]["payload"]["params"] == {"agentId": "main"}
+
+    @pytest.mark.asyncio
+    async def test_item_errors_are_isolated(self, http_client, use_client):
+        use_client(_make_connected_client(_respond))
+        resp = await http_client.post(
+            "/api/gateway/batch",
+            json={"requests": [
+                {"method": "cron.list"},
+                {"method": "sessions.usage"},
+                {"method": "models.list"},
+                {"method": "agents.delete", "params": {"id": "main"}},
+            ]},
+        )
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert results[0]["error"]["status"] == 502
+        assert results[1]["error"]["status"] == 504
+        assert results[2]["ok"] is True
+        assert results[3]["error"]["status"] == 400
+
+    @pytest.mark.asyncio
+    async def test_rejected_method_never_reaches_gateway(self, http_client, use_client):
+        client = use_client(_make_connected_client(_respond))
+        await http_client.post(
+            "/api/gateway/batch", json={"requests": [{"method": "config.apply"}]}
+        )
+        client.send_request.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_each_item(self, http_client, use_client):
+        async def hang(method, params=None, timeout=30.0):
+            await asyncio.sleep(10)
+
+        use_client(_make_connected_client(hang))
+        resp = await asyncio.wait_for(http_client.post(
+            "/api/gateway/batch",
+            json={"requests": [{"method": "agents.list"}, {"method": "models.list"}], "timeoutMs": 50},
+        ), 5)
+        assert [r["error"]["status"] for r in resp.json()["results"]] == [504, 504]
+        assert resp.json()["durationMs"] < 1000
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("batch_first", [True, False])
+    async def test_deadline_does_not_leak_into_overlapping_read(
+        self, http_client, use_client, batch_first
+    ):
+        release = asyncio.Event()
+
+        async def slow(method, params=None, timeout=30.0):
+            await release.wait()
+            return ["a"]
+
+        client = use_client(_make_connected_client(slow))
+
+        async def batch():
+            return await http_client.post(
+                "/api/gateway/batch",
+                json={"requests": [{"method": "agents.list"}], "timeoutMs": 50},
+            )
+
+        first, second = (batch, lambda: http_client.get("/api/gateway/agents"))
+        if not batch_first:
+            first, second = second, first
+        first_task = asyncio.create_task(first())
+        while client.single_flight.in_flight < 1:
+            await asyncio.sleep(0)
+        second_task = asyncio.create_task(second())
+        while client.single_flight.shared < 1:
+            await asyncio.sleep(0)
+
+        batched = await asyncio.wait_for(first_task if batch_first else second_task, 5)
+        assert batched.json()["results"][0]["error"]["status"] == 504
+        release.set()
+        read = await (second_task if batch_first else first_task)
+        assert read.status_code == 200 and read.json() == ["a"]
+        assert client.send_request.await_count == 1
+        assert "timeout" not in client.send_request.await_args.kwargs
+
+    @pytest.mark.asyncio
+    async def test_identical_items_share_one_call(self, http_client, use_client):
+        release = asyncio.Event()
+
+        async def slow(method, params=None, timeout=30.0):
+            await release.wait()
+            return ["a"]
+
+        client = use_client(_make_connected_client(slow))
+        task = asyncio.create_task(http_client.post(
+            "/api/gateway/batch",
+            json={"requests": [{"method": "agents.list"}, {"method": "agents.list"}]},
+        ))
+        while client.single_flight.shared < 1:
+            await asyncio.sleep(0)
+        release.set()
+        resp = await task
+        assert [r["payload"] for r in resp.json()["results"]] == [["a"], ["a"]]
+        assert client.send_request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_disconnected_items_report_503(self, http_client, use_client):
+        use_client(GatewayClient(url="", token=""))
+        resp = await http_client.post(
+            "/api/gateway/batch", json={"requests": [{"method": "agents.list"}]}
+        )
+        assert resp.json()["results"][0]["error"]["status"] == 503
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_rejected(self, http_client, use_client):
+        use_client(GatewayClient(url="", token=""))
+        resp = await http_client.post("/api/gateway/batch", json={"requests": []})
+        assert resp.status_code == 422
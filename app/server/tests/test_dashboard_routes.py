@@ -0,0 +1,131 @@
+"""Unit tests for the dashboard route and its event-maintained snapshot."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from dashboard_routes import DashboardSnapshot, dashboard_snapshot
+from gateway_client import GatewayClient, get_gateway_client
+from gateway_models import ConnectionState, GatewayEvent
+from server import app
+
+RAW = {
+    "agents.list": {"agents": [{"id": "main", "identity": {"name": "Main"}}]},
+    "sessions.list": {
+        "sessions": [
+            {"key": "s1", "agentId": "main", "lastMessage": {"content": "first"}},
+            {"key": "s2", "agentId": "main", "lastMessage": {"content": "second"}},
+        ]
+    },
+    "sessions.usage": {"total": {"cost": 1.5}},
+    "cron.list": {"jobs": [{"id": "j1", "name": "Nightly"}]},
+}
+
+
+def _make_connected_client():
+    client = GatewayClient(url="ws://test", token="test-token")
+    client.state = ConnectionState.CONNECTED
+    client.send_request = AsyncMock(side_effect=lambda method, params, **kw: RAW[method])
+    return client
+
+
+@pytest.fixture
+async def http_client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+class TestGetDashboard:
+    @pytest.mark.asyncio
+    async def test_disconnected_returns_empty_widgets(self, http_client):
+        client = GatewayClient(url="", token="")
+        app.dependency_overrides[get_gateway_client] = lambda: client
+        try:
+            resp = await http_client.get("/api/dashboard")
+        finally:
+            app.dependency_overrides.pop(get_gateway_client, None)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["agents"] == []
+        assert data["costSummary"]["todayTotal"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_builds_on_demand_without_snapshot(self, http_client):
+        client = _make_connected_client()
+        app.dependency_overrides[get_gateway_client] = lambda: client
+        try:
+            resp = await http_client.get("/api/dashboard")
+        finally:
+            app.dependency_overrides.pop(get_gateway_client, None)
+        data = resp.json()
+        assert data["agents"][0]["name"] == "Main"
+        assert data["upcomingJobs"][0]["name"] == "Nightly"
+        assert client.send_request.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_served_from_snapshot_without_rpcs(self, http_client):
+        client = _make_connected_client()
+        dashboard_snapshot.client = client
+        await dashboard_snapshot.reconcile()
+        client.send_request.reset_mock()
+        app.dependency_overrides[get_gateway_client] = lambda: client
+        try:
+            for _ in range(5):
+                resp = await http_client.get("/api/dashboard")
+                assert resp.json()["costSummary"]["todayTotal"] == 1.5
+        finally:
+            app.dependency_overrides.pop(get_gateway_client, None)
+            dashboard_snapshot.client = None
+            dashboard_snapshot.payload = None
+        client.send_request.assert_not_awaited()
+
+
+class TestDashboardSnapshot:
+    @pytest.mark.asyncio
+    async def test_chat_event_moves_session_to_top(self):
+        snapshot = DashboardSnapshot()
+        snapshot.client = _make_connected_client()
+        await snapshot.reconcile()
+
+        snapshot._on_event(GatewayEvent(
+            event="chat",
+            payload={"sessionKey": "s2", "state": "final", "message": {"content": "new"}},
+        ))
+
+        activity = snapshot.payload["recentActivity"]
+        assert [a["id"] for a in activity] == ["s2", "s1"]
+        assert activity[0]["snippet"] == "new"
+        assert snapshot.get_stats()["dirty"] == ["usage"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_session_marks_sessions_dirty(self):
+        snapshot = DashboardSnapshot()
+        snapshot.client = _make_connected_client()
+        await snapshot.reconcile()
+
+        snapshot._on_event(GatewayEvent(
+            event="chat", payload={"sessionKey": "s9", "state": "final"}
+        ))
+        assert snapshot.get_stats()["dirty"] == ["sessions", "usage"]
+
+    @pytest.mark.asyncio
+    async def test_partial_refresh_fetches_only_dirty_sections(self):
+        snapshot = DashboardSnapshot()
+        client = _make_connected_client()
+        snapshot.client = client
+        await snapshot.reconcile()
+        client.send_request.reset_mock()
+
+        snapshot._on_event(GatewayEvent(event="cron", payload={}))
+        await snapshot._refresh_dirty()
+
+        assert client.send_request.await_count == 1
+        assert client.send_request.await_args.args[0] == "cron.list"
+        assert snapshot.get_stats()["dirty"] == []
+
+    def test_events_ignored_before_first_reconcile(self):
+        snapshot = DashboardSnapshot()
+        snapshot._on_event(GatewayEvent(event="cron", payload={}))
+        assert snapshot.get_stats()["dirty"] == []
@@ -0,0 +1,204 @@
+"""Unit tests for the SSE event broadcast hub."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from event_broadcast import (
+    EventBroadcaster,
+    coalesce,
+    encode_batch,
+    get_event_hub,
+    parse_last_event_id,
+)
+from gateway_client import GatewayClient
+from gateway_models import GatewayEvent
+
+
+def _event(name="presence", **payload):
+    return GatewayEvent(event=name, payload=payload)
+
+
+class TestEventBroadcaster:
+    @pytest.mark.asyncio
+    async def test_subscribers_share_one_encoded_frame(self):
+        hub = EventBroadcaster()
+        subs = [hub.subscribe() for _ in range(3)]
+
+        with patch("event_broadcast.encode_frame", wraps=lambda e, d: b"frame") as encode:
+            hub.publish(_event())
+
+        batches = [await s.next(timeout=1) for s in subs]
+        assert encode.call_count == 1
+        assert all(len(b) == 1 and b[0].frame is batches[0][0].frame for b in batches)
+
+    @pytest.mark.asyncio
+    async def test_frame_is_valid_sse(self):
+        hub = EventBroadcaster()
+        sub = hub.subscribe()
+        hub.publish(_event("cron", id="j1"))
+        (encoded,) = await sub.next(timeout=1)
+        assert b"event: cron" in encoded.frame
+        assert b'data: {"id": "j1"}' in encoded.frame
+
+    @pytest.mark.asyncio
+    async def test_subscriber_only_sees_events_after_subscribing(self):
+        hub = EventBroadcaster()
+        hub.publish(_event(n=1))
+        sub = hub.subscribe()
+        hub.publish(_event(n=2))
+        events = await sub.next(timeout=1)
+        assert [e.event.payload["n"] for e in events] == [2]
+
+    @pytest.mark.asyncio
+    async def test_next_waits_for_publish(self):
+        hub = EventBroadcaster()
+        sub = hub.subscribe()
+        waiter = asyncio.create_task(sub.next(timeout=1))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        hub.publish(_event())
+        assert len(await waiter) == 1
+
+    @pytest.mark.asyncio
+    async def test_next_times_out_empty(self):
+        hub = EventBroadcaster()
+        sub = hub.subscribe()
+        assert await sub.next(timeout=0.01) == []
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest(self):
+        hub = EventBroadcaster(capacity=3)
+        sub = hub.subscribe()
+        for n in range(5):
+            hub.publish(_event(n=n))
+        assert sub.lag == 5
+
+        events = await sub.next(timeout=1)
+        assert [e.event.payload["n"] for e in events] == [2, 3, 4]
+        stats = sub.get_stats()
+        assert (stats["lag"], stats["delivered"], stats["dropped"]) == (0, 3, 2)
+
+    def test_close_removes_subscriber(self):
+        hub = EventBroadcaster()
+        sub = hub.subscribe()
+        assert hub.subscriber_count == 1
+        sub.close()
+        assert hub.subscriber_count == 0
+
+
+class TestGetEventHub:
+    def test_registers_single_callback_per_client(self):
+        client = GatewayClient(url="", token="")
+        hub = get_event_hub(client)
+        for _ in range(10):
+            get_event_hub(client).subscribe()
+        assert get_event_hub(client) is hub
+        assert client._global_event_callbacks == [hub.publish]
+
+    @pytest.mark.asyncio
+    async def test_gateway_events_reach_subscribers(self):
+        client = GatewayClient(url="", token="")
+        sub = get_event_hub(client).subscribe()
+        await client._handle_event({"type": "event", "event": "chat", "payload": {"x": 1}})
+        (encoded,) = await sub.next(timeout=1)
+        assert encoded.event.event == "chat"
+
+
+class TestResume:
+    def _hub_with_seqs(self, seqs, capacity=256):
+        hub = EventBroadcaster(capacity=capacity)
+        for seq in seqs:
+            hub.publish(GatewayEvent(event="chat", payload={"seq": seq}, seq=seq))
+        return hub
+
+    def test_frames_carry_gateway_seq_as_id(self):
+        hub = self._hub_with_seqs([7])
+        assert b"id: 7" in hub._ring[0].frame
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_missed_events(self):
+        hub = self._hub_with_seqs([1, 2, 3, 4])
+        sub = hub.subscribe(last_event_id=2)
+        assert sub.resumed is True
+        events = await sub.next(timeout=1)
+        assert [e.event.seq for e in events] == [3, 4]
+
+    def test_resume_when_up_to_date(self):
+        hub = self._hub_with_seqs([1, 2])
+        sub = hub.subscribe(last_event_id=2)
+        assert sub.resumed is True
+        assert sub.lag == 0
+
+    def test_resume_fails_when_seq_evicted(self):
+        hub = self._hub_with_seqs([1, 2, 3, 4, 5], capacity=2)
+        sub = hub.subscribe(last_event_id=1)
+        assert sub.resumed is False
+        assert sub.lag == 0
+
+    def test_resume_fails_after_gateway_restart(self):
+        hub = self._hub_with_seqs([1, 2])
+        assert hub.subscribe(last_event_id=40).resumed is False
+
+    def test_resume_fails_across_seq_gap(self):
+        # 3 was dropped before reaching the ring
+        hub = self._hub_with_seqs([1, 2, 4, 5])
+        assert hub.subscribe(last_event_id=1).resumed is False
+        assert hub.subscribe(last_event_id=4).resumed is True
+
+    def test_resume_fails_when_seq_restarts_in_ring(self):
+        hub = self._hub_with_seqs([5, 6, 1, 2])
+        assert hub.subscribe(last_event_id=6).resumed is False
+        assert hub.subscribe(last_event_id=1).resumed is True
+
+    def test_resume_from_just_before_ring(self):
+        hub = self._hub_with_seqs([3, 4, 5, 6], capacity=2)
+        sub = hub.subscribe(last_event_id=4)
+        assert sub.resumed is True
+        assert sub.lag == 2
+
+    def test_resume_fails_with_empty_ring(self):
+        assert EventBroadcaster().subscribe(last_event_id=3).resumed is False
+
+    def test_parse_last_event_id(self):
+        assert parse_last_event_id("12") == 12
+        assert parse_last_event_id("") is None
+        assert parse_last_event_id("abc") is None
+
+
+class TestBatching:
+    def _published(self, *events):
+        hub = EventBroadcaster()
+        for event in events:
+            hub.publish(event)
+        return list(hub._ring)
+
+    def test_coalesce_keeps_last_state_event_per_entity(self):
+        encoded = self._published(
+            GatewayEvent(event="presence", payload={"deviceId": "a", "n": 1}),
+            GatewayEvent(event="chat", payload={"n": 2}),
+            GatewayEvent(event="presence", payload={"deviceId": "b", "n": 3}),
+            GatewayEvent(event="presence", payload={"deviceId": "a", "n": 4}),
+            GatewayEvent(event="chat", payload={"n": 5}),
+        )
+        assert [e.event.payload["n"] for e in coalesce(encoded)] == [2, 3, 4, 5]
+
+    def test_coalesce_keeps_all_deltas(self):
+        encoded = self._published(*[GatewayEvent(event="agent", payload={"n": n}) for n in range(3)])
+        assert coalesce(encoded) == encoded
+
+    def test_batch_frame_holds_ordered_array(self):
+        encoded = self._published(
+            GatewayEvent(event="chat", payload={"text": "a"}, seq=4),
+            GatewayEvent(event="agent", payload={"text": "b"}, seq=5),
+        )
+        frame = encode_batch(encoded).decode()
+        assert "event: batch" in frame
+        assert "id: 5" in frame
+        data = json.loads(frame.split("data: ", 1)[1].split("\r\n", 1)[0])
+        assert data == [
+            {"event": "chat", "seq": 4, "data": {"text": "a"}},
+            {"event": "agent", "seq": 5, "data": {"text": "b"}},
+        ]
@@ -0,0 +1,148 @@
+"""Unit tests for worker-driven gateway event dispatch."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from event_dispatch import EventDispatcher
+from gateway_client import GatewayClient
+from gateway_models import ConnectionState
+
+
+class TestEventDispatcher:
+    @pytest.mark.asyncio
+    async def test_callbacks_run_in_order(self):
+        dispatcher = EventDispatcher()
+        seen = []
+        for n in range(5):
+            await dispatcher.submit(n, [seen.append])
+        await dispatcher.drain()
+        assert seen == [0, 1, 2, 3, 4]
+        assert dispatcher.get_stats()["dispatched"] == 5
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_submit_does_not_wait_for_callbacks(self):
+        dispatcher = EventDispatcher()
+        release = asyncio.Event()
+
+        async def slow(event):
+            await release.wait()
+
+        await asyncio.wait_for(dispatcher.submit("e", [slow]), timeout=0.1)
+        release.set()
+        await dispatcher.drain()
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_callback_errors_are_isolated(self):
+        dispatcher = EventDispatcher()
+        seen = []
+
+        def broken(event):
+            raise RuntimeError("boom")
+
+        await dispatcher.submit("e", [broken, seen.append])
+        await dispatcher.drain()
+        assert seen == ["e"]
+        stats = dispatcher.get_stats()["callbacks"]
+        assert any(s["errors"] == 1 for s in stats.values())
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_slow_callbacks_are_counted(self):
+        dispatcher = EventDispatcher(slow_callback_ms=1)
+
+        async def slow(event):
+            await asyncio.sleep(0.01)
+
+        await dispatcher.submit("e", [slow])
+        await dispatcher.drain()
+        (stats,) = dispatcher.get_stats()["callbacks"].values()
+        assert stats["slow"] == 1
+        assert stats["maxMs"] >= 1
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_overflow(self):
+        dispatcher = EventDispatcher(maxsize=2, overflow="drop-oldest")
+        release = asyncio.Event()
+        seen = []
+
+        async def record(event):
+            await release.wait()
+            seen.append(event)
+
+        await dispatcher.submit(0, [record])
+        await asyncio.sleep(0)
+        for n in range(1, 5):
+            await dispatcher.submit(n, [record])
+        release.set()
+        await dispatcher.drain()
+        assert seen == [0, 3, 4]
+        assert dispatcher.dropped == 2
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_spill_overflow_keeps_every_event_in_order(self):
+        dispatcher = EventDispatcher(maxsize=2, overflow="spill")
+        seen = []
+        for n in range(6):
+            await dispatcher.submit(n, [seen.append])
+        assert dispatcher.spilled > 0
+        await dispatcher.drain()
+        assert seen == list(range(6))
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_block_overflow_applies_backpressure(self):
+        dispatcher = EventDispatcher(maxsize=1, overflow="block")
+        release = asyncio.Event()
+
+        async def gated(event):
+            await release.wait()
+
+        await dispatcher.submit(0, [gated])
+        await asyncio.sleep(0)
+        await dispatcher.submit(1, [gated])
+        blocked = asyncio.create_task(dispatcher.submit(2, [gated]))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        release.set()
+        await asyncio.wait_for(blocked, timeout=1)
+        await dispatcher.drain()
+        assert dispatcher.dispatched == 3
+        await dispatcher.stop()
+
+    def test_rejects_unknown_policy(self):
+        with pytest.raises(ValueError):
+            EventDispatcher(overflow="explode")
+
+
+class TestClientDispatch:
+    @pytest.mark.asyncio
+    async def test_slow_listener_does_not_delay_responses(self):
+        client = GatewayClient(url="ws://fake", token="")
+        client.state = ConnectionState.CONNECTED
+        client._ws = AsyncMock()
+        release = asyncio.Event()
+
+        async def slow_listener(event):
+            await release.wait()
+
+        client.on_any_event(slow_listener)
+        request = asyncio.create_task(client.send_request("agents.list"))
+        while "1" not in client._pending_requests:
+            await asyncio.sleep(0)
+
+        await asyncio.wait_for(
+            client._handle_event({"type": "event", "event": "chat", "payload": {}}), timeout=0.1
+        )
+        client._handle_response({"type": "res", "id": "1", "ok": True, "payload": []})
+        assert await asyncio.wait_for(request, timeout=0.1) == []
+
+        release.set()
+        await client.dispatcher.drain()
+        await client.dispatcher.stop()
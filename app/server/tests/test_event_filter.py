@@ -0,0 +1,72 @@
+"""Unit tests for server-side SSE topic filters."""
+
+import pytest
+
+from event_broadcast import EventBroadcaster
+from event_filter import EventFilter, RoutingKeys, routing_keys
+from gateway_models import GatewayEvent
+
+
+class TestRoutingKeys:
+    def test_agent_parsed_from_session_key(self):
+        event = GatewayEvent(event="chat", payload={"sessionKey": "agent:main:webchat:main"})
+        assert routing_keys(event) == RoutingKeys(
+            agent_id="main", session_key="agent:main:webchat:main"
+        )
+
+    def test_explicit_agent_id_wins(self):
+        event = GatewayEvent(event="agent", payload={"agentId": "ops", "sessionKey": "x"})
+        assert routing_keys(event).agent_id == "ops"
+
+    def test_events_without_context(self):
+        assert routing_keys(GatewayEvent(event="presence")) == RoutingKeys()
+
+
+class TestEventFilter:
+    def test_from_query_returns_none_without_filters(self):
+        assert EventFilter.from_query(None, [], None) is None
+
+    def test_comma_separated_and_repeated_values(self):
+        f = EventFilter.from_query(["chat,cron", "agent*"])
+        assert f.events == {"chat", "cron", "agent*"}
+
+    def test_name_globs(self):
+        f = EventFilter.from_query(["chat", "exec.approval.*"])
+        assert f.matches("chat", RoutingKeys())
+        assert f.matches("exec.approval.requested", RoutingKeys())
+        assert not f.matches("agent", RoutingKeys())
+        assert f._name_cache == {
+            "chat": True, "exec.approval.requested": True, "agent": False
+        }
+
+    def test_agent_filter_passes_events_without_agent(self):
+        f = EventFilter.from_query(agent_ids=["main"])
+        assert f.matches("chat", RoutingKeys(agent_id="main"))
+        assert not f.matches("chat", RoutingKeys(agent_id="ops"))
+        assert f.matches("health", RoutingKeys())
+
+    def test_session_filter(self):
+        f = EventFilter.from_query(session_keys=["agent:main:webchat:main"])
+        assert f.matches("chat", RoutingKeys(session_key="agent:main:webchat:main"))
+        assert not f.matches("chat", RoutingKeys(session_key="agent:main:slack:dm:1"))
+
+
+class TestFilteredSubscription:
+    @pytest.mark.asyncio
+    async def test_subscriber_receives_only_matching_events(self):
+        hub = EventBroadcaster()
+        sub = hub.subscribe(event_filter=EventFilter.from_query(["chat"], ["main"]))
+        hub.publish(GatewayEvent(event="agent", payload={"agentId": "main"}))
+        hub.publish(GatewayEvent(event="chat", payload={"agentId": "ops"}))
+        hub.publish(GatewayEvent(event="chat", payload={"agentId": "main"}))
+
+        events = await sub.next(timeout=1)
+        assert [(e.event.event, e.keys.agent_id) for e in events] == [("chat", "main")]
+        assert sub.get_stats()["filtered"] == 2
+
+    @pytest.mark.asyncio
+    async def test_next_keeps_waiting_past_filtered_events(self):
+        hub = EventBroadcaster()
+        sub = hub.subscribe(event_filter=EventFilter.from_query(["cron"]))
+        hub.publish(GatewayEvent(event="chat"))
+        assert await sub.next(timeout=0.01) == []
@@ -0,0 +1,207 @@
+"""Unit tests for ranged, conditional agent file delivery."""
+
+import base64
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import gateway_routes
+from file_stream import (
+    FileContentCache,
+    RangeNotSatisfiable,
+    content_bytes,
+    etag_matches,
+    iter_chunks,
+    make_blob,
+    parse_range,
+)
+from gateway_client import GatewayClient, get_gateway_client
+from gateway_models import ConnectionState
+from server import app
+
+CONTENT = "".join(f"line {i}\n" for i in range(20000))
+URL = "/api/gateway/agents/main/files/raw?path=logs/run.log"
+
+
+class TestParseRange:
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            (None, None),
+            ("bytes=0-99", (0, 99)),
+            ("bytes=100-", (100, 999)),
+            ("bytes=-100", (900, 999)),
+            ("bytes=-5000", (0, 999)),
+            ("bytes=900-5000", (900, 999)),
+            ("bytes=0-1,5-6", None),
+            ("bytes=abc", None),
+            ("bytes=9-1", None),
+            ("items=0-1", None),
+        ],
+    )
+    def test_ranges(self, header, expected):
+        assert parse_range(header, 1000) == expected
+
+    def test_past_end_not_satisfiable(self):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
+
+    @pytest.mark.parametrize("header", ["bytes=-10", "bytes=-0", "bytes=0-", "bytes=0-0"])
+    def test_empty_file_not_satisfiable(self, header):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(header, 0)
+
+
+class TestHelpers:
+    def test_content_bytes(self):
+        assert content_bytes({"content": "héllo"}) == "héllo".encode()
+        encoded = base64.b64encode(b"\x00\x01").decode()
+        assert content_bytes({"content": encoded, "encoding": "base64"}) == b"\x00\x01"
+        assert content_bytes("plain") == b"plain"
+        with pytest.raises(ValueError):
+            content_bytes({"content": 5})
+
+    def test_etag_matches(self):
+        etag = make_blob("a.txt", b"x").etag
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_iter_chunks(self):
+        assert list(iter_chunks(b"abcdefg", 1, 5, chunk_size=2)) == [b"bc", b"de", b"f"]
+
+    def test_text_media_type_has_charset(self):
+        assert make_blob("notes.md", b"").media_type.endswith("charset=utf-8")
+
+
+class TestFileContentCache:
+    def test_evicts_least_recent_by_bytes(self):
+        cache = FileContentCache(max_bytes=10)
+        cache.put("a", "1", make_blob("1", b"12345"))
+        cache.put("a", "2", make_blob("2", b"12345"))
+        cache.get("a", "1")
+        cache.put("a", "3", make_blob("3", b"12345"))
+        assert cache.get("a", "1") is not None
+        assert cache.get("a", "2") is None
+        assert cache.size == 10
+
+    def test_expires_after_ttl(self):
+        cache = FileContentCache(ttl=0)
+        cache.put("a", "1", make_blob("1", b"x"))
+        assert cache.get("a", "1") is None
+        assert cache.size == 0
+
+    def test_skips_files_larger_than_budget(self):
+        cache = FileContentCache(max_bytes=2)
+        cache.put("a", "1", make_blob("1", b"xyz"))
+        assert cache.get_stats()["entries"] == 0
+
+
+@pytest.fixture
+def connected_client(monkeypatch):
+    monkeypatch.setattr(gateway_routes, "file_cache", FileContentCache())
+    client = GatewayClient(url="ws://test", token="test-token")
+    client.state = ConnectionState.CONNECTED
+    client.send_request = AsyncMock(return_value={"content": CONTENT})
+    app.dependency_overrides[get_gateway_client] = lambda: client
+    yield client
+    app.dependency_overrides.pop(get_gateway_client, None)
+
+
+@pytest.fixture
+async def http_client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+class TestRawFileRoute:
+    @pytest.mark.asyncio
+    async def test_full_file(self, http_client, connected_client):
+        resp = await http_client.get(URL)
+        assert resp.status_code == 200
+        assert resp.text == CONTENT
+        assert resp.headers["accept-ranges"] == "bytes"
+        assert resp.headers["content-length"] == str(len(CONTENT))
+        assert resp.headers["etag"]
+
+    @pytest.mark.asyncio
+    async def test_range(self, http_client, connected_client):
+        resp = await http_client.get(URL, headers={"Range": "bytes=7-13"})
+        assert resp.status_code == 206
+        assert resp.text == CONTENT[7:14]
+        assert resp.headers["content-range"] == f"bytes 7-13/{len(CONTENT)}"
+
+    @pytest.mark.asyncio
+    async def test_suffix_range_tails_file(self, http_client, connected_client):
+        resp = await http_client.get(URL, headers={"Range": "bytes=-9"})
+        assert resp.status_code == 206
+        assert resp.text == CONTENT[-9:]
+
+    @pytest.mark.asyncio
+    async def test_unsatisfiable_range(self, http_client, connected_client):
+        resp = await http_client.get(URL, headers={"Range": f"bytes={len(CONTENT)}-"})
+        assert resp.status_code == 416
+        assert resp.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    @pytest.mark.asyncio
+    async def test_suffix_range_of_empty_file(self, http_client, connected_client):
+        connected_client.send_request.return_value = {"content": ""}
+        resp = await http_client.get(URL, headers={"Range": "bytes=-10"})
+        assert resp.status_code == 416
+        assert resp.headers["content-range"] == "bytes */0"
+
+    @pytest.mark.asyncio
+    async def test_conditional_get(self, http_client, connected_client):
+        etag = (await http_client.get(URL)).headers["etag"]
+        resp = await http_client.get(URL, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+    @pytest.mark.asyncio
+    async def test_stale_if_range_returns_whole_file(self, http_client, connected_client):
+        resp = await http_client.get(URL, headers={"Range": "bytes=0-1", "If-Range": '"old"'})
+        assert resp.status_code == 200
+        assert len(resp.content) == len(CONTENT)
+
+    @pytest.mark.asyncio
+    async def test_pages_share_one_gateway_fetch(self, http_client, connected_client):
+        for start in (0, 100, 200):
+            await http_client.get(URL, headers={"Range": f"bytes={start}-{start + 99}"})
+        connected_client.send_request.assert_awaited_once_with(
+            "agents.files.get", {"agentId": "main", "path": "logs/run.log"}
+        )
+
+        await http_client.get(URL, headers={"Cache-Control": "no-cache"})
+        assert connected_client.send_request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_cached_file(self, http_client, connected_client):
+        etag = (await http_client.get(URL)).headers["etag"]
+        resp = await http_client.put(
+            "/api/gateway/agents/main/files/content",
+            json={"path": "logs/run.log", "content": "rewritten\n"},
+        )
+        assert resp.status_code == 200
+        connected_client.send_request.assert_awaited_with(
+            "agents.files.set", {"agentId": "main", "path": "logs/run.log", "content": "rewritten\n"}
+        )
+
+        connected_client.send_request.return_value = {"content": "rewritten\n"}
+        resp = await http_client.get(URL, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.text == "rewritten\n"
+        assert resp.headers["etag"] != etag
+
+    @pytest.mark.asyncio
+    async def test_disconnected(self, http_client, monkeypatch):
+        monkeypatch.setattr(gateway_routes, "file_cache", FileContentCache())
+        app.dependency_overrides[get_gateway_client] = lambda: GatewayClient(url="", token="")
+        try:
+            resp = await http_client.get(URL)
+        finally:
+            app.dependency_overrides.pop(get_gateway_client, None)
+        assert resp.status_code == 503
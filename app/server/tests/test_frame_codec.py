@@ -0,0 +1,78 @@
+"""Unit tests for fast gateway frame decoding."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import frame_codec
+from gateway_client import GatewayClient
+from gateway_models import ConnectionState
+
+
+class TestLoads:
+    def test_decodes_str_and_bytes(self):
+        assert frame_codec.loads('{"type": "res"}') == {"type": "res"}
+        assert frame_codec.loads(b'{"type": "res"}') == {"type": "res"}
+
+    def test_malformed_input_raises_decode_error(self):
+        with pytest.raises(frame_codec.DecodeError):
+            frame_codec.loads("{not json")
+
+
+class TestDecodeEvent:
+    def test_well_formed_event(self):
+        event = frame_codec.decode_event(
+            {"type": "event", "event": "chat", "payload": {"a": 1}, "seq": 3}
+        )
+        assert (event.event, event.payload, event.seq) == ("chat", {"a": 1}, 3)
+        assert event.to_model().payload == {"a": 1}
+
+    def test_missing_payload_defaults_to_empty(self):
+        assert frame_codec.decode_event({"event": "presence"}).payload == {}
+
+    def test_missing_name_rejected_up_front(self):
+        with pytest.raises(ValueError):
+            frame_codec.decode_event({"type": "event", "payload": {}})
+
+    def test_malformed_fields_rejected_when_read(self):
+        event = frame_codec.decode_event({"event": "chat", "payload": [1], "seq": "x"})
+        assert event.event == "chat"
+        with pytest.raises(ValueError):
+            event.payload
+        with pytest.raises(ValueError):
+            event.seq
+
+    def test_error_message(self):
+        assert frame_codec.decode_error_message(
+            {"error": {"code": "E", "message": "nope"}}
+        ) == "nope"
+        assert frame_codec.decode_error_message({}) == "Unknown error"
+
+
+class TestClientFastPath:
+    @pytest.mark.asyncio
+    async def test_tick_skips_event_model(self):
+        client = GatewayClient(url="", token="")
+        callback = AsyncMock()
+        client.on_any_event(callback)
+        with patch("frame_codec.decode_event") as decode:
+            await client._handle_event({"type": "event", "event": "tick", "seq": 9})
+        decode.assert_not_called()
+        callback.assert_not_awaited()
+        assert client._last_event_seq == 9
+
+    @pytest.mark.asyncio
+    async def test_error_response_raises(self):
+        client = GatewayClient(url="ws://fake", token="")
+        client.state = ConnectionState.CONNECTED
+        client._ws = AsyncMock()
+        task = asyncio.create_task(client.send_request("agents.create"))
+        while "1" not in client._pending_requests:
+            await asyncio.sleep(0)
+        client._handle_response({
+            "type": "res", "id": "1", "ok": False,
+            "error": {"code": "INVALID", "message": "bad id"},
+        })
+        with pytest.raises(Exception, match="Gateway error: bad id"):
+            await task
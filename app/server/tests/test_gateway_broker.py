@@ -0,0 +1,226 @@
+"""Unit tests for the multi-worker gateway broker."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from frame_codec import decode_event
+from gateway_broker import BrokerClient, GatewayBroker
+from gateway_client import GatewayClient, GatewayRequestError, get_gateway_client
+from gateway_models import ConnectionState
+from gateway_reconnect import Backoff
+from server import app
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "gw.sock")
+
+
+@pytest.fixture
+async def leader(socket_path):
+    client = GatewayClient(url="ws://fake", token="")
+    client.state = ConnectionState.CONNECTED
+    client.send_request = AsyncMock(return_value={"agents": []})
+    broker = GatewayBroker(socket_path)
+    assert broker.try_become_leader()
+    await broker.serve(client)
+    yield broker, client
+    await broker.close()
+
+
+@pytest.fixture
+async def worker(leader, socket_path):
+    client = BrokerClient(socket_path, status_interval=0.01)
+    await client.connect()
+    while not client.is_connected:
+        await asyncio.sleep(0.01)
+    yield client
+    await client.disconnect()
+
+
+class TestLeaderElection:
+    def test_only_one_leader_per_socket(self, socket_path):
+        first, second = GatewayBroker(socket_path), GatewayBroker(socket_path)
+        assert first.try_become_leader() is True
+        assert second.try_become_leader() is False
+        asyncio.run(first.close())
+        assert second.try_become_leader() is True
+        asyncio.run(second.close())
+
+
+class TestBrokerClient:
+    @pytest.mark.asyncio
+    async def test_forwards_rpc_to_leader(self, leader, worker):
+        _, gateway = leader
+        assert await worker.send_request("agents.list", {"x": 1}, timeout=5) == {"agents": []}
+        gateway.send_request.assert_awaited_once_with("agents.list", {"x": 1}, priority=None)
+        await worker.send_request("cron.run", {"id": "j"}, timeout=5)
+        gateway.send_request.assert_awaited_with(
+            "cron.run", {"id": "j"}, timeout=5.0, priority=None
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_gateway_call(self, leader, worker):
+        _, gateway = leader
+        release = asyncio.Event()
+
+        async def slow(*args, **kwargs):
+            await release.wait()
+            return ["a"]
+
+        gateway.send_request = AsyncMock(side_effect=slow)
+        tasks = [asyncio.create_task(worker.send_request("agents.list")) for _ in range(3)]
+        while gateway.single_flight.shared < 2:
+            await asyncio.sleep(0.01)
+        release.set()
+        assert await asyncio.gather(*tasks) == [["a"]] * 3
+        assert gateway.send_request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_short_timeout_does_not_fail_shared_read(self, leader, worker):
+        _, gateway = leader
+        release = asyncio.Event()
+
+        async def slow(method, params=None, timeout=30.0, priority=None):
+            await asyncio.wait_for(release.wait(), timeout)
+            return ["a"]
+
+        gateway.send_request = AsyncMock(side_effect=slow)
+        # The short timeout starts the shared call; the patient read joins it
+        hasty = asyncio.create_task(worker.send_request("agents.list", timeout=0.5))
+        while gateway.single_flight.in_flight < 1:
+            await asyncio.sleep(0.01)
+        patient = asyncio.create_task(worker.send_request("agents.list", timeout=5))
+        while gateway.single_flight.shared < 1:
+            await asyncio.sleep(0.01)
+        with pytest.raises(TimeoutError):
+            await hasty
+        release.set()
+        assert await patient == ["a"]
+        assert gateway.send_request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_leader_errors_keep_their_type(self, leader, worker):
+        _, gateway = leader
+        gateway.send_request = AsyncMock(side_effect=TimeoutError("Request x timed out"))
+        with pytest.raises(TimeoutError, match="timed out"):
+            await worker.send_request("agents.list")
+
+        gateway.send_request = AsyncMock(side_effect=Exception("Gateway error: nope"))
+        with pytest.raises(Exception, match="Gateway error: nope"):
+            await worker.send_request("agents.create", {"name": "a"})
+
+    @pytest.mark.asyncio
+    async def test_route_errors_match_single_process(self, leader, worker):
+        _, gateway = leader
+        gateway.send_request = AsyncMock(
+            side_effect=GatewayRequestError("Gateway error: agent not found")
+        )
+        details = []
+        transport = ASGITransport(app=app)
+        try:
+            for client in (gateway, worker):
+                app.dependency_overrides[get_gateway_client] = (lambda c: lambda: c)(client)
+                async with AsyncClient(transport=transport, base_url="http://test") as http:
+                    resp = await http.get("/api/gateway/agents")
+                assert resp.status_code == 502
+                details.append(resp.json()["detail"])
+        finally:
+            app.dependency_overrides.pop(get_gateway_client, None)
+        assert details == ["Gateway error: agent not found"] * 2
+
+    @pytest.mark.asyncio
+    async def test_events_reach_worker_listeners(self, leader, worker):
+        broker, _ = leader
+        received = []
+        worker.on_event("chat", received.append)
+
+        broker._forward_event(
+            decode_event({"type": "event", "event": "chat", "payload": {"runId": "r"}, "seq": 7})
+        )
+        while not received:
+            await asyncio.sleep(0.01)
+        assert received[0].payload == {"runId": "r"}
+        assert received[0].seq == 7
+
+    @pytest.mark.asyncio
+    async def test_status_mirrors_leader(self, leader, worker):
+        status = worker.get_status()
+        assert status.state == ConnectionState.CONNECTED
+        assert status.gatewayUrl == "ws://fake"
+        assert status.broker["role"] == "worker"
+        assert status.broker["leader"]["role"] == "leader"
+
+    @pytest.mark.asyncio
+    async def test_disconnected_when_leader_loses_gateway(self, leader, worker):
+        _, gateway = leader
+        gateway.state = ConnectionState.RECONNECTING
+        while worker.is_connected:
+            await asyncio.sleep(0.01)
+        with pytest.raises(ConnectionError):
+            await worker.send_request("cron.run", {"id": "j"})
+        # Reads go through to the leader, which holds them for its own reconnect
+        assert worker.can_queue("agents.list") is True
+        assert await worker.send_request("agents.list") == {"agents": []}
+
+    @pytest.mark.asyncio
+    async def test_resync_when_leader_regains_gateway(self, leader, worker):
+        _, gateway = leader
+        resyncs = []
+        worker.on_resync(lambda: resyncs.append(True))
+        gateway.state = ConnectionState.RECONNECTING
+        while worker.is_connected:
+            await asyncio.sleep(0.01)
+        assert resyncs == []
+
+        gateway.state = ConnectionState.CONNECTED
+        while not worker.is_connected:
+            await asyncio.sleep(0.01)
+        assert resyncs == [True]
+
+    @pytest.mark.asyncio
+    async def test_link_loss_fails_pending_requests(self, leader, worker):
+        broker, gateway = leader
+        forwarded = asyncio.Event()
+
+        async def _hang(*args, **kwargs):
+            forwarded.set()
+            await asyncio.sleep(10)
+
+        gateway.send_request = AsyncMock(side_effect=_hang)
+        # A write cannot be replayed, so it fails with the link
+        task = asyncio.create_task(worker.send_request("cron.run", {"id": "j"}))
+        # Close only once the leader is blocked on the gateway call, so it cannot answer first
+        await asyncio.wait_for(forwarded.wait(), 5)
+        await broker.close()
+        with pytest.raises(ConnectionError):
+            await task
+        assert worker.state != ConnectionState.CONNECTED
+
+    @pytest.mark.asyncio
+    async def test_reads_wait_for_link_to_return(self, leader, worker, socket_path):
+        broker, gateway = leader
+        worker.backoff = Backoff(base=0.01, cap=0.01, rng=lambda: 1.0)
+        await broker.close()
+        while worker.state == ConnectionState.CONNECTED:
+            await asyncio.sleep(0.01)
+
+        assert worker.can_queue("agents.list") is True
+        assert worker.can_queue("cron.run") is False
+        with pytest.raises(ConnectionError):
+            await worker.send_request("cron.run", {"id": "j"})
+        task = asyncio.create_task(worker.send_request("agents.list", timeout=5))
+        while worker.replay.depth == 0:
+            await asyncio.sleep(0.01)
+
+        successor = GatewayBroker(socket_path)
+        assert successor.try_become_leader()
+        await successor.serve(gateway)
+        try:
+            assert await task == {"agents": []}
+            assert worker.replay.get_stats()["replayed"] == 1
+        finally:
+            await successor.close()
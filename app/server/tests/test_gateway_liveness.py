@@ -0,0 +1,123 @@
+"""Unit tests for gateway liveness detection and RTT tracking."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from gateway_client import GatewayClient
+from gateway_liveness import LivenessPolicy, RttHistogram
+from gateway_models import ConnectionState
+
+
+class FakeSocket:
+    """Just enough of a websockets connection for the heartbeat loop."""
+
+    def __init__(self, answer_pings=True):
+        self.answer_pings = answer_pings
+        self.transport = MagicMock()
+        self.pings = 0
+
+    async def ping(self):
+        self.pings += 1
+        pong = asyncio.get_event_loop().create_future()
+        if self.answer_pings:
+            pong.set_result(0.001)
+        return pong
+
+
+def _connected_client(ws, **policy):
+    client = GatewayClient(
+        url="ws://fake",
+        token="",
+        liveness=LivenessPolicy(**{"ping_interval": 0.01, "ping_timeout": 0.01, **policy}),
+    )
+    client.state = ConnectionState.CONNECTED
+    client._ws = ws
+    client._should_reconnect = False
+    client._last_frame_at = time.monotonic()
+    return client
+
+
+class TestRttHistogram:
+    def test_buckets_and_percentiles(self):
+        hist = RttHistogram()
+        for ms in (0.5, 3, 3, 40, 3000):
+            hist.add(ms)
+        stats = hist.get_stats()
+        assert stats["samples"] == 5
+        assert stats["lastMs"] == 3000
+        assert stats["p50Ms"] == 3
+        assert stats["buckets"]["le1"] == 1
+        assert stats["buckets"]["le5"] == 2
+        assert stats["buckets"]["le50"] == 1
+        assert stats["buckets"]["inf"] == 1
+
+    def test_window_evicts_oldest_sample(self):
+        hist = RttHistogram(window=2)
+        for ms in (1, 100, 100):
+            hist.add(ms)
+        stats = hist.get_stats()
+        assert stats["samples"] == 2
+        assert stats["total"] == 3
+        assert stats["buckets"]["le1"] == 0
+        assert stats["buckets"]["le100"] == 2
+
+    def test_empty(self):
+        assert RttHistogram().get_stats()["p99Ms"] is None
+
+
+class TestLivenessPolicy:
+    def test_deadline_follows_tick_interval(self):
+        policy = LivenessPolicy()
+        assert policy.silence_deadline(None) == 30.0
+        assert policy.silence_deadline(5.0) == 10.0
+
+    def test_explicit_timeout_wins(self):
+        assert LivenessPolicy(timeout=3.0).silence_deadline(15.0) == 3.0
+
+
+class TestHeartbeat:
+    @pytest.mark.asyncio
+    async def test_pongs_record_rtt(self):
+        ws = FakeSocket()
+        client = _connected_client(ws)
+        task = asyncio.create_task(client._heartbeat_loop())
+        while client.rtt.total < 2:
+            await asyncio.sleep(0.01)
+        client.state = ConnectionState.DISCONNECTED
+        await task
+        assert client.get_status().liveness["rtt"]["samples"] >= 2
+        assert client.stale_disconnects == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_pong_drops_socket(self):
+        ws = FakeSocket(answer_pings=False)
+        client = _connected_client(ws)
+        pending = asyncio.get_event_loop().create_future()
+        client._pending_requests["1"] = pending
+
+        await asyncio.wait_for(client._heartbeat_loop(), timeout=1)
+
+        assert client.stale_disconnects == 1
+        assert client.state == ConnectionState.DISCONNECTED
+        ws.transport.abort.assert_called_once()
+        with pytest.raises(ConnectionError, match="stale"):
+            await pending
+
+    @pytest.mark.asyncio
+    async def test_silent_socket_dropped_without_pings(self):
+        ws = FakeSocket()
+        client = _connected_client(ws, ping_interval=0, timeout=0.05)
+        await asyncio.wait_for(client._heartbeat_loop(), timeout=3)
+        assert ws.pings == 0
+        assert client.stale_disconnects == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_socket_is_reconnected(self):
+        client = _connected_client(FakeSocket(answer_pings=False))
+        client._should_reconnect = True
+        client._start_reconnect = MagicMock()
+        await asyncio.wait_for(client._heartbeat_loop(), timeout=1)
+        client._start_reconnect.assert_called_once()
@@ -0,0 +1,149 @@
+"""Unit tests for the pooled gateway client."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from websockets.exceptions import ConnectionClosed
+from websockets.frames import Close
+
+from gateway_client import GatewayClient, GatewayPool, create_gateway_client
+from gateway_models import ConnectionState
+from gateway_reconnect import Backoff
+
+
+def _make_pool(size=3):
+    pool = GatewayPool(size, url="ws://fake", token="")
+    for conn in pool.connections:
+        conn.state = ConnectionState.CONNECTED
+        conn._ws = AsyncMock()
+    return pool
+
+
+async def _respond_when_sent(conn, payload):
+    """Answer the first request written to ``conn``'s socket."""
+    while not conn._pending_requests:
+        await asyncio.sleep(0)
+    request_id = next(iter(conn._pending_requests))
+    conn._handle_response({"type": "res", "id": request_id, "ok": True, "payload": payload})
+
+
+class TestCreateGatewayClient:
+    def test_single_connection_by_default(self):
+        with patch.dict(os.environ, {"OPENCLAW_GATEWAY_POOL_SIZE": "1"}):
+            client = create_gateway_client()
+        assert type(client) is GatewayClient
+
+    def test_pool_when_size_configured(self):
+        with patch.dict(os.environ, {"OPENCLAW_GATEWAY_POOL_SIZE": "4"}):
+            client = create_gateway_client()
+        assert isinstance(client, GatewayPool)
+        assert len(client.connections) == 4
+
+
+class TestGatewayPool:
+    def test_only_primary_subscribes_to_events(self):
+        pool = _make_pool()
+        assert pool.subscribe_events is True
+        assert all(m.subscribe_events is False for m in pool.members)
+
+    def test_connected_while_any_socket_is_up(self):
+        pool = _make_pool()
+        pool.state = ConnectionState.RECONNECTING
+        pool.members[0].state = ConnectionState.DISCONNECTED
+        assert pool.is_connected is True
+        assert pool.get_status().state == ConnectionState.CONNECTED
+
+        for conn in pool.connections:
+            conn.state = ConnectionState.DISCONNECTED
+        assert pool.is_connected is False
+
+    @pytest.mark.asyncio
+    async def test_routes_to_least_outstanding_socket(self):
+        pool = _make_pool()
+        pool._pending_requests["busy"] = asyncio.get_event_loop().create_future()
+        pool.members[0]._pending_requests["busy"] = asyncio.get_event_loop().create_future()
+        idle = pool.members[1]
+
+        task = asyncio.create_task(pool.send_request("agents.list"))
+        await _respond_when_sent(idle, ["a"])
+        assert await task == ["a"]
+        idle._ws.send.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_read_fails_over_when_socket_drops(self):
+        pool = _make_pool(size=2)
+        pool._pending_requests["busy"] = asyncio.get_event_loop().create_future()
+        member = pool.members[0]
+
+        task = asyncio.create_task(pool.send_request("agents.list"))
+        while not member._pending_requests:
+            await asyncio.sleep(0)
+        member._fail_pending(ConnectionError("Gateway connection lost"))
+        pool._pending_requests.clear()
+        await _respond_when_sent(pool, ["b"])
+
+        assert await task == ["b"]
+        assert pool.failovers == 1
+
+    @pytest.mark.asyncio
+    async def test_write_not_retried_after_frame_sent(self):
+        pool = _make_pool(size=2)
+        pool._pending_requests["busy"] = asyncio.get_event_loop().create_future()
+        member = pool.members[0]
+
+        task = asyncio.create_task(pool.send_request("cron.run", {"id": "j"}))
+        while not member._pending_requests:
+            await asyncio.sleep(0)
+        member._fail_pending(ConnectionError("Gateway connection lost"))
+
+        with pytest.raises(ConnectionError):
+            await task
+        pool._ws.send.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_write_retried_when_frame_never_sent(self):
+        pool = _make_pool(size=2)
+        pool._pending_requests["busy"] = asyncio.get_event_loop().create_future()
+        member = pool.members[0]
+        member._ws.send = AsyncMock(side_effect=ConnectionClosed(Close(1006, ""), None))
+
+        task = asyncio.create_task(pool.send_request("cron.run", {"id": "j"}))
+        pool._pending_requests.clear()
+        await _respond_when_sent(pool, {"ok": True})
+        assert await task == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_primary_drop_reconnects_only_primary(self):
+        pool = _make_pool()
+        pool.backoff = Backoff(rng=lambda: 0.0)
+        members_ws = [m._ws for m in pool.members]
+        old_primary_ws = pool._ws
+        new_sockets = []
+
+        async def fake_connect(*args, **kwargs):
+            ws = AsyncMock()
+            new_sockets.append(ws)
+            return ws
+
+        with (
+            patch("gateway_client.websockets.connect", side_effect=fake_connect),
+            patch.object(GatewayClient, "_perform_handshake", AsyncMock()),
+            patch.object(GatewayClient, "_handle_messages", AsyncMock()),
+            patch.object(GatewayClient, "_heartbeat_loop", AsyncMock()),
+        ):
+            pool._connection_lost("primary dropped")
+            await pool._reconnect_task
+
+        assert len(new_sockets) == 1
+        assert pool._ws is new_sockets[0] is not old_primary_ws
+        assert [m._ws for m in pool.members] == members_ws
+        assert all(m._ws is ws for m, ws in zip(pool.members, members_ws))
+        assert pool.state == ConnectionState.CONNECTED
+
+    def test_status_reports_each_connection(self):
+        pool = _make_pool()
+        status = pool.get_status()
+        assert status.pool["size"] == 3
+        assert [c["role"] for c in status.pool["connections"]] == ["events", "rpc", "rpc"]
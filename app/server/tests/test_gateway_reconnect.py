@@ -0,0 +1,160 @@
+"""Unit tests for reconnect backoff and read replay."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from gateway_client import GatewayClient
+from gateway_models import ConnectionState
+from gateway_reconnect import Backoff, ReplayQueue
+
+
+async def _respond_when_sent(client, payload):
+    while not client._pending_requests:
+        await asyncio.sleep(0)
+    request_id = next(iter(client._pending_requests))
+    client._handle_response({"type": "res", "id": request_id, "ok": True, "payload": payload})
+
+
+def _reconnecting_client(queue_size=100):
+    client = GatewayClient(url="ws://fake", token="", replay=ReplayQueue(queue_size))
+    client.state = ConnectionState.RECONNECTING
+    client._ws = AsyncMock()
+    return client
+
+
+async def _reconnect(client):
+    client.state = ConnectionState.CONNECTED
+    client.replay.release()
+
+
+class TestBackoff:
+    def test_delay_drawn_below_growing_ceiling(self):
+        backoff = Backoff(base=1.0, cap=8.0, rng=lambda: 1.0)
+        assert [backoff.next_delay() for _ in range(5)] == [1.0, 2.0, 4.0, 8.0, 8.0]
+
+    def test_full_jitter_can_be_zero(self):
+        backoff = Backoff(base=1.0, cap=8.0, rng=lambda: 0.0)
+        backoff.attempts = 3
+        assert backoff.next_delay() == 0.0
+
+    def test_floor_applies_to_next_attempt_only(self):
+        backoff = Backoff(base=1.0, cap=8.0, rng=lambda: 0.5)
+        backoff.floor = 5.0
+        assert backoff.next_delay() == 5.5
+        assert backoff.next_delay() == 1.0
+
+    def test_reset(self):
+        backoff = Backoff()
+        backoff.next_delay()
+        backoff.reset()
+        assert backoff.attempts == 0
+
+
+class TestReplayQueue:
+    @pytest.mark.asyncio
+    async def test_release_wakes_waiters_in_order(self):
+        queue = ReplayQueue()
+        woken = []
+
+        async def waiter(name):
+            await queue.wait(name, 1.0)
+            woken.append(name)
+
+        tasks = [asyncio.create_task(waiter(n)) for n in ("a", "b", "c")]
+        while queue.depth < 3:
+            await asyncio.sleep(0)
+        queue.release()
+        await asyncio.gather(*tasks)
+        assert woken == ["a", "b", "c"]
+        assert queue.get_stats()["replayed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_expires_at_deadline(self):
+        queue = ReplayQueue()
+        with pytest.raises(TimeoutError, match="waiting for gateway reconnect"):
+            await queue.wait("agents.list", 0.01)
+        assert queue.depth == 0
+        assert queue.expired == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self):
+        queue = ReplayQueue(maxsize=1)
+        task = asyncio.create_task(queue.wait("a", 1.0))
+        await asyncio.sleep(0)
+        with pytest.raises(ConnectionError):
+            await queue.wait("b", 1.0)
+        assert queue.rejected == 1
+        queue.release()
+        await task
+
+    @pytest.mark.asyncio
+    async def test_fail_propagates_to_waiters(self):
+        queue = ReplayQueue()
+        task = asyncio.create_task(queue.wait("a", 1.0))
+        await asyncio.sleep(0)
+        queue.fail(ConnectionError("closed"))
+        with pytest.raises(ConnectionError, match="closed"):
+            await task
+
+
+class TestClientReplay:
+    @pytest.mark.asyncio
+    async def test_read_waits_for_reconnect(self):
+        client = _reconnecting_client()
+        task = asyncio.create_task(client.send_request("agents.list", timeout=5))
+        while not client.replay.depth:
+            await asyncio.sleep(0)
+        client._ws.send.assert_not_awaited()
+
+        await _reconnect(client)
+        await _respond_when_sent(client, ["a"])
+        assert await task == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_write_fails_fast_while_reconnecting(self):
+        client = _reconnecting_client()
+        with pytest.raises(ConnectionError):
+            await client.send_request("agents.create", {"name": "x"})
+        assert client.replay.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_replay_disabled_by_zero_queue_size(self):
+        client = _reconnecting_client(queue_size=0)
+        with pytest.raises(ConnectionError):
+            await client.send_request("agents.list")
+
+    @pytest.mark.asyncio
+    async def test_read_cut_off_by_socket_loss_is_replayed(self):
+        client = _reconnecting_client()
+        client.state = ConnectionState.CONNECTED
+        task = asyncio.create_task(client.send_request("agents.list", timeout=5))
+        while not client._pending_requests:
+            await asyncio.sleep(0)
+
+        client.state = ConnectionState.RECONNECTING
+        client._fail_pending(ConnectionError("Gateway connection lost"))
+        while not client.replay.depth:
+            await asyncio.sleep(0)
+
+        await _reconnect(client)
+        await _respond_when_sent(client, ["b"])
+        assert await task == ["b"]
+        assert client._ws.send.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_disconnect_fails_queued_reads(self):
+        client = _reconnecting_client()
+        task = asyncio.create_task(client.send_request("agents.list", timeout=5))
+        while not client.replay.depth:
+            await asyncio.sleep(0)
+        await client.disconnect()
+        with pytest.raises(ConnectionError):
+            await task
+
+    def test_status_reports_reconnect_stats(self):
+        client = _reconnecting_client()
+        reconnect = client.get_status().reconnect
+        assert reconnect["attempts"] == 0
+        assert reconnect["replay"]["maxSize"] == 100
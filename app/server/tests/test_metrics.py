@@ -0,0 +1,91 @@
+"""Unit tests for the Prometheus metrics registry and endpoint."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import metrics
+from gateway_client import GatewayClient, get_gateway_client
+from gateway_models import ConnectionState
+from server import app
+
+
+class TestPrimitives:
+    def test_counter_renders_labels(self):
+        counter = metrics.Counter("t_total", "Test.", ("method", "outcome"))
+        counter.inc("agents.list", "ok")
+        counter.inc("agents.list", "ok")
+        counter.inc("cron.run", "timeout")
+        lines = counter.render()
+        assert "# TYPE t_total counter" in lines
+        assert 't_total{method="agents.list",outcome="ok"} 2' in lines
+        assert 't_total{method="cron.run",outcome="timeout"} 1' in lines
+
+    def test_histogram_buckets_are_cumulative(self):
+        hist = metrics.Histogram("h_seconds", "Test.", ("m",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            hist.observe(value, "x")
+        lines = hist.render()
+        assert 'h_seconds_bucket{m="x",le="0.1"} 1' in lines
+        assert 'h_seconds_bucket{m="x",le="1"} 3' in lines
+        assert 'h_seconds_bucket{m="x",le="+Inf"} 4' in lines
+        assert 'h_seconds_sum{m="x"} 6.05' in lines
+        assert 'h_seconds_count{m="x"} 4' in lines
+
+    def test_label_values_are_escaped(self):
+        counter = metrics.Counter("e_total", "Test.", ("event",))
+        counter.inc('a"b\\c')
+        assert 'e_total{event="a\\"b\\\\c"} 1' in counter.render()
+
+    def test_gauge_reads_at_scrape_time(self):
+        state = {"n": 1}
+        gauge = metrics.GaugeFunc("g", "Test.", lambda: state["n"])
+        state["n"] = 7
+        assert "g 7" in gauge.render()
+
+
+class TestRecording:
+    @pytest.mark.asyncio
+    async def test_send_request_records_outcome_and_latency(self):
+        client = GatewayClient(url="ws://fake", token="")
+        client.state = ConnectionState.CONNECTED
+        client._ws = AsyncMock()
+        before = metrics.RPC_REQUESTS.value("metrics.test", "timeout")
+        count = metrics.RPC_DURATION.count("metrics.test")
+
+        with pytest.raises(TimeoutError):
+            await client.send_request("metrics.test", timeout=0.01)
+
+        assert metrics.RPC_REQUESTS.value("metrics.test", "timeout") == before + 1
+        assert metrics.RPC_DURATION.count("metrics.test") == count + 1
+
+    @pytest.mark.asyncio
+    async def test_events_counted_by_name(self):
+        client = GatewayClient(url="ws://fake", token="")
+        before = metrics.EVENTS.value("tick")
+        await client._handle_event({"type": "event", "event": "tick", "seq": 1})
+        assert metrics.EVENTS.value("tick") == before + 1
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_scrape(self):
+        client = GatewayClient(url="", token="")
+        client._pending_requests["1"] = asyncio.get_event_loop().create_future()
+        app.dependency_overrides[get_gateway_client] = lambda: client
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as http:
+                resp = await http.get("/metrics")
+        finally:
+            app.dependency_overrides.pop(get_gateway_client, None)
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = resp.text
+        assert "# TYPE agenthq_gateway_rpc_duration_seconds histogram" in body
+        assert "agenthq_gateway_connected 0" in body
+        assert "agenthq_gateway_pending_requests 1" in body
+        assert "agenthq_sse_subscribers 0" in body
@@ -0,0 +1,132 @@
+"""Unit tests for the gateway read RPC cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from gateway_client import GatewayClient
+from gateway_models import ConnectionState
+from rpc_cache import CachePolicy, RpcCache
+
+
+def _make_connected_client(cache=None):
+    client = GatewayClient(url="ws://fake", token="", cache=cache or RpcCache())
+    client.state = ConnectionState.CONNECTED
+    client._ws = AsyncMock()
+    return client
+
+
+async def _answer(client, request_id, payload):
+    while request_id not in client._pending_requests:
+        await asyncio.sleep(0)
+    client._handle_response({"type": "res", "id": request_id, "ok": True, "payload": payload})
+
+
+class TestRpcCache:
+    def test_only_methods_with_policy_are_cached(self):
+        cache = RpcCache(policies={"models.list": CachePolicy(ttl=60)})
+        cache.put("models.list", None, ["m1"])
+        cache.put("sessions.list", None, ["s1"])
+        assert cache.get("models.list", {}) == (True, ["m1"])
+        assert cache.get("sessions.list", None) == (False, None)
+
+    def test_entries_expire_after_ttl(self):
+        cache = RpcCache(policies={"models.list": CachePolicy(ttl=10)})
+        with patch("rpc_cache.time.monotonic", return_value=100.0):
+            cache.put("models.list", None, ["m1"])
+        with patch("rpc_cache.time.monotonic", return_value=111.0):
+            assert cache.get("models.list", None) == (False, None)
+        assert cache.get_stats()["entries"] == 0
+
+    def test_global_lru_eviction(self):
+        cache = RpcCache(policies={"skills.status": CachePolicy(ttl=60)}, max_entries=2)
+        cache.put("skills.status", {"agentId": "a"}, 1)
+        cache.put("skills.status", {"agentId": "b"}, 2)
+        cache.get("skills.status", {"agentId": "a"})
+        cache.put("skills.status", {"agentId": "c"}, 3)
+
+        assert cache.get("skills.status", {"agentId": "a"})[0] is True
+        assert cache.get("skills.status", {"agentId": "b"})[0] is False
+        assert cache.evictions == 1
+
+    def test_per_method_entry_limit(self):
+        cache = RpcCache(policies={"skills.status": CachePolicy(ttl=60, max_entries=1)})
+        cache.put("skills.status", {"agentId": "a"}, 1)
+        cache.put("skills.status", {"agentId": "b"}, 2)
+        assert cache.get_stats()["entries"] == 1
+        assert cache.get("skills.status", {"agentId": "b"}) == (True, 2)
+
+    def test_event_invalidates_mapped_methods(self):
+        cache = RpcCache()
+        cache.put("cron.list", None, [])
+        cache.put("models.list", None, [])
+        cache.invalidate_for_event("cron")
+        assert cache.get("cron.list", None)[0] is False
+        assert cache.get("models.list", None)[0] is True
+
+    def test_write_invalidates_mapped_methods(self):
+        cache = RpcCache()
+        cache.put("agents.list", None, [])
+        cache.put("config.get", None, {})
+        cache.invalidate_for_write("agents.create")
+        assert cache.get("agents.list", None)[0] is False
+        assert cache.get("config.get", None)[0] is False
+
+    def test_stale_token_rejects_store(self):
+        cache = RpcCache()
+        token = cache.token("agents.list")
+        cache.invalidate("agents.list")
+        cache.put("agents.list", None, ["stale"], token)
+        assert cache.get("agents.list", None)[0] is False
+
+    def test_clear_rejects_in_flight_stores(self):
+        cache = RpcCache()
+        token = cache.token("models.list")
+        cache.clear()
+        cache.put("models.list", None, ["stale"], token)
+        assert cache.get_stats()["entries"] == 0
+
+    def test_disabled_with_zero_entries(self):
+        cache = RpcCache(max_entries=0)
+        cache.put("models.list", None, [])
+        assert cache.get("models.list", None) == (False, None)
+
+
+class TestClientCaching:
+    @pytest.mark.asyncio
+    async def test_second_read_served_from_cache(self):
+        client = _make_connected_client()
+        task = asyncio.create_task(client.send_request("models.list"))
+        await _answer(client, "1", ["m1"])
+        assert await task == ["m1"]
+
+        assert await client.send_request("models.list") == ["m1"]
+        assert client._ws.send.await_count == 1
+        assert client.get_status().cache["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_write_request_invalidates_cache(self):
+        client = _make_connected_client()
+        client.cache.put("agents.list", None, ["old"])
+
+        task = asyncio.create_task(client.send_request("agents.delete", {"id": "a"}))
+        await _answer(client, "1", {"deleted": True})
+        await task
+
+        assert client.cache.get("agents.list", None)[0] is False
+
+    @pytest.mark.asyncio
+    async def test_gateway_event_invalidates_cache(self):
+        client = _make_connected_client()
+        client.cache.put("cron.list", None, [])
+        await client._handle_event({"type": "event", "event": "cron", "payload": {}})
+        assert client.cache.get("cron.list", None)[0] is False
+
+    @pytest.mark.asyncio
+    async def test_sequence_gap_clears_cache(self):
+        client = _make_connected_client()
+        await client._handle_event({"type": "event", "event": "presence", "seq": 1})
+        client.cache.put("models.list", None, [])
+        await client._handle_event({"type": "event", "event": "presence", "seq": 5})
+        assert client.cache.get_stats()["entries"] == 0
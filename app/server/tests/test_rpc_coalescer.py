@@ -0,0 +1,141 @@
+"""Unit tests for single-flight coalescing of gateway read RPCs."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from gateway_client import GatewayClient, get_gateway_client
+from gateway_models import ConnectionState
+from rpc_coalescer import SingleFlight, request_key
+from server import app
+
+
+class TestRequestKey:
+    def test_param_order_is_ignored(self):
+        assert request_key("sessions.list", {"a": 1, "b": 2}) == request_key(
+            "sessions.list", {"b": 2, "a": 1}
+        )
+
+    def test_none_and_empty_params_match(self):
+        assert request_key("agents.list", None) == request_key("agents.list", {})
+
+    def test_methods_are_distinct(self):
+        assert request_key("agents.list", {}) != request_key("models.list", {})
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_result(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"agents": []}
+
+        waiters = [asyncio.create_task(flight.do("k", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == 1
+        assert all(r == {"agents": []} for r in results)
+        assert flight.get_stats() == {"calls": 1, "shared": 4, "inFlight": 0}
+
+    @pytest.mark.asyncio
+    async def test_errors_fan_out_to_all_waiters(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise TimeoutError("boom")
+
+        results = await asyncio.gather(
+            flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+        )
+        assert all(isinstance(r, TimeoutError) for r in results)
+        assert flight.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 42
+
+        first = asyncio.create_task(flight.do("k", fetch))
+        second = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await second == 42
+
+    @pytest.mark.asyncio
+    async def test_waiter_timeout_does_not_fail_shared_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 42
+
+        # The short deadline starts the shared call, so its expiry must not end it
+        hasty = asyncio.create_task(flight.do("k", fetch, timeout=0.01))
+        patient = asyncio.create_task(flight.do("k", fetch, timeout=5))
+        with pytest.raises(TimeoutError):
+            await hasty
+        assert flight.in_flight == 1
+        release.set()
+        assert await patient == 42
+        assert flight.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+        fetch = AsyncMock(return_value=1)
+        await flight.do("k", fetch)
+        await flight.do("k", fetch)
+        assert fetch.await_count == 2
+
+
+class TestProxyCoalescing:
+    @pytest.fixture
+    def slow_client(self):
+        client = GatewayClient(url="ws://test", token="test-token")
+        client.state = ConnectionState.CONNECTED
+
+        async def send_request(method, params=None):
+            await asyncio.sleep(0.01)
+            return {"method": method}
+
+        client.send_request = AsyncMock(side_effect=send_request)
+        app.dependency_overrides[get_gateway_client] = lambda: client
+        yield client
+        app.dependency_overrides.pop(get_gateway_client, None)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_rpc(self, slow_client):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as http:
+            responses = await asyncio.gather(
+                *[http.get("/api/gateway/agents") for _ in range(10)]
+            )
+        assert all(r.status_code == 200 for r in responses)
+        assert slow_client.send_request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_are_never_coalesced(self, slow_client):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as http:
+            await asyncio.gather(
+                *[http.post("/api/gateway/jobs/job-1/run") for _ in range(3)]
+            )
+        assert slow_client.send_request.await_count == 3
@@ -0,0 +1,160 @@
+"""Unit tests for the pipelined RPC scheduler."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from gateway_client import GatewayClient
+from gateway_models import ConnectionState
+from rpc_scheduler import (
+    RpcPriority,
+    RpcScheduler,
+    default_priority,
+    parse_method_limits,
+)
+
+
+class TestPriorityClassification:
+    def test_reads_use_normal_lane(self):
+        assert default_priority("agents.list") == RpcPriority.NORMAL
+        assert default_priority("config.get") == RpcPriority.NORMAL
+        assert default_priority("health") == RpcPriority.NORMAL
+
+    def test_writes_use_interactive_lane(self):
+        assert default_priority("config.patch") == RpcPriority.INTERACTIVE
+        assert default_priority("cron.run") == RpcPriority.INTERACTIVE
+
+
+class TestParseMethodLimits:
+    def test_parses_pairs(self):
+        assert parse_method_limits("agents.list=2, cron.run=1") == {
+            "agents.list": 2,
+            "cron.run": 1,
+        }
+
+    def test_skips_malformed_entries(self):
+        assert parse_method_limits("agents.list,cron.run=x,,models.list=3") == {
+            "models.list": 3
+        }
+
+
+class TestRpcScheduler:
+    @pytest.mark.asyncio
+    async def test_acquire_immediately_when_idle(self):
+        scheduler = RpcScheduler(max_in_flight=2, method_limits={})
+        await scheduler.acquire("agents.list")
+        assert scheduler.in_flight == 1
+        scheduler.release("agents.list")
+        assert scheduler.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_global_window_queues_excess(self):
+        scheduler = RpcScheduler(max_in_flight=1, method_limits={})
+        await scheduler.acquire("agents.list")
+        waiter = asyncio.create_task(scheduler.acquire("models.list"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert scheduler.queue_depth == 1
+
+        scheduler.release("agents.list")
+        await asyncio.wait_for(waiter, timeout=1)
+        assert scheduler.in_flight == 1
+        assert scheduler.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_per_method_cap_does_not_block_other_methods(self):
+        scheduler = RpcScheduler(max_in_flight=10, method_limits={"agents.list": 1})
+        await scheduler.acquire("agents.list")
+        blocked = asyncio.create_task(scheduler.acquire("agents.list"))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(scheduler.acquire("cron.run"), timeout=1)
+        assert not blocked.done()
+        assert scheduler.get_stats()["methods"]["agents.list"]["queued"] == 1
+
+        scheduler.release("agents.list")
+        await asyncio.wait_for(blocked, timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_interactive_lane_granted_before_reads(self):
+        scheduler = RpcScheduler(max_in_flight=1, method_limits={})
+        await scheduler.acquire("sessions.list")
+        order: list[str] = []
+
+        async def run(method, priority):
+            await scheduler.acquire(method, priority)
+            order.append(method)
+
+        read = asyncio.create_task(run("agents.list", RpcPriority.BACKGROUND))
+        await asyncio.sleep(0)
+        write = asyncio.create_task(run("config.patch", None))
+        await asyncio.sleep(0)
+
+        scheduler.release("sessions.list")
+        await asyncio.sleep(0)
+        assert order == ["config.patch"]
+
+        scheduler.release("config.patch")
+        await asyncio.wait_for(asyncio.gather(read, write), timeout=1)
+        assert order == ["config.patch", "agents.list"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = RpcScheduler(max_in_flight=1, method_limits={})
+        await scheduler.acquire("agents.list")
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.acquire("models.list"), timeout=0.01)
+        assert scheduler.queue_depth == 0
+        assert scheduler.get_stats()["methods"]["models.list"]["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_all_fails_waiters(self):
+        scheduler = RpcScheduler(max_in_flight=1, method_limits={})
+        await scheduler.acquire("agents.list")
+        waiter = asyncio.create_task(scheduler.acquire("models.list"))
+        await asyncio.sleep(0)
+        scheduler.cancel_all()
+        with pytest.raises(ConnectionError):
+            await waiter
+
+    @pytest.mark.asyncio
+    async def test_stats_record_wait_time(self):
+        scheduler = RpcScheduler(max_in_flight=1, method_limits={})
+        await scheduler.acquire("agents.list")
+        waiter = asyncio.create_task(scheduler.acquire("models.list"))
+        await asyncio.sleep(0.02)
+        scheduler.release("agents.list")
+        await waiter
+
+        stats = scheduler.get_stats()
+        assert stats["inFlight"] == 1
+        assert stats["methods"]["models.list"]["requests"] == 1
+        assert stats["methods"]["models.list"]["maxWaitMs"] > 0
+
+
+class TestSendRequestScheduling:
+    @pytest.mark.asyncio
+    async def test_send_request_times_out_waiting_for_slot(self):
+        scheduler = RpcScheduler(max_in_flight=1, method_limits={})
+        client = GatewayClient(url="ws://fake", token="", scheduler=scheduler)
+        client.state = ConnectionState.CONNECTED
+        client._ws = AsyncMock()
+        await scheduler.acquire("agents.list")
+
+        with pytest.raises(TimeoutError, match="waiting for a slot"):
+            await client.send_request("models.list", timeout=0.01)
+        client._ws.send.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_send_request_releases_slot_on_response(self):
+        client = GatewayClient(url="ws://fake", token="", scheduler=RpcScheduler())
+        client.state = ConnectionState.CONNECTED
+        client._ws = AsyncMock()
+
+        task = asyncio.create_task(client.send_request("agents.list"))
+        while "1" not in client._pending_requests:
+            await asyncio.sleep(0)
+        assert client.scheduler.in_flight == 1
+        client._handle_response({"type": "res", "id": "1", "ok": True, "payload": []})
+        assert await task == []
+        assert client.scheduler.in_flight == 0
@@ -0,0 +1,186 @@
+"""Unit tests for incremental session sync."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import gateway_routes
+from gateway_client import GatewayClient, get_gateway_client
+from gateway_models import ConnectionState, GatewayEvent
+from server import app
+from session_index import InvalidCursor, SessionIndex, updated_ms
+
+
+def _session(key, updated_at, **extra):
+    return {"key": key, "updatedAt": updated_at, **extra}
+
+
+def _chat(key, state="final", ts=5000, text="done"):
+    return GatewayEvent(
+        event="chat",
+        payload={"sessionKey": key, "state": state, "ts": ts, "message": {"content": text}},
+    )
+
+
+SESSIONS = [
+    _session("agent:main:webchat:main", 3000),
+    _session("agent:main:slack:dm:u1", 1000),
+    _session("agent:ops:webchat:main", 2000),
+]
+
+
+@pytest.fixture
+def index():
+    index = SessionIndex()
+    index.apply_snapshot({"sessions": SESSIONS})
+    return index
+
+
+def _keys(page):
+    return [s["key"] for s in page.sessions]
+
+
+class TestSessionIndex:
+    def test_first_sync_returns_everything_oldest_first(self, index):
+        page = index.changes(cursor="")
+        assert _keys(page) == [
+            "agent:main:slack:dm:u1", "agent:ops:webchat:main", "agent:main:webchat:main",
+        ]
+        assert page.deleted == [] and not page.has_more and not page.reset
+
+    def test_sync_returns_only_changes(self, index):
+        cursor = index.changes().cursor
+        assert index.changes(cursor).sessions == []
+
+        index.apply_snapshot({"sessions": [
+            SESSIONS[0], _session("agent:main:slack:dm:u1", 4000), _session("agent:new:x:main", 4500),
+        ]})
+        page = index.changes(cursor)
+        assert _keys(page) == ["agent:main:slack:dm:u1", "agent:new:x:main"]
+        assert page.deleted == ["agent:ops:webchat:main"]
+
+    def test_chat_event_applied_in_place(self, index):
+        cursor = index.changes().cursor
+        index._on_event(_chat("agent:ops:webchat:main"))
+        page = index.changes(cursor)
+        assert _keys(page) == ["agent:ops:webchat:main"]
+        assert page.sessions[0]["lastMessage"] == {"content": "done"}
+        assert not index.needs_reconcile
+
+    def test_unknown_session_marks_dirty(self, index):
+        index._on_event(_chat("agent:main:telegram:dm:9"))
+        index._on_event(_chat("agent:main:webchat:main", state="delta"))
+        assert index.needs_reconcile
+        assert index.events_applied == 0
+
+    def test_reconnect_and_seq_gap_mark_dirty(self, index):
+        client = GatewayClient(url="ws://test", token="t")
+        index.start(client)
+        client._track_seq(1)
+        client._track_seq(2)
+        assert not index.needs_reconcile
+
+        client._track_seq(5)
+        assert index.needs_reconcile
+
+        index.apply_snapshot({"sessions": SESSIONS})
+        client._resync()
+        assert index.needs_reconcile
+
+        index.stop()
+        assert client._resync_callbacks == []
+
+    def test_limit_pages_through_changes(self, index):
+        first = index.changes(cursor="", limit=2)
+        assert len(first.sessions) == 2 and first.has_more
+        second = index.changes(first.cursor, limit=2)
+        assert _keys(second) == ["agent:main:webchat:main"]
+        assert not second.has_more
+
+    def test_filters(self, index):
+        assert _keys(index.changes(agent_id="ops")) == ["agent:ops:webchat:main"]
+        assert _keys(index.changes(search="SLACK")) == ["agent:main:slack:dm:u1"]
+        assert _keys(index.changes(updated_after=2000)) == ["agent:main:webchat:main"]
+
+    def test_foreign_cursor_resets(self, index):
+        page = index.changes(SessionIndex().encode_cursor(0))
+        assert page.reset and len(page.sessions) == 3
+
+    def test_pruned_tombstones_reset_old_cursors(self):
+        index = SessionIndex(max_tombstones=1)
+        index.apply_snapshot({"sessions": SESSIONS})
+        cursor = index.changes().cursor
+        index.apply_snapshot({"sessions": SESSIONS[:1]})
+        assert index.get_stats()["tombstones"] == 1
+        assert index.changes(cursor).reset
+
+    def test_malformed_cursor(self, index):
+        with pytest.raises(InvalidCursor):
+            index.changes("not a cursor!")
+
+    def test_updated_ms(self):
+        assert updated_ms({"updatedAt": 1700}) == 1700
+        assert updated_ms({"updatedAt": "1970-01-01T00:00:01Z"}) == 1000
+        assert updated_ms({"updatedAt": "soon"}) is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reconciles_share_fetch(self):
+        index = SessionIndex()
+        fetch = AsyncMock(return_value=SESSIONS)
+        await asyncio.gather(*(index.ensure_fresh(fetch) for _ in range(5)))
+        assert fetch.await_count == 1
+
+
+@pytest.fixture
+def connected_client(monkeypatch):
+    monkeypatch.setattr(gateway_routes, "session_index", SessionIndex())
+    client = GatewayClient(url="ws://test", token="test-token")
+    client.state = ConnectionState.CONNECTED
+    client.send_request = AsyncMock(return_value={"sessions": SESSIONS})
+    app.dependency_overrides[get_gateway_client] = lambda: client
+    yield client
+    app.dependency_overrides.pop(get_gateway_client, None)
+
+
+@pytest.fixture
+async def http_client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+class TestSessionsRoute:
+    @pytest.mark.asyncio
+    async def test_plain_list_is_proxied(self, http_client, connected_client):
+        resp = await http_client.get("/api/gateway/sessions", params={"limit": 7})
+        assert resp.json() == {"sessions": SESSIONS}
+        connected_client.send_request.assert_awaited_once_with("sessions.list", {"limit": 7})
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync(self, http_client, connected_client):
+        first = (await http_client.get("/api/gateway/sessions", params={"cursor": ""})).json()
+        assert len(first["sessions"]) == 3
+
+        gateway_routes.session_index._on_event(_chat("agent:main:webchat:main"))
+        resp = await http_client.get("/api/gateway/sessions", params={"cursor": first["cursor"]})
+        assert [s["key"] for s in resp.json()["sessions"]] == ["agent:main:webchat:main"]
+        connected_client.send_request.assert_awaited_once_with(
+            "sessions.list", {"includeLastMessage": True}
+        )
+
+    @pytest.mark.asyncio
+    async def test_bad_cursor(self, http_client, connected_client):
+        resp = await http_client.get("/api/gateway/sessions", params={"cursor": "%%%"})
+        assert resp.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_disconnected(self, http_client, monkeypatch):
+        monkeypatch.setattr(gateway_routes, "session_index", SessionIndex())
+        app.dependency_overrides[get_gateway_client] = lambda: GatewayClient(url="", token="")
+        try:
+            resp = await http_client.get("/api/gateway/sessions", params={"updatedAfter": 0})
+        finally:
+            app.dependency_overrides.pop(get_gateway_client, None)
+        assert resp.status_code == 503
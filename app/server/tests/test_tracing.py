@@ -0,0 +1,110 @@
+"""Unit tests for request tracing."""
+
+import asyncio
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import tracing
+from gateway_client import GatewayClient, get_gateway_client
+from server import app
+
+
+class TestTracer:
+    def test_nested_spans_share_trace(self):
+        tracer = tracing.Tracer()
+        with tracer.span("outer") as outer:
+            with tracer.span("inner", method="agents.list") as inner:
+                inner.set("cache", "hit")
+        assert inner.trace_id == outer.trace_id
+        assert inner.parent_id == outer.span_id
+        assert outer.parent_id is None
+        assert inner.attributes == {"method": "agents.list", "cache": "hit"}
+
+    @pytest.mark.asyncio
+    async def test_gathered_tasks_nest_under_caller(self):
+        tracer = tracing.Tracer()
+
+        async def child(name):
+            with tracer.span(name) as span:
+                await asyncio.sleep(0)
+                return span
+
+        with tracer.span("fetch") as parent:
+            spans = await asyncio.gather(child("a"), child("b"))
+        assert {s.parent_id for s in spans} == {parent.span_id}
+
+    def test_error_recorded_and_reraised(self):
+        tracer = tracing.Tracer()
+        with pytest.raises(ValueError):
+            with tracer.span("boom") as span:
+                raise ValueError("bad payload")
+        assert span.error == "ValueError: bad payload"
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = tracing.Tracer(buffer_size=0)
+        with tracer.span("x") as span:
+            span.set("k", "v")
+        assert span is tracing.NOOP_SPAN
+        assert tracer.get_traces() == []
+
+    def test_get_traces_newest_first_with_filters(self):
+        tracer = tracing.Tracer()
+        for name in ("first", "second", "third"):
+            with tracer.span(name):
+                with tracer.span(f"{name}.child"):
+                    pass
+        traces = tracer.get_traces(limit=2)
+        assert [t["root"] for t in traces] == ["third", "second"]
+        assert [s["name"] for s in traces[0]["spans"]] == ["third", "third.child"]
+
+        only = tracer.get_traces(trace_id=traces[1]["traceId"])
+        assert [t["root"] for t in only] == ["second"]
+        assert tracer.get_traces(min_duration_ms=60_000) == []
+
+    def test_exports_json_lines(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        tracer = tracing.Tracer(export_path=str(path))
+        with tracer.span("outer"):
+            with tracer.span("inner"):
+                pass
+        tracer.close()
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["name"] for line in lines] == ["inner", "outer"]
+        assert lines[0]["parentId"] == lines[1]["spanId"]
+
+    def test_traced_decorator(self):
+        tracer = tracing.tracer
+
+        @tracing.traced("test.mapper")
+        def mapper(x):
+            return x * 2
+
+        with tracer.span("test.root") as root:
+            assert mapper(2) == 4
+        spans = tracer.get_traces(trace_id=root.trace_id)[0]["spans"]
+        assert [s["name"] for s in spans] == ["test.root", "test.mapper"]
+
+
+class TestTracesEndpoint:
+    @pytest.mark.asyncio
+    async def test_dashboard_request_traced(self):
+        client = GatewayClient(url="", token="")
+        app.dependency_overrides[get_gateway_client] = lambda: client
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as http:
+                assert (await http.get("/api/dashboard")).status_code == 200
+                resp = await http.get("/api/debug/traces", params={"limit": 5})
+        finally:
+            app.dependency_overrides.pop(get_gateway_client, None)
+
+        assert resp.status_code == 200
+        trace = next(t for t in resp.json()["traces"] if t["root"] == "GET /api/dashboard")
+        names = [s["name"] for s in trace["spans"]]
+        assert "dashboard.map_agents" in names
+        assert "dashboard.map_jobs" in names
+        root = trace["spans"][0]
+        assert root["attributes"]["status"] == 200
+        assert root["attributes"]["source"] == "live"
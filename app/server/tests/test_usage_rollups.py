@@ -0,0 +1,154 @@
+"""Unit tests for the hourly/daily usage rollup store."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import dashboard_routes
+import usage_routes
+from gateway_client import GatewayClient
+from gateway_models import GatewayEvent
+from server import app
+from usage_rollups import UsageRollupStore, day_start, usage_rows
+
+DAY = "2026-03-02"
+NOON = day_start(DAY) + 12 * 3600
+
+
+def _usage(key, cost, tokens=100, turns=1):
+    return {
+        "key": key, "inputTokens": tokens, "outputTokens": 0, "totalTokens": tokens,
+        "cost": cost, "turns": turns,
+    }
+
+
+@pytest.fixture
+def store():
+    store = UsageRollupStore(path=":memory:")
+    store.open()
+    yield store
+    store.close()
+
+
+class TestRecording:
+    def test_only_growth_is_added(self, store):
+        store.record_snapshot(DAY, [_usage("agent:main:webchat:main", 1.0)], at=NOON)
+        store.record_snapshot(DAY, [_usage("agent:main:webchat:main", 1.5, 150)], at=NOON + 3600)
+        hours = store.query(DAY, DAY, "hour")
+        assert [(h["start"][11:13], h["cost"], h["totalTokens"]) for h in hours] == [
+            ("12", 1.0, 100), ("13", 0.5, 50),
+        ]
+        assert store.day_cost(DAY) == 1.5
+
+    def test_unchanged_snapshot_adds_nothing(self, store):
+        rows = [_usage("agent:main:webchat:main", 1.0)]
+        store.record_snapshot(DAY, rows, at=NOON)
+        assert store.record_snapshot(DAY, rows, at=NOON + 60) == 0
+        assert store.day_cost(DAY) == 1.0
+
+    def test_buckets_keyed_by_agent_and_model(self, store):
+        store.record_snapshot(DAY, [
+            {**_usage("agent:main:webchat:main", 1.0), "model": "opus"},
+            _usage("agent:ops:slack:dm:u1", 2.0),
+        ], at=NOON)
+        days = store.query(DAY, DAY)
+        assert [(d["agentId"], d["model"]) for d in days] == [("main", "opus"), ("ops", "")]
+        assert [d["agentId"] for d in store.query(DAY, DAY, agent_id="ops")] == ["ops"]
+
+    def test_event_usage_not_double_counted_by_next_pull(self, store):
+        key = "agent:main:webchat:main"
+        store.record_event(
+            {"sessionKey": key, "usage": {"inputTokens": 80, "outputTokens": 20}}, at=NOON
+        )
+        store.record_snapshot(DAY, [_usage(key, 0.25, tokens=100)], at=NOON + 60)
+        [day] = store.query(DAY, DAY)
+        assert (day["totalTokens"], day["cost"], day["turns"]) == (100, 0.25, 1)
+
+    def test_event_usage_not_double_counted_by_agent_aggregate(self, store):
+        def aggregate(tokens, cost, turns):
+            return usage_rows({"byAgent": {"main": {**_usage("", cost, tokens, turns)}}})
+
+        store.record_event(
+            {"sessionKey": "agent:main:webchat:main", "usage": {"inputTokens": 80, "outputTokens": 20}},
+            at=NOON,
+        )
+        store.record_snapshot(DAY, aggregate(100, 0.25, 1), at=NOON + 60)
+        store.record_event(
+            {"sessionKey": "agent:main:slack:dm:u1", "usage": {"inputTokens": 50}}, at=NOON + 120
+        )
+        store.record_snapshot(DAY, aggregate(170, 0.5, 3), at=NOON + 180)
+        days = store.query(DAY, DAY)
+        assert sum(d["totalTokens"] for d in days) == 170
+        assert sum(d["turns"] for d in days) == 3
+        assert store.day_cost(DAY) == 0.5
+
+    def test_backfilled_days_skip_hourly_buckets(self, store):
+        store.record_snapshot(DAY, [_usage("agent:main:webchat:main", 3.0)], at=None)
+        assert store.query(DAY, DAY, "hour") == []
+        assert store.day_cost(DAY) == 3.0
+
+    def test_prune_drops_old_hours_only(self, store):
+        store.record_snapshot(DAY, [_usage("agent:main:webchat:main", 1.0)], at=NOON)
+        store.prune(NOON + 40 * 86400)
+        assert store.query(DAY, DAY, "hour") == []
+        assert store.day_cost(DAY) == 1.0
+
+    def test_usage_rows_shapes(self):
+        assert usage_rows({"sessions": [_usage("k", 1)]})[0]["key"] == "k"
+        assert usage_rows({"byAgent": {"main": {"cost": 2}}}) == [
+            {"cost": 2, "key": "agent:main", "agentId": "main", "aggregate": True}
+        ]
+        assert usage_rows({"total": {"cost": 1}}) == []
+
+
+class TestPulling:
+    @pytest.mark.asyncio
+    async def test_midnight_settles_previous_day(self, store):
+        client = GatewayClient(url="ws://test", token="test-token")
+        client.send_request = AsyncMock(return_value=[_usage("agent:main:webchat:main", 1.0)])
+        store.client = client
+
+        await store.pull_once(now=NOON)
+        await store.pull_once(now=NOON + 86400)
+        days = [c.args[1]["startDate"] for c in client.send_request.await_args_list]
+        assert days == [DAY, DAY, "2026-03-03"]
+        assert store.get_stats()["lastDay"] == "2026-03-03"
+
+
+class TestRollupRoute:
+    @pytest.mark.asyncio
+    async def test_range_query(self, store, monkeypatch):
+        monkeypatch.setattr(usage_routes, "usage_store", store)
+        store.record_snapshot(DAY, [_usage("agent:main:webchat:main", 1.0)], at=NOON)
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as http:
+            resp = await http.get("/api/usage/rollups", params={"startDate": DAY, "endDate": DAY})
+            bad = await http.get("/api/usage/rollups", params={"startDate": "March"})
+        assert resp.status_code == 200
+        assert resp.json()["totals"]["cost"] == 1.0
+        assert len(resp.json()["buckets"]) == 1
+        assert bad.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(usage_routes, "usage_store", UsageRollupStore(path=""))
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as http:
+            resp = await http.get("/api/usage/rollups")
+        assert resp.status_code == 503
+
+
+def test_dashboard_yesterday_total_from_rollups(store, monkeypatch):
+    monkeypatch.setattr(dashboard_routes, "usage_store", store)
+    monkeypatch.setattr(dashboard_routes.time, "time", lambda: NOON + 86400)
+    store.record_snapshot(DAY, [_usage("agent:main:webchat:main", 4.0)], at=NOON)
+    assert dashboard_routes._build_payload({})["costSummary"]["yesterdayTotal"] == 4.0
+
+
+def test_chat_final_event_recorded(store):
+    store._on_event(GatewayEvent(event="chat", payload={
+        "sessionKey": "agent:main:webchat:main", "state": "final",
+        "usage": {"inputTokens": 5, "outputTokens": 5},
+    }))
+    assert store.events_applied == 1
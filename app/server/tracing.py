@@ -0,0 +1,252 @@
+"""Lightweight in-process request tracing.
+
+A span records a name, start time, duration, attributes and its parent;
+the active span lives in a ContextVar, so spans opened inside tasks
+spawned by ``asyncio.gather`` nest under the span that spawned them.
+Finished spans go to a ring buffer (``TRACE_BUFFER_SIZE``, 0 disables
+tracing) served by ``/api/debug/traces``, and are optionally appended as
+JSON lines to ``TRACE_EXPORT_PATH``. No collector is needed.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import IO, Any
+
+logger = logging.getLogger("tracing")
+
+DEFAULT_BUFFER_SIZE = 2048
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation; use as a context manager via ``Tracer.span``."""
+
+    __slots__ = (
+        "_tracer", "_token", "_t0", "trace_id", "span_id", "parent_id",
+        "name", "start", "duration_ms", "attributes", "error",
+    )
+
+    def __init__(self, tracer: Tracer, name: str, attributes: dict[str, Any]):
+        parent = _current.get()
+        self._tracer = tracer
+        self._token = None
+        self._t0 = 0.0
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.start = 0.0
+        self.duration_ms: float | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> Span:
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        self._tracer._finish(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "durationMs": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is disabled."""
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE, export_path: str | None = None):
+        self.enabled = buffer_size > 0
+        self._spans: deque[Span] = deque(maxlen=max(1, buffer_size))
+        self.export_path = export_path
+        self._export: IO[str] | None = None
+        self.finished = 0
+
+    @classmethod
+    def from_env(cls) -> Tracer:
+        return cls(
+            buffer_size=int(os.getenv("TRACE_BUFFER_SIZE", DEFAULT_BUFFER_SIZE)),
+            export_path=os.getenv("TRACE_EXPORT_PATH") or None,
+        )
+
+    def span(self, name: str, **attributes: Any) -> Span | _NoopSpan:
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def _finish(self, span: Span) -> None:
+        self._spans.append(span)
+        self.finished += 1
+        if self.export_path:
+            self._write(span)
+
+    def _write(self, span: Span) -> None:
+        try:
+            if self._export is None:
+                self._export = open(self.export_path, "a", encoding="utf-8")
+            self._export.write(json.dumps(span.to_dict(), default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Disabling trace export to {self.export_path}: {e}")
+            self.export_path = None
+
+    def flush(self) -> None:
+        if self._export is not None:
+            self._export.flush()
+
+    def close(self) -> None:
+        if self._export is not None:
+            self._export.close()
+            self._export = None
+
+    def get_traces(
+        self, limit: int = 20, trace_id: str | None = None, min_duration_ms: float = 0.0
+    ) -> list[dict]:
+        """Most recent traces first, each with its spans in start order.
+
+        Traces still in progress (no finished root span) are left out.
+        """
+        by_trace: dict[str, list[Span]] = {}
+        for span in self._spans:
+            if trace_id is None or span.trace_id == trace_id:
+                by_trace.setdefault(span.trace_id, []).append(span)
+
+        result = []
+        # Roots finish last, so walking backwards visits the newest traces first
+        for span in reversed(self._spans):
+            if len(result) >= limit:
+                break
+            if span.parent_id is not None or span.trace_id not in by_trace:
+                continue
+            if (span.duration_ms or 0.0) < min_duration_ms:
+                continue
+            spans = sorted(by_trace.pop(span.trace_id), key=lambda s: s.start)
+            result.append(
+                {
+                    "traceId": span.trace_id,
+                    "root": span.name,
+                    "durationMs": round(span.duration_ms or 0.0, 3),
+                    "spans": [s.to_dict() for s in spans],
+                }
+            )
+        return result
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "buffered": len(self._spans),
+            "capacity": self._spans.maxlen,
+            "finished": self.finished,
+            "exportPath": self.export_path,
+        }
+
+
+tracer = Tracer.from_env()
+
+
+def span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Open a span on the module tracer."""
+    return tracer.span(name, **attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+    """The active span, or a no-op one, for adding attributes."""
+    return _current.get() or NOOP_SPAN
+
+
+def traced(name: str) -> Callable:
+    """Decorator running a sync or async function inside a span."""
+
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a root span for each HTTP request.
+
+    The span is named after the matched route template (``GET
+    /api/gateway/agents/{agent_id}``) once routing has happened, so names
+    stay low-cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        status = {"code": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        with tracer.span(f"{method} {scope.get('path', '')}", kind="http") as root:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None and hasattr(route, "path"):
+                    root.name = f"{method} {route.path}"
+                root.set("status", status["code"])
@@ -0,0 +1,405 @@
+"""Pre-aggregated token/cost usage in hourly and daily SQLite buckets.
+
+``sessions.usage`` reports cumulative per-session totals for a date
+range, so every Usage page view and dashboard build used to re-aggregate
+the raw gateway response. The rollup store polls today's totals every
+``interval`` seconds, diffs them against the last totals seen per session
+and adds only the difference to the bucket for the current hour and day
+(keyed by agent and model). Chat ``final`` events carrying ``usage`` are
+added straight away and counted into the per-session totals, so the next
+poll only adds what the event did not cover (typically the cost). When
+the gateway reports only per-agent aggregates, an agent's growth is
+measured against everything recorded for it that day, events included.
+
+Date-range queries then read a handful of precomputed rows instead of
+calling the gateway. Days are UTC calendar days.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from gateway_client import GatewayClient
+from gateway_models import GatewayEvent
+from rpc_scheduler import RpcPriority
+from session_index import session_agent_id
+
+logger = logging.getLogger("usage_rollups")
+
+DEFAULT_DB_PATH = str(Path(__file__).resolve().parent / "data" / "usage.sqlite3")
+
+# Bucket column -> sessions.usage field
+FIELDS: dict[str, str] = {
+    "input_tokens": "inputTokens",
+    "output_tokens": "outputTokens",
+    "total_tokens": "totalTokens",
+    "cost": "cost",
+    "turns": "turns",
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS usage_buckets (
+    granularity TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    agent_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    {", ".join(f"{c} {'REAL' if c == 'cost' else 'INTEGER'} NOT NULL DEFAULT 0" for c in FIELDS)},
+    PRIMARY KEY (granularity, bucket, agent_id, model)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS usage_sessions (
+    day TEXT NOT NULL,
+    session_key TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    {", ".join(f"{c} {'REAL' if c == 'cost' else 'INTEGER'} NOT NULL DEFAULT 0" for c in FIELDS)},
+    PRIMARY KEY (day, session_key)
+) WITHOUT ROWID;
+"""
+
+_ADD_BUCKET = f"""
+INSERT INTO usage_buckets (granularity, bucket, agent_id, model, {", ".join(FIELDS)})
+VALUES (?, ?, ?, ?, {", ".join("?" for _ in FIELDS)})
+ON CONFLICT (granularity, bucket, agent_id, model) DO UPDATE SET
+{", ".join(f"{c} = {c} + excluded.{c}" for c in FIELDS)}
+"""
+
+_PUT_SESSION = f"""
+INSERT OR REPLACE INTO usage_sessions (day, session_key, agent_id, model, {", ".join(FIELDS)})
+VALUES (?, ?, ?, ?, {", ".join("?" for _ in FIELDS)})
+"""
+
+
+def day_of(ts: float) -> str:
+    """UTC calendar day of an epoch timestamp, as YYYY-MM-DD."""
+    return datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+
+
+def day_start(day: str) -> int:
+    """Epoch seconds at the start of a YYYY-MM-DD UTC day; ValueError if malformed."""
+    parsed = date.fromisoformat(day)
+    return int(datetime(parsed.year, parsed.month, parsed.day, tzinfo=timezone.utc).timestamp())
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return 0
+    return value
+
+
+def usage_rows(payload: Any) -> list[dict]:
+    """Per-session usage entries from a ``sessions.usage`` payload.
+
+    Accepts a list of SessionUsage, ``{"sessions": [...]}``, or an
+    aggregate with only a ``byAgent`` breakdown, which is treated as one
+    pseudo-session per agent marked ``aggregate``.
+    """
+    if isinstance(payload, dict):
+        if isinstance(payload.get("sessions"), list):
+            payload = payload["sessions"]
+        else:
+            by_agent = payload.get("byAgent") or payload.get("agents")
+            if not isinstance(by_agent, dict):
+                return []
+            payload = [
+                {**usage, "key": f"agent:{agent_id}", "agentId": agent_id, "aggregate": True}
+                for agent_id, usage in by_agent.items()
+                if isinstance(usage, dict)
+            ]
+    if not isinstance(payload, list):
+        return []
+    return [row for row in payload if isinstance(row, dict) and row.get("key")]
+
+
+class UsageRollupStore:
+    """SQLite-backed hourly/daily usage buckets per agent and model."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        interval: float = 300.0,
+        backfill_days: int = 7,
+        hourly_retention_days: int = 35,
+    ):
+        self.path = path
+        self.interval = interval
+        self.backfill_days = backfill_days
+        self.hourly_retention_days = hourly_retention_days
+        self.client: GatewayClient | None = None
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+        self._last_day: str | None = None
+        self._backfilled = False
+        self.pulls = 0
+        self.events_applied = 0
+
+    @classmethod
+    def from_env(cls) -> UsageRollupStore:
+        return cls(
+            path=os.getenv("USAGE_ROLLUP_DB", DEFAULT_DB_PATH),
+            interval=float(os.getenv("USAGE_ROLLUP_INTERVAL", 300.0)),
+            backfill_days=int(os.getenv("USAGE_ROLLUP_BACKFILL_DAYS", 7)),
+            hourly_retention_days=int(os.getenv("USAGE_ROLLUP_HOURLY_RETENTION_DAYS", 35)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def open(self) -> None:
+        """Open (creating if needed) the database; an empty path disables the store."""
+        if self._db is not None or not self.path:
+            return
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            # Other API workers read while the gateway owner writes
+            db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        self._db = db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def start(self, client: GatewayClient, pull: bool = True) -> None:
+        """Open the store and, when ``pull`` is set, keep it fed from ``client``.
+
+        Only the process that owns the gateway connection should pull;
+        other workers open the same file read-mostly.
+        """
+        self.open()
+        if not self.enabled or not pull:
+            return
+        self.client = client
+        client.on_any_event(self._on_event)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.client and self._on_event in self.client._global_event_callbacks:
+            self.client._global_event_callbacks.remove(self._on_event)
+        self.client = None
+        self.close()
+
+    # --- Feeding ---
+
+    def _add(self, day: str, at: float | None, agent_id: str, model: str, delta: dict) -> None:
+        values = [delta[c] for c in FIELDS]
+        self._db.execute(_ADD_BUCKET, ("day", day_start(day), agent_id, model, *values))
+        if at is not None:
+            hour = int(at) - int(at) % 3600
+            self._db.execute(_ADD_BUCKET, ("hour", hour, agent_id, model, *values))
+
+    def record_snapshot(self, day: str, rows: list[dict], at: float | None) -> int:
+        """Fold cumulative per-session totals for ``day`` into the buckets.
+
+        The growth since the last totals seen for each session is added to
+        the day bucket and, when ``at`` is given, to the hour bucket
+        containing it. An ``aggregate`` row covers its whole agent, so the
+        agent's other sessions (fed by events) count as already seen.
+        Returns the number of sessions that grew.
+        """
+        grown = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for row in rows:
+                    key = row["key"]
+                    prev = self._db.execute(
+                        "SELECT * FROM usage_sessions WHERE day = ? AND session_key = ?",
+                        (day, key),
+                    ).fetchone()
+                    agent_id = session_agent_id(row) or (prev["agent_id"] if prev else "")
+                    model = row.get("model") or (prev["model"] if prev else "")
+                    others = self._agent_totals(day, agent_id, key) if row.get("aggregate") else None
+                    totals, delta = {}, {}
+                    for column, name in FIELDS.items():
+                        seen = prev[column] if prev else 0
+                        counted = seen + (others[column] if others else 0)
+                        # Event-fed totals can run ahead of the gateway's; never go backwards
+                        delta[column] = max(_number(row.get(name)) - counted, 0)
+                        totals[column] = seen + delta[column]
+                    if any(delta.values()):
+                        self._add(day, at, agent_id, model, delta)
+                        grown += 1
+                    self._db.execute(
+                        _PUT_SESSION,
+                        (day, key, agent_id, model, *(totals[c] for c in FIELDS)),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return grown
+
+    def _agent_totals(self, day: str, agent_id: str, exclude_key: str) -> sqlite3.Row:
+        return self._db.execute(
+            f"SELECT {', '.join(f'COALESCE(SUM({c}), 0) AS {c}' for c in FIELDS)} "
+            "FROM usage_sessions WHERE day = ? AND agent_id = ? AND session_key != ?",
+            (day, agent_id, exclude_key),
+        ).fetchone()
+
+    def record_event(self, payload: dict, at: float) -> bool:
+        """Add the usage carried by a chat ``final`` event."""
+        usage = payload.get("usage")
+        key = payload.get("sessionKey")
+        if not isinstance(usage, dict) or not key:
+            return False
+        input_tokens = _number(usage.get("inputTokens"))
+        output_tokens = _number(usage.get("outputTokens"))
+        delta = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": _number(usage.get("totalTokens")) or input_tokens + output_tokens,
+            "cost": _number(usage.get("cost")),
+            "turns": 1,
+        }
+        day = day_of(at)
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                prev = self._db.execute(
+                    "SELECT * FROM usage_sessions WHERE day = ? AND session_key = ?", (day, key)
+                ).fetchone()
+                agent_id = prev["agent_id"] if prev else session_agent_id({"key": key}) or ""
+                model = prev["model"] if prev else payload.get("model") or ""
+                self._add(day, at, agent_id, model, delta)
+                totals = [(prev[c] if prev else 0) + delta[c] for c in FIELDS]
+                self._db.execute(_PUT_SESSION, (day, key, agent_id, model, *totals))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        self.events_applied += 1
+        return True
+
+    def _on_event(self, event: GatewayEvent) -> None:
+        if event.event == "chat" and event.payload.get("state") == "final":
+            self.record_event(event.payload, time.time())
+
+    async def _pull_day(self, day: str, at: float | None) -> None:
+        payload = await self.client.send_request(
+            "sessions.usage", {"startDate": day, "endDate": day}, priority=RpcPriority.BACKGROUND
+        )
+        self.record_snapshot(day, usage_rows(payload), at)
+
+    async def backfill(self, now: float | None = None) -> None:
+        """Settle the past ``backfill_days`` days into their day buckets.
+
+        Re-pulling days that already have data is harmless: only growth
+        past the recorded totals is added.
+        """
+        now = time.time() if now is None else now
+        for back in range(self.backfill_days, 0, -1):
+            await self._pull_day(day_of(now - back * 86400), at=None)
+        self._backfilled = True
+
+    async def pull_once(self, now: float | None = None) -> None:
+        """Pull today's totals; after midnight, settle the previous day first."""
+        now = time.time() if now is None else now
+        today = day_of(now)
+        if self._last_day is not None and self._last_day != today:
+            await self._pull_day(self._last_day, at=day_start(self._last_day) + 86399)
+        await self._pull_day(today, at=now)
+        self._last_day = today
+        self.pulls += 1
+        self.prune(now)
+
+    def prune(self, now: float) -> None:
+        hourly_cutoff = int(now) - self.hourly_retention_days * 86400
+        sessions_cutoff = day_of(now - (self.backfill_days + 1) * 86400)
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM usage_buckets WHERE granularity = 'hour' AND bucket < ?",
+                (hourly_cutoff,),
+            )
+            self._db.execute("DELETE FROM usage_sessions WHERE day < ?", (sessions_cutoff,))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self.client.is_connected:
+                    if not self._backfilled:
+                        await self.backfill()
+                    await self.pull_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Usage rollup pull failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    # --- Queries ---
+
+    def query(
+        self,
+        start_day: str,
+        end_day: str,
+        granularity: str = "day",
+        agent_id: str | None = None,
+    ) -> list[dict]:
+        """Buckets between two UTC days (inclusive), oldest first."""
+        sql = (
+            f"SELECT bucket, agent_id, model, {', '.join(FIELDS)} FROM usage_buckets "
+            "WHERE granularity = ? AND bucket >= ? AND bucket < ?"
+        )
+        args: list[Any] = [granularity, day_start(start_day), day_start(end_day) + 86400]
+        if agent_id is not None:
+            sql += " AND agent_id = ?"
+            args.append(agent_id)
+        sql += " ORDER BY bucket, agent_id, model"
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [
+            {
+                "start": datetime.fromtimestamp(row["bucket"], timezone.utc).isoformat(),
+                "agentId": row["agent_id"],
+                "model": row["model"],
+                **{name: row[column] for column, name in FIELDS.items()},
+            }
+            for row in rows
+        ]
+
+    def day_cost(self, day: str) -> float | None:
+        """Total cost recorded for a UTC day, or None while the store is closed."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(SUM(cost), 0) FROM usage_buckets "
+                "WHERE granularity = 'day' AND bucket = ?",
+                (day_start(day),),
+            ).fetchone()
+        return float(row[0])
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pulls": self.pulls,
+            "eventsApplied": self.events_applied,
+            "lastDay": self._last_day,
+        }
+
+
+def totals(buckets: list[dict]) -> dict:
+    """Sum the usage fields across buckets."""
+    return {name: sum(b[name] for b in buckets) for name in FIELDS.values()}
+
+
+usage_store = UsageRollupStore.from_env()
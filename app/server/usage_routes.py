@@ -0,0 +1,43 @@
+"""FastAPI router exposing pre-aggregated usage rollups under /api/usage."""
+
+from __future__ import annotations
+
+import time
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from usage_rollups import day_of, day_start, totals, usage_store
+
+router = APIRouter(prefix="/api/usage", tags=["usage"])
+
+
+@router.get("/rollups")
+async def usage_rollups(
+    startDate: Optional[str] = Query(None),
+    endDate: Optional[str] = Query(None),
+    granularity: Literal["hour", "day"] = Query("day"),
+    agentId: Optional[str] = Query(None),
+):
+    """Token/cost usage buckets per agent and model for a UTC date range.
+
+    Dates are inclusive YYYY-MM-DD; the range defaults to the last 7 days
+    ending today.
+    """
+    if not usage_store.enabled:
+        raise HTTPException(status_code=503, detail="Usage rollups are not enabled.")
+    end = endDate or day_of(time.time())
+    try:
+        start = startDate or day_of(day_start(end) - 6 * 86400)
+        if day_start(start) > day_start(end):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid startDate/endDate.")
+    buckets = usage_store.query(start, end, granularity, agentId)
+    return {
+        "startDate": start,
+        "endDate": end,
+        "granularity": granularity,
+        "buckets": buckets,
+        "totals": totals(buckets),
+    }